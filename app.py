@@ -18,6 +18,7 @@ import sys
 
 import logging
 import argparse
+import multiprocessing
 from logging.config import dictConfig
 
 from PyQt5.QtWidgets import QApplication
@@ -25,6 +26,10 @@ from pugdebug.pugdebug import Pugdebug
 VERSION = '1.0.0'
 
 if __name__ == "__main__":
+    # The processes indexing the project files start this script too,
+    # when pugdebug is frozen into an executable
+    multiprocessing.freeze_support()
+
     config = dict(
         version=1,
         formatters={
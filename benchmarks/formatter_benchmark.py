@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+
+    Measure how many tokens per second are tokenized and split by line.
+
+    Usage: python benchmarks/formatter_benchmark.py [file.php] [repeat]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pugdebug.tokenizer import (PugdebugTokenizer, get_line_starts,
+                                split_lines)
+
+
+def main():
+    path = os.path.join(os.path.dirname(__file__), '..',
+                        'pugdebug', 'tests', '_files', 'sample.php')
+    repeat = 1000
+
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    if len(sys.argv) > 2:
+        repeat = int(sys.argv[2])
+
+    with open(path) as f:
+        text = f.read() * repeat
+
+    tokenizer = PugdebugTokenizer()
+
+    start = time.perf_counter()
+    tokens = list(tokenizer.tokenize(text))
+    tokenize_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    line_starts = get_line_starts(text)
+    lines = split_lines(tokens, line_starts)
+    split_time = time.perf_counter() - start
+
+    print('%d lines, %d tokens' % (len(lines), len(tokens)))
+    print('tokenize: %.3f s, %d tokens/s' %
+          (tokenize_time, len(tokens) / tokenize_time))
+    print('split lines: %.3f s, %d tokens/s' %
+          (split_time, len(tokens) / split_time))
+
+
+if __name__ == '__main__':
+    main()
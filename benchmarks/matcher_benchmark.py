@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+
+    Measure how long matching file paths takes for every keystroke of
+    a few queries, over a generated project with many files, narrowing
+    the paths matched at the keystroke before and from scratch.
+
+    Usage: python benchmarks/matcher_benchmark.py [paths] [target ms]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pugdebug.matcher import PugdebugMatcher
+
+words = ['App', 'Http', 'Controller', 'Model', 'User', 'Order', 'Invoice',
+         'Service', 'Provider', 'Repository', 'Event', 'Listener', 'Test',
+         'Console', 'Command', 'Mail', 'Queue', 'Job', 'Cache', 'Session',
+         'vendor', 'src', 'lib', 'tests', 'Support', 'Database', 'Migration']
+
+queries = ['UserController', 'invoicerepo', 'src/Model/Order',
+           'evlistener', 'QueueJobTest']
+
+
+def generate_paths(count):
+    paths = set()
+    generator = random.Random(0)
+
+    while len(paths) < count:
+        depth = generator.randint(1, 6)
+        directories = [generator.choice(words) for i in range(depth)]
+        name = ''.join(generator.choice(words)
+                       for i in range(generator.randint(1, 3)))
+        paths.add('/'.join(directories + [name + '.php']))
+
+    return sorted(paths)
+
+
+def main():
+    count = 200000
+    target = 100
+
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        target = float(sys.argv[2])
+
+    paths = generate_paths(count)
+
+    start = time.perf_counter()
+    matcher = PugdebugMatcher(paths)
+    print('%d paths, prepared in %.1f ms' %
+          (len(paths), (time.perf_counter() - start) * 1000))
+
+    # Every query typed a keystroke at a time, then
+    # searched for from scratch at every keystroke
+    for narrowing in (True, False):
+        times = []
+        for query in queries:
+            matcher.reset()
+            for length in range(1, len(query) + 1):
+                if not narrowing:
+                    matcher.reset()
+                start = time.perf_counter()
+                matcher.search(query[:length])
+                times.append((time.perf_counter() - start) * 1000)
+
+        times.sort()
+        print('%s: %d keystrokes, median %.1f ms, 95th percentile %.1f ms, '
+              'max %.1f ms' % ('narrowing' if narrowing else 'from scratch',
+                               len(times), times[len(times) // 2],
+                               times[int(len(times) * 0.95)], times[-1]))
+
+        if narrowing:
+            slowest = times[-1]
+
+    print('target %.0f ms per keystroke when typing: %s' %
+          (target, 'met' if slowest <= target else 'missed'))
+
+
+if __name__ == '__main__':
+    main()
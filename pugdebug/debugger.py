@@ -11,7 +11,8 @@ from collections import deque
 from PyQt5.QtCore import QObject, pyqtSignal
 
 from pugdebug.server import PugdebugServer
-from pugdebug import projects
+from pugdebug.tuner import PugdebugFeatureTuner
+from pugdebug import settings, projects
 
 
 class PugdebugDebugger(QObject):
@@ -27,17 +28,21 @@ class PugdebugDebugger(QObject):
     current_file = ''
     current_line = 0
 
+    tuner = None
+
     server_stopped_signal = pyqtSignal()
     debugging_started_signal = pyqtSignal()
     debugging_post_start_signal = pyqtSignal()
     debugging_stopped_signal = pyqtSignal()
     step_command_signal = pyqtSignal()
-    got_all_variables_signal = pyqtSignal(object)
+    got_all_variables_signal = pyqtSignal(object, int)
     got_stacktraces_signal = pyqtSignal(object)
+    got_property_value_signal = pyqtSignal(object)
     breakpoint_removed_signal = pyqtSignal(int)
     breakpoints_listed_signal = pyqtSignal(list)
     expression_evaluated_signal = pyqtSignal(int, dict)
     expressions_evaluated_signal = pyqtSignal(list)
+    debugger_features_changed_signal = pyqtSignal(dict)
 
     error_signal = pyqtSignal(str)
 
@@ -106,10 +111,18 @@ class PugdebugDebugger(QObject):
             self.handle_got_stacktraces
         )
 
+        # Property value signals
+        connection.got_property_value_signal.connect(
+            self.handle_got_property_value
+        )
+
         # Breakpoints signals
         connection.set_breakpoint_signal.connect(
             self.handle_set_breakpoint
         )
+        connection.updated_breakpoints_signal.connect(
+            self.handle_updated_breakpoints
+        )
         connection.removed_breakpoint_signal.connect(
             self.handle_removed_breakpoint
         )
@@ -125,7 +138,15 @@ class PugdebugDebugger(QObject):
             self.handle_expressions_evaluated
         )
 
+        # Adaptive debugger features signals
+        connection.post_step_measured_signal.connect(
+            self.handle_post_step_measured
+        )
+
         # Error signals
+        connection.command_timeout_signal.connect(
+            self.handle_command_timeout
+        )
         connection.connection_error_signal.connect(
             self.handle_connection_error
         )
@@ -189,6 +210,8 @@ class PugdebugDebugger(QObject):
         self.init_message = connection.init_message
         self.current_connection = connection
 
+        self.reset_tuner()
+
         self.debugging_started_signal.emit()
 
     def post_start_command(self, post_start_data):
@@ -271,14 +294,61 @@ class PugdebugDebugger(QObject):
         self.step_command_signal.emit()
 
     def post_step_command(self, post_step_data):
+        if self.tuner is not None:
+            post_step_data['debugger_features'] = self.tuner.features()
+
         self.current_connection.post_step_command(post_step_data)
 
-    def handle_got_variables(self, variables):
+    def reset_tuner(self):
+        """Reset the tuner of the debugger features
+
+        If the adaptive debugger features are turned on for the project,
+        tune them starting from the configured ones.
+        """
+        with settings.open_group('project/' + projects.active()):
+            if settings.value('debugger/adaptive_features'):
+                self.tuner = PugdebugFeatureTuner(
+                    settings.value('debugger/max_depth'),
+                    settings.value('debugger/max_children'),
+                    settings.value('debugger/max_data'),
+                    settings.value('debugger/step_latency_budget') / 1000
+                )
+            else:
+                self.tuner = None
+
+        features = self.tuner.features() if self.tuner is not None else {}
+        self.debugger_features_changed_signal.emit(features)
+
+    def add_render_time(self, elapsed):
+        """Add the time it took to render the results of a step
+        """
+        if self.tuner is not None:
+            self.tuner.add_render_time(elapsed)
+
+    def handle_post_step_measured(self, elapsed, reply_size):
+        """Handle when the post step command is measured
+
+        Let the tuner lower or raise the debugger features for the
+        following steps.
+        """
+        if self.tuner is not None:
+            if self.tuner.measure(elapsed, reply_size):
+                self.debugger_features_changed_signal.emit(
+                    self.tuner.features()
+                )
+
+    def get_frame_variables(self, depth):
+        """Get the variables of the stack frame at the given depth
+        """
+        self.current_connection.get_frame_variables(depth)
+
+    def handle_got_variables(self, variables, depth):
         """Handle when server recieves all variables
 
-        Emit a signal with all variables received.
+        Emit a signal with all variables received and the depth of the
+        stack frame they belong to.
         """
-        self.got_all_variables_signal.emit(variables)
+        self.got_all_variables_signal.emit(variables, depth)
 
     def handle_got_stacktraces(self, stacktraces):
         """Handle when server receives stacktraces
@@ -287,6 +357,18 @@ class PugdebugDebugger(QObject):
         """
         self.got_stacktraces_signal.emit(stacktraces)
 
+    def get_property_value(self, request):
+        """Get a chunk of the value of a variable
+        """
+        self.current_connection.get_property_value(request)
+
+    def handle_got_property_value(self, property_value):
+        """Handle when server receives a chunk of a variable's value
+
+        Emit a signal with the chunk.
+        """
+        self.got_property_value_signal.emit(property_value)
+
     def set_breakpoint(self, breakpoint):
         self.current_connection.set_breakpoint(breakpoint)
 
@@ -294,6 +376,13 @@ class PugdebugDebugger(QObject):
         if successful:
             self.list_breakpoints()
 
+    def update_breakpoints(self, breakpoints):
+        self.current_connection.update_breakpoints(breakpoints)
+
+    def handle_updated_breakpoints(self, successful):
+        # List them even if some failed, to show what xdebug has
+        self.list_breakpoints()
+
     def remove_breakpoint(self, breakpoint_id):
         self.current_connection.remove_breakpoint(breakpoint_id)
 
@@ -330,6 +419,7 @@ class PugdebugDebugger(QObject):
 
     def set_debugger_features(self):
         if self.is_connected():
+            self.reset_tuner()
             self.current_connection.set_debugger_features()
 
     def handle_server_error(self, error):
@@ -337,6 +427,19 @@ class PugdebugDebugger(QObject):
         """
         self.error_signal.emit(error)
 
+    def cancel_command(self):
+        """Cancel waiting for the reply to the current command
+        """
+        if self.is_connected():
+            self.current_connection.cancel()
+
+    def handle_command_timeout(self, action, error):
+        """Handle when a command times out or gets cancelled
+
+        The connection is still usable, so only report the error.
+        """
+        self.error_signal.emit("Command %s during %s action" % (error, action))
+
     def handle_connection_error(self, action, error):
         """Handle when an error occurs in the connection
 
@@ -1,13 +1,61 @@
 # -*- coding: utf-8 -*-
 
-from PyQt5.QtCore import QDir, pyqtSignal
-from PyQt5.QtWidgets import (QTreeView, QHeaderView, QFileSystemModel,
+import os
+
+from PyQt5.QtCore import (Qt, QAbstractItemModel, QModelIndex,
+                          QFileSystemWatcher, pyqtSignal)
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import (QTreeView, QHeaderView, QFileIconProvider,
                              QMessageBox)
 
 from pugdebug import settings, projects, utils
+from pugdebug.models import file_search
+
+
+class FileBrowserNode():
+
+    def __init__(self, parent, name, is_dir, is_ignored):
+        self.parent = parent
+        self.name = name
+        self.is_dir = is_dir
+        self.is_ignored = is_ignored
+
+        # Children are listed when the directory is expanded, if it is
+        # not scanned by the file index yet, when it gets scanned
+        self.children = None
+        self.pending = False
+
+        # Row of the node in the children of its parent
+        self.row = 0
+
+        if parent is None or parent.path == '':
+            self.path = name
+        else:
+            self.path = parent.path + '/' + name
+
+    def get_key(self):
+        # Directories first, then files, by name
+        return (not self.is_dir, self.name.lower(), self.name,
+                self.is_ignored)
+
+    def number_children(self):
+        for row, child in enumerate(self.children):
+            child.row = row
+
 
+class FileBrowserModel(QAbstractItemModel):
+    """The files of the project, as listed by the project file index
 
-class FileBrowserModel(QFileSystemModel):
+    Directories are listed when they are expanded, from the listings
+    the file index keeps. Files and directories ignored by the project
+    are not indexed. Ignored directories are shown greyed out, they are
+    listed from the disk when expanded and are not watched for changes.
+    Hidden files are shown, hidden directories are shown as the ignored
+    ones, as the file index does not index them.
+
+    Only the expanded directories of the project are watched, a change
+    in them scans the file index for changes.
+    """
 
     file_activated = pyqtSignal(str)
     root_path_change_failed = pyqtSignal(str)
@@ -15,10 +63,18 @@ class FileBrowserModel(QFileSystemModel):
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self.setFilter(QDir.AllEntries |
-                       QDir.NoDotAndDotDot |
-                       QDir.AllDirs |
-                       QDir.Hidden)
+        self.icon_provider = QFileIconProvider()
+        self.ignored_color = QColor(Qt.gray)
+
+        self.project_root = None
+        self.invalid_root_path = None
+        self.root = FileBrowserNode(None, '', True, False)
+
+        self.watcher = QFileSystemWatcher()
+        self.watcher.directoryChanged.connect(self.handle_directory_changed)
+
+        file_indexer = file_search.get_indexer()
+        file_indexer.index_updated_signal.connect(self.handle_index_updated)
 
         self.update_root_path()
         projects.active_project_changed().connect(self.update_root_path)
@@ -29,17 +85,262 @@ class FileBrowserModel(QFileSystemModel):
         self.setRootPath(project_root)
 
     def setRootPath(self, new_path):
+        self.beginResetModel()
+
+        self.unwatch(self.root)
+        self.root = FileBrowserNode(None, '', True, False)
+
         if utils.is_readable_dir(new_path, isabs=True):
+            self.project_root = new_path
             self.invalid_root_path = None
-            return super().setRootPath(new_path)
         else:
+            self.project_root = None
             self.invalid_root_path = new_path
+
+        self.endResetModel()
+
+        if self.invalid_root_path is not None:
             self.root_path_change_failed.emit(new_path)
-            return self.index(self.rootPath())
+        else:
+            self.fetch_children(self.root)
+
+    def get_index(self):
+        """Get the file index of the project, if it is of this root
+        """
+        index = file_search.get_indexer().index
+
+        if index is None or index.root != self.project_root:
+            return None
+
+        return index
+
+    def get_full_path(self, node):
+        return os.path.join(self.project_root, node.path)
+
+    def list_children(self, node):
+        """List the children of a directory node
+
+        Returns None if the directory is not scanned by the index yet.
+        """
+        if node.is_ignored:
+            listing = self.list_ignored_directory(node)
+            dirs, ignored_dirs, files = [], listing['dirs'], listing['files']
+        else:
+            index = self.get_index()
+            entries = index.get_entries(node.path) if index else None
+
+            if entries is None:
+                return None
+
+            dirs, ignored_dirs, files = entries
+
+        children = [FileBrowserNode(node, name, True, False)
+                    for name in dirs]
+        children.extend(FileBrowserNode(node, name, True, True)
+                        for name in ignored_dirs)
+        # Files in ignored directories are ignored too
+        children.extend(FileBrowserNode(node, name, False, node.is_ignored)
+                        for name in files)
+
+        children.sort(key=FileBrowserNode.get_key)
+
+        return children
+
+    def list_ignored_directory(self, node):
+        index = self.get_index()
+        full_path = self.get_full_path(node)
+
+        if index is None:
+            return {'dirs': [], 'files': []}
+
+        listing = index.list_directory(full_path, None)
+
+        return {'dirs': listing['dirs'] + listing['hidden_dirs'],
+                'files': listing['files'] + listing['hidden_files']}
+
+    def fetch_children(self, node):
+        children = self.list_children(node)
+
+        if children is None:
+            node.children = []
+            node.pending = True
+            return
+
+        node.pending = False
+
+        if len(children) > 0:
+            parent = self.get_model_index(node)
+            self.beginInsertRows(parent, 0, len(children) - 1)
+            node.children = children
+            node.number_children()
+            self.endInsertRows()
+        else:
+            node.children = []
+
+        if not node.is_ignored:
+            self.watcher.addPath(self.get_full_path(node))
+
+    def update_children(self, node):
+        """List a directory again, keeping the children that did not change
+
+        The children of the directories that are listed are updated too.
+        """
+        children = self.list_children(node)
+
+        if children is None:
+            return
+
+        was_pending = node.pending
+        node.pending = False
+
+        parent = self.get_model_index(node)
+
+        if len(node.children) == 0 and len(children) > 0:
+            self.beginInsertRows(parent, 0, len(children) - 1)
+            node.children = children
+            node.number_children()
+            self.endInsertRows()
+
+        keys = {child.get_key() for child in children}
+        for row in reversed(range(len(node.children))):
+            if node.children[row].get_key() not in keys:
+                self.unwatch(node.children[row])
+                self.beginRemoveRows(parent, row, row)
+                del node.children[row]
+                node.number_children()
+                self.endRemoveRows()
+
+        for row, child in enumerate(children):
+            if (row < len(node.children) and
+                    node.children[row].get_key() == child.get_key()):
+                continue
+
+            self.beginInsertRows(parent, row, row)
+            node.children.insert(row, child)
+            node.number_children()
+            self.endInsertRows()
+
+        if was_pending and not node.is_ignored:
+            self.watcher.addPath(self.get_full_path(node))
+
+        for child in node.children:
+            if (child.is_dir and not child.is_ignored and
+                    child.children is not None):
+                self.update_children(child)
+
+    def unwatch(self, node):
+        """Stop watching a directory node and the directories in it
+        """
+        if not node.is_dir or node.children is None:
+            return
+
+        if not node.is_ignored and self.project_root is not None:
+            self.watcher.removePath(self.get_full_path(node))
+
+        for child in node.children:
+            self.unwatch(child)
+
+    def handle_directory_changed(self, path):
+        file_search.get_indexer().refresh()
+
+    def handle_index_updated(self, generation, files, matcher):
+        if self.root.children is not None and self.get_index() is not None:
+            self.update_children(self.root)
+
+    def get_node(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self.root
+
+    def get_model_index(self, node):
+        if node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.get_node(parent)
+
+        if (node.children is None or column != 0 or
+                row < 0 or row >= len(node.children)):
+            return QModelIndex()
+
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+
+        return self.get_model_index(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        node = self.get_node(parent)
+
+        if node.children is None:
+            return 0
+
+        return len(node.children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.get_node(parent)
+
+        if node.children is None:
+            return node.is_dir
+
+        return len(node.children) > 0
+
+    def canFetchMore(self, parent):
+        node = self.get_node(parent)
+        return node.is_dir and node.children is None
+
+    def fetchMore(self, parent):
+        node = self.get_node(parent)
+        if node.is_dir and node.children is None:
+            self.fetch_children(node)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        node = index.internalPointer()
+
+        if role == Qt.DisplayRole:
+            return node.name
+        elif role == Qt.DecorationRole:
+            if node.is_dir:
+                return self.icon_provider.icon(QFileIconProvider.Folder)
+            return self.icon_provider.icon(QFileIconProvider.File)
+        elif role == Qt.ForegroundRole and node.is_ignored:
+            return self.ignored_color
+        elif role == Qt.ToolTipRole and node.is_ignored:
+            return "Ignored by the project"
+
+        return None
+
+    def unload(self, index):
+        """Forget the children of an ignored directory
+
+        It is listed again when it is expanded again, as it is not
+        watched for changes.
+        """
+        node = self.get_node(index)
+
+        if not node.is_ignored or node.children is None:
+            return
+
+        if len(node.children) > 0:
+            self.beginRemoveRows(index, 0, len(node.children) - 1)
+            node.children = None
+            self.endRemoveRows()
+        else:
+            node.children = None
 
     def activate_item(self, index):
-        if not self.isDir(index):
-            self.file_activated.emit(self.filePath(index))
+        node = self.get_node(index)
+        if index.isValid() and not node.is_dir:
+            self.file_activated.emit(self.get_full_path(node))
 
 
 class FileBrowserView(QTreeView):
@@ -51,25 +352,18 @@ class FileBrowserView(QTreeView):
         self.setModel(model)
 
         self.update_root_path()
-        model.rootPathChanged.connect(self.update_root_path)
         model.root_path_change_failed.connect(self.update_root_path)
 
         self.header().setSectionResizeMode(QHeaderView.ResizeToContents)
         self.header().setStretchLastSection(False)
         self.setHeaderHidden(True)
 
-        # Hide extra columns (Size, Type, Date Modified)
-        self.setColumnHidden(1, True)
-        self.setColumnHidden(2, True)
-        self.setColumnHidden(3, True)
-
         self.activated.connect(model.activate_item)
+        self.collapsed.connect(model.unload)
 
     def update_root_path(self):
         model = self.model()
-        if model.invalid_root_path is None:
-            self.setRootIndex(model.index(model.rootPath()))
-        else:
+        if model.invalid_root_path is not None:
             msg = ('Project root path \'%s\' does not exist or '
                    'cannot be read' % model.invalid_root_path)
             QMessageBox.warning(self, '', msg)
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import pickle
+import tempfile
+
+from pugdebug.ignore import PugdebugIgnoreRules, is_ignored
+
+
+class PugdebugFileIndex():
+    """An index of the files of a project
+
+    The listing of every directory is kept with the modification time of
+    the directory. Scanning again lists only the directories that changed
+    since, which are the ones that had entries added, removed or renamed.
+
+    Paths ignored by the .gitignore files of the project, or by the
+    project's excludes, are not indexed. Ignored directories are not
+    descended into. Hidden files and directories are not indexed either,
+    but they are listed with the directories, to be browsed.
+    """
+
+    # Bump when the format of the saved index changes
+    version = 3
+
+    ignore_file_name = '.gitignore'
+
+    # Hidden directories that are not even listed
+    skipped_dirs = ('.git',)
+
+    def __init__(self, root, excludes=()):
+        self.root = root
+        self.excludes = PugdebugIgnoreRules(excludes)
+
+        # Listings of directories by their paths relative to the root
+        self.directories = {}
+
+        # Files that are not ignored, by the paths of their directories,
+        # with the listings and ignore rules they were filtered with
+        self.visible = {}
+
+        # Compiled ignore files, by the paths of their directories
+        self.rules = {}
+
+        self.files = None
+
+    def scan(self):
+        """Scan the project for changes
+
+        Returns True if the files of the project changed.
+        """
+        changed = False
+
+        directories = {}
+        visible = {}
+
+        paths = [('', (('', self.excludes),))]
+
+        while len(paths) > 0:
+            path, rules = paths.pop()
+            full_path = os.path.join(self.root, path)
+
+            try:
+                modified = os.stat(full_path).st_mtime_ns
+            except OSError:
+                changed = True
+                continue
+
+            listing = self.directories.get(path)
+
+            if listing is None or listing['modified'] != modified:
+                listing = self.list_directory(full_path, modified)
+                changed = True
+
+            directories[path] = listing
+
+            prefix = path + '/' if path else ''
+
+            directory_rules = self.get_rules(path, full_path, listing)
+            if directory_rules is not None:
+                rules = rules + ((prefix, directory_rules),)
+
+            previous = self.visible.get(path)
+            visible[path] = self.filter_files(path, prefix, listing, rules)
+
+            # Files that did not change are kept as they were
+            if previous is None or visible[path][2] is not previous[2]:
+                changed = True
+
+            for name in listing['dirs']:
+                dir_path = prefix + name
+                if not is_ignored(rules, dir_path, True):
+                    paths.append((dir_path, rules))
+
+        if directories.keys() != self.directories.keys():
+            changed = True
+
+        self.directories = directories
+        self.visible = visible
+
+        if changed:
+            self.files = None
+
+        return changed
+
+    def filter_files(self, path, prefix, listing, rules):
+        """Filter out the ignored files of a directory
+
+        The files are filtered again only if the listing or the
+        ignore rules changed since they were filtered last.
+        """
+        previous = self.visible.get(path)
+
+        if (previous is not None and previous[0] is listing and
+                previous[1] == rules):
+            return previous
+
+        files = [name for name in listing['files']
+                 if not is_ignored(rules, prefix + name, False)]
+
+        if previous is not None and previous[2] == files:
+            files = previous[2]
+
+        return (listing, rules, files)
+
+    def get_rules(self, path, full_path, listing):
+        """Get the compiled ignore file of a directory, if it has one
+
+        Ignore files can change without their directories changing,
+        they are checked on every scan.
+        """
+        if not listing['has_ignore_file']:
+            self.rules.pop(path, None)
+            return None
+
+        try:
+            modified = os.stat(os.path.join(
+                full_path, self.ignore_file_name)).st_mtime_ns
+        except OSError:
+            modified = None
+
+        ignore_file = listing.get('ignore_file')
+
+        if ignore_file is None or ignore_file[0] != modified:
+            ignore_file = (modified, self.read_ignore_file(full_path))
+            listing['ignore_file'] = ignore_file
+
+        compiled = self.rules.get(path)
+
+        if compiled is None or compiled[0] != ignore_file:
+            compiled = (ignore_file, PugdebugIgnoreRules(ignore_file[1]))
+            self.rules[path] = compiled
+
+        return compiled[1]
+
+    def read_ignore_file(self, full_path):
+        try:
+            with open(os.path.join(full_path, self.ignore_file_name)) as f:
+                return f.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            return []
+
+    def list_directory(self, full_path, modified):
+        listing = {
+            'modified': modified,
+            'files': [],
+            'dirs': [],
+            'hidden_files': [],
+            'hidden_dirs': [],
+            'has_ignore_file': False
+        }
+
+        try:
+            entries = list(os.scandir(full_path))
+        except OSError:
+            return listing
+
+        for entry in entries:
+            hidden = entry.name.startswith('.')
+
+            if entry.name == self.ignore_file_name:
+                listing['has_ignore_file'] = True
+
+            try:
+                # Symlinked directories are not followed, they can loop
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in self.skipped_dirs:
+                        continue
+                    key = 'hidden_dirs' if hidden else 'dirs'
+                elif entry.is_file():
+                    key = 'hidden_files' if hidden else 'files'
+                else:
+                    continue
+            except OSError:
+                continue
+
+            listing[key].append(entry.name)
+
+        return listing
+
+    def get_entries(self, path):
+        """Get the entries of a directory, relative to the project root
+
+        Returns the names of the directories that are not ignored, of the
+        ignored directories and of the files that are not ignored, or None
+        if the directory was not scanned. Hidden directories are not
+        indexed, they are with the ignored directories. Hidden files that
+        are not ignored are with the files.
+        """
+        visible = self.visible.get(path)
+
+        if visible is None or visible[0] is None:
+            return None
+
+        listing, rules, files = visible
+        prefix = path + '/' if path else ''
+
+        dirs = []
+        ignored_dirs = list(listing['hidden_dirs'])
+
+        for name in listing['dirs']:
+            if is_ignored(rules, prefix + name, True):
+                ignored_dirs.append(name)
+            else:
+                dirs.append(name)
+
+        files = files + [name for name in listing['hidden_files']
+                         if not is_ignored(rules, prefix + name, False)]
+
+        return dirs, ignored_dirs, files
+
+    def get_files(self):
+        """Get the paths of all files, relative to the project root
+        """
+        if self.files is None:
+            files = []
+
+            for path, (listing, rules, names) in self.visible.items():
+                prefix = path + '/' if path else ''
+                files.extend(prefix + name for name in names)
+
+            files.sort()
+            self.files = files
+
+        return self.files
+
+    def save(self, path):
+        data = {
+            'version': self.version,
+            'root': self.root,
+            'directories': self.directories,
+            'files': {path: names
+                      for path, (listing, rules, names)
+                      in self.visible.items()}
+        }
+
+        try:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+
+            fd, temporary_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        except OSError:
+            pass
+
+    def load(self, path):
+        """Load a saved index
+
+        Returns False if there is no index saved for this root.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+
+            if data['version'] != self.version or data['root'] != self.root:
+                return False
+
+            self.directories = data['directories']
+
+            # Filtered again on the next scan
+            self.visible = {path: (None, None, names)
+                            for path, names in data['files'].items()}
+        except (OSError, EOFError, KeyError, TypeError,
+                pickle.UnpicklingError):
+            return False
+
+        self.files = None
+
+        return True
@@ -10,7 +10,7 @@
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem
 
-from pugdebug import settings, projects
+from pugdebug import settings, projects, utils
 
 
 class PugdebugBreakpointViewer(QTreeWidget):
@@ -35,6 +35,16 @@ class PugdebugBreakpointViewer(QTreeWidget):
         self.clear()
 
         for breakpoint in breakpoints:
+            if not utils.is_line_breakpoint(breakpoint):
+                # Breaks on calls, wherever they are
+                function = utils.get_breakpoint_function(breakpoint)
+
+                item = QTreeWidgetItem([function + '()', '', ''])
+                item.setToolTip(0, "Break on calls of %s()" % function)
+
+                self.addTopLevelItem(item)
+                continue
+
             filename = self.__cut_filename(breakpoint['filename'])
             args = [
                 filename,
@@ -49,6 +59,9 @@ class PugdebugBreakpointViewer(QTreeWidget):
 
     def handle_item_double_clicked(self, item, column):
         file = item.text(2)
+        if not file:
+            return
+
         line = int(item.text(1))
 
         self.item_double_clicked_signal.emit(file, line)
@@ -9,13 +9,15 @@
 
 import math
 
-from PyQt5.QtCore import pyqtSignal, Qt, QRect, QSize
+from PyQt5.QtCore import pyqtSignal, Qt, QRect, QSize, QPoint
 from PyQt5.QtWidgets import (QWidget, QPlainTextEdit, QTextEdit,
                              QShortcut, QInputDialog)
 from PyQt5.QtGui import (QColor, QTextFormat, QTextCursor, QPainter,
                          QFont, QKeySequence)
 
 from pugdebug import settings, syntaxer, pugdebug
+from pugdebug.gui.document_search import PugdebugDocumentSearchBar
+from pugdebug.text_search import PugdebugMatchIndex
 
 
 class PugdebugDocument(QPlainTextEdit):
@@ -27,11 +29,39 @@ class PugdebugDocument(QPlainTextEdit):
 
     document_double_clicked_signal = pyqtSignal(str, int)
 
+    # Number of lines of a large file loaded at once
+    large_file_window = 4000
+
+    # Most matches of a search highlighted at once, in the viewport
+    max_match_selections = 1000
+
     def __init__(self, document_model):
         super().__init__()
 
         self.current_line = 0
 
+        # Line of a large file the document starts at, zero based
+        self.line_offset = 0
+        self.loading_window = False
+
+        # Highlight of the line of the cursor, and highlights of the
+        # matches of the search in the viewport
+        self.line_selection = None
+        self.match_selections = []
+
+        # Matches of the search, and the indexes of the highlighted
+        # matches with the index of the current match
+        self.match_index = None
+        self.highlighted_matches = None
+
+        self.search_bar = PugdebugDocumentSearchBar(self)
+        self.search_bar.search_requested_signal.connect(self.search)
+        self.search_bar.next_requested_signal.connect(self.move_to_next_match)
+        self.search_bar.previous_requested_signal.connect(
+            self.move_to_previous_match
+        )
+        self.search_bar.closed_signal.connect(self.close_search)
+
         self.update_editor_features()
 
         self.line_numbers = PugdebugLineNumbers(self)
@@ -44,16 +74,28 @@ class PugdebugDocument(QPlainTextEdit):
 
         self.cursorPositionChanged.connect(self.highlight)
 
-        self.setPlainText(document_model.contents)
+        if document_model.is_large:
+            self.setPlainText(
+                document_model.get_text(0, self.large_file_window)
+            )
+        else:
+            self.setPlainText(document_model.contents)
 
         self.remove_line_highlights()
 
         self.syntaxer = syntaxer.Syntaxer(self.document())
+        self.syntaxer.formats_ready_signal.connect(
+            self.highlight_visible_blocks
+        )
+        self.updateRequest.connect(self.highlight_visible_blocks)
+        self.highlight_visible_blocks()
+
+        self.verticalScrollBar().valueChanged.connect(self.handle_scrolled)
 
         self.viewport().setCursor(Qt.ArrowCursor)
 
         self.shortcut_search = QShortcut(QKeySequence("Ctrl+F"), self)
-        self.shortcut_search.activated.connect(self.show_search_modal)
+        self.shortcut_search.activated.connect(self.show_search_bar)
 
         self.shortcut_move_to_line = QShortcut(QKeySequence("Ctrl+G"), self)
         self.shortcut_move_to_line.activated.connect(self.show_move_to_line)
@@ -72,7 +114,8 @@ class PugdebugDocument(QPlainTextEdit):
         self.setLineWrapMode(wrapMode)
 
     def line_numbers_width(self):
-        digits = math.floor(math.log10(self.blockCount()) + 1)
+        line_count = self.line_offset + self.blockCount()
+        digits = math.floor(math.log10(line_count) + 1)
         return (self.line_numbers.padding_left +
                 digits * self.fontMetrics().width('0') +
                 self.line_numbers.padding_right)
@@ -99,6 +142,8 @@ class PugdebugDocument(QPlainTextEdit):
                                             self.line_numbers_width(),
                                             cr.height()))
 
+        self.move_search_bar()
+
     def paint_line_numbers(self, event):
         """Paint the line numbers
 
@@ -130,7 +175,7 @@ class PugdebugDocument(QPlainTextEdit):
             if not block.isVisible() or block_top > event.rect().bottom():
                 break
 
-            line_number = block_number + 1
+            line_number = self.line_offset + block_number + 1
             painter.setPen(Qt.black)
             painter.drawText(0, block_top,
                              number_width, number_height,
@@ -141,7 +186,7 @@ class PugdebugDocument(QPlainTextEdit):
             block_has_breakpoint = False
             document_path = self.document_model.path
             for breakpoint in pugdebug.Pugdebug.breakpoints:
-                if (breakpoint['local_filename'] == document_path and
+                if (breakpoint.get('local_filename') == document_path and
                         int(breakpoint['lineno']) == line_number):
                     block_has_breakpoint = True
                     break
@@ -180,7 +225,7 @@ class PugdebugDocument(QPlainTextEdit):
         if len(block.text()) == 0:
             return
 
-        line_number = block.blockNumber() + 1
+        line_number = self.line_offset + block.blockNumber() + 1
 
         self.document_double_clicked_signal.emit(path, line_number)
 
@@ -189,17 +234,86 @@ class PugdebugDocument(QPlainTextEdit):
 
     def move_to_line(self, line, is_current=True):
         """Move cursor to specified line
+
+        For large files, load the lines around the line first.
         """
+        if self.document_model.is_large:
+            self.load_window_around(line - 1)
+
         document = self.document()
-        line = min(max(line, 1), document.blockCount())
-        cursor = QTextCursor(document.findBlockByNumber(line - 1))
+        block_number = min(max(line - self.line_offset, 1),
+                           document.blockCount()) - 1
+        cursor = QTextCursor(document.findBlockByNumber(block_number))
 
         self.setTextCursor(cursor)
 
         if is_current:
-            self.current_line = line
+            self.current_line = self.line_offset + block_number + 1
             self.rehighlight_breakpoint_lines()
 
+    def load_window_around(self, line):
+        """Load the lines of a large file around a line, zero based
+
+        The lines are loaded again only if the line is not loaded,
+        or it is near the start or the end of the loaded lines.
+        """
+        margin = self.large_file_window // 4
+        start = self.line_offset
+        end = self.line_offset + self.blockCount()
+
+        is_near_start = line < start + margin and start > 0
+        is_near_end = (line >= end - margin and
+                       self.blockCount() >= self.large_file_window)
+
+        if line < start or line >= end or is_near_start or is_near_end:
+            self.load_window(line)
+
+    def load_window(self, line):
+        """Load the lines of a large file around a line, zero based
+
+        Lines before the loaded ones are not tokenized, the lexer
+        starts in the PHP state.
+        """
+        first = max(0, line - self.large_file_window // 2)
+
+        self.loading_window = True
+
+        self.line_offset = first
+
+        self.syntaxer.reset()
+
+        self.setPlainText(self.document_model.get_text(
+            first, first + self.large_file_window
+        ))
+
+        self.syntaxer.highlight(('root',) if first == 0 else ('root', 'php'))
+
+        self.update_line_numbers_width()
+
+        self.loading_window = False
+
+        # The highlighted matches are in the lines replaced
+        self.highlighted_matches = None
+        self.highlight_visible_matches()
+
+    def handle_scrolled(self, value):
+        """Load more lines of a large file when scrolled to the end
+        of the loaded lines
+        """
+        if not self.document_model.is_large or self.loading_window:
+            return
+
+        scroll_bar = self.verticalScrollBar()
+
+        is_at_start = value == scroll_bar.minimum() and self.line_offset > 0
+        is_at_end = (value == scroll_bar.maximum() and
+                     self.blockCount() >= self.large_file_window)
+
+        if is_at_start or is_at_end:
+            line = self.line_offset + self.firstVisibleBlock().blockNumber()
+            self.load_window(line)
+            scroll_bar.setValue(line - self.line_offset)
+
     def highlight(self):
         selection = QTextEdit.ExtraSelection()
 
@@ -217,7 +331,16 @@ class PugdebugDocument(QPlainTextEdit):
             selection.cursor.movePosition(QTextCursor.EndOfBlock,
                                           QTextCursor.KeepAnchor)
 
-        self.setExtraSelections([selection])
+        self.line_selection = selection
+        self.update_extra_selections()
+
+    def update_extra_selections(self):
+        selections = list(self.match_selections)
+
+        if self.line_selection is not None:
+            selections.insert(0, self.line_selection)
+
+        self.setExtraSelections(selections)
 
     def remove_line_highlights(self):
         """Remove line highlights
@@ -230,11 +353,148 @@ class PugdebugDocument(QPlainTextEdit):
         self.move_to_line(1, False)
         self.rehighlight_breakpoint_lines()
 
-        self.setExtraSelections([])
+        self.line_selection = None
+        self.update_extra_selections()
+
+    def show_search_bar(self):
+        """Show the search bar
+
+        Search for the selected text, if any.
+        """
+        text = self.textCursor().selectedText()
+        if '\u2029' in text:
+            text = ''
+
+        self.search_bar.adjustSize()
+        self.move_search_bar()
+        self.search_bar.open_bar(text)
+
+    def move_search_bar(self):
+        """Keep the search bar in the top right corner of the viewport
+        """
+        viewport = self.viewport().geometry()
+        self.search_bar.move(
+            viewport.right() - self.search_bar.width() - 4,
+            viewport.top() + 4
+        )
+
+    def search(self, query):
+        """Find all the matches of the query in the document
+
+        The text is searched once per query, the matches are indexed, and
+        the first match after the cursor is selected.
+        """
+        self.build_match_index(query)
+
+        cursor = self.textCursor()
+        line = self.line_offset + cursor.blockNumber()
+        column = cursor.selectionStart() - cursor.block().position()
+
+        index = self.match_index.find(line, column)
+        self.move_to_match(index)
+
+    def build_match_index(self, query):
+        """Index the matches of the query in the whole document
+
+        Large files are searched in all their lines, not only in
+        the lines loaded. Their mapped bytes are searched, without
+        decoding the whole file.
+        """
+        if self.document_model.is_large:
+            text = self.document_model.mapped_file
+        else:
+            text = self.document_model.get_text(
+                0, self.document_model.get_line_count()
+            )
+
+        self.match_index = PugdebugMatchIndex(text, query)
+        self.highlighted_matches = None
+
+    def move_to_next_match(self):
+        if self.match_index is not None:
+            self.move_to_match(self.match_index.next())
+
+    def move_to_previous_match(self):
+        if self.match_index is not None:
+            self.move_to_match(self.match_index.previous())
+
+    def move_to_match(self, index):
+        """Select a match, and show the number of it
+        """
+        self.search_bar.set_count(index, len(self.match_index))
+
+        if index is not None:
+            line, column = self.match_index.get_match(index)
+
+            self.move_to_line(line + 1, False)
+
+            block = self.document().findBlockByNumber(line - self.line_offset)
+            cursor = QTextCursor(block)
+            cursor.setPosition(block.position() + column)
+            cursor.setPosition(block.position() + column +
+                               self.match_index.length,
+                               QTextCursor.KeepAnchor)
+            self.setTextCursor(cursor)
+
+        self.highlighted_matches = None
+        self.highlight_visible_matches()
+
+    def highlight_visible_matches(self):
+        """Highlight the matches of the search in the viewport
+
+        Only the visible matches get an extra selection, they are
+        highlighted again only when other matches become visible.
+        """
+        if self.match_index is None:
+            if len(self.match_selections) > 0:
+                self.match_selections = []
+                self.update_extra_selections()
+            return
+
+        first = self.firstVisibleBlock().blockNumber()
+
+        bottom = QPoint(0, self.viewport().height() - 1)
+        last = self.cursorForPosition(bottom).blockNumber()
+
+        matches = self.match_index.get_range(self.line_offset + first,
+                                             self.line_offset + last)
+        matches = matches[:self.max_match_selections]
+
+        highlighted = (matches, self.match_index.current)
+        if highlighted == self.highlighted_matches:
+            return
+        self.highlighted_matches = highlighted
+
+        document = self.document()
+        length = self.match_index.length
+
+        match_color = QColor(255, 238, 153)
+        current_color = QColor(255, 187, 68)
+
+        self.match_selections = []
+        for index in matches:
+            line, column = self.match_index.get_match(index)
+            block = document.findBlockByNumber(line - self.line_offset)
+
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setBackground(
+                current_color if index == self.match_index.current
+                else match_color
+            )
+            selection.cursor = QTextCursor(block)
+            selection.cursor.setPosition(block.position() + column)
+            selection.cursor.setPosition(block.position() + column + length,
+                                         QTextCursor.KeepAnchor)
+
+            self.match_selections.append(selection)
+
+        self.update_extra_selections()
+
+    def close_search(self):
+        self.match_index = None
+        self.highlight_visible_matches()
 
-    def show_search_modal(self):
-        text, ok = QInputDialog.getText(self, 'Search', 'Insert word')
-        self.find(text)
+        self.setFocus()
 
     def show_move_to_line(self):
         text, ok = QInputDialog.getText(self, 'Go To', 'Line number')
@@ -243,14 +503,116 @@ class PugdebugDocument(QPlainTextEdit):
     def handle_document_changed(self, document_model):
         """Handle when a document gets changed
 
-        Set the new contents of the document.
+        Apply only the changed lines to the document, so the scroll
+        position is kept and only the changed lines need to be
+        highlighted again.
 
-        Refresh the syntaxer.
+        If the changes are not known, set the new contents of the
+        document and refresh the syntaxer.
+
+        The matches of a search are found again in the new lines.
         """
-        self.setPlainText(document_model.contents)
+        if self.match_index is not None:
+            self.build_match_index(self.match_index.query)
+            self.search_bar.set_count(None, len(self.match_index))
+
+        if document_model.is_large:
+            line = self.line_offset + self.firstVisibleBlock().blockNumber()
+            self.load_window(line)
+            self.verticalScrollBar().setValue(line - self.line_offset)
+            return
+
+        changes = document_model.changes
+
+        if (changes is None or
+                changes.old_count != self.document().blockCount()):
+            self.syntaxer.reset()
+
+            self.line_offset = 0
+            self.setPlainText(document_model.contents)
+
+            self.syntaxer.highlight()
+            return
+
+        if not changes.has_changes():
+            return
+
+        scroll_position = self.verticalScrollBar().value()
+
+        if self.syntaxer.pending:
+            self.apply_changes(changes, document_model.lines)
+            self.syntaxer.highlight()
+        else:
+            self.syntaxer.shift_formats(changes)
+            self.apply_changes(changes, document_model.lines)
+
+        self.verticalScrollBar().setValue(scroll_position)
+
+        self.highlight_visible_blocks()
+
+    def apply_changes(self, changes, lines):
+        """Apply changes to the lines of the document
+
+        Changes are applied from the last one, so the block numbers of
+        the changes before it stay the same. All of them are applied in
+        one edit block, so the syntaxer gets to highlight the changed
+        blocks only when the blocks are numbered as in the new lines.
+        """
+        document = self.document()
+
+        cursor = QTextCursor(document)
+        cursor.beginEditBlock()
+
+        for tag, i1, i2, j1, j2 in reversed(changes.opcodes):
+            text = '\n'.join(lines[j1:j2])
+
+            if i1 == i2:
+                if i1 < document.blockCount():
+                    block = document.findBlockByNumber(i1)
+                    cursor.setPosition(block.position())
+                    cursor.insertText(text + '\n')
+                else:
+                    cursor.movePosition(QTextCursor.End)
+                    cursor.insertText('\n' + text)
+                continue
+
+            if j1 == j2 and i2 < document.blockCount():
+                # Remove the lines with their line endings
+                block = document.findBlockByNumber(i1)
+                cursor.setPosition(block.position())
+
+                block = document.findBlockByNumber(i2)
+                cursor.setPosition(block.position(), QTextCursor.KeepAnchor)
+            elif j1 == j2:
+                # Remove the last lines with the line ending before them
+                block = document.findBlockByNumber(i1 - 1)
+                cursor.setPosition(block.position() + block.length() - 1)
+                cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+            else:
+                block = document.findBlockByNumber(i1)
+                cursor.setPosition(block.position())
+
+                block = document.findBlockByNumber(i2 - 1)
+                cursor.setPosition(block.position() + block.length() - 1,
+                                   QTextCursor.KeepAnchor)
+
+            cursor.insertText(text)
+
+        cursor.endEditBlock()
+
+    def highlight_visible_blocks(self, rect=None, dy=0):
+        """Highlight the blocks visible in the viewport
+
+        The syntaxer tokenizes only the blocks that are not highlighted yet.
+        """
+        first = self.firstVisibleBlock().blockNumber()
+
+        bottom = QPoint(0, self.viewport().height() - 1)
+        last = self.cursorForPosition(bottom).blockNumber()
+
+        self.syntaxer.highlight_blocks(first, last)
 
-        self.syntaxer.setDocument(self.document())
-        self.syntaxer.highlight()
+        self.highlight_visible_matches()
 
     def get_path(self):
         return self.document_model.path
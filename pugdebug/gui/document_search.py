@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtWidgets import (QFrame, QLineEdit, QLabel, QToolButton,
+                             QHBoxLayout)
+
+
+class PugdebugDocumentSearchBar(QFrame):
+    """A bar to find text in a document, shown over the document
+
+    Enter moves to the next match, Shift+Enter to the previous one,
+    Escape closes the bar.
+    """
+
+    search_requested_signal = pyqtSignal(str)
+    next_requested_signal = pyqtSignal()
+    previous_requested_signal = pyqtSignal()
+    closed_signal = pyqtSignal()
+
+    # Milliseconds to wait for the next keystroke before searching
+    search_delay = 50
+
+    def __init__(self, parent):
+        super(PugdebugDocumentSearchBar, self).__init__(parent)
+
+        self.setFrameShape(QFrame.StyledPanel)
+        self.setAutoFillBackground(True)
+        self.setCursor(Qt.ArrowCursor)
+
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.search)
+
+        self.setup_layout()
+
+        self.hide()
+
+    def setup_layout(self):
+        self.query = PugdebugDocumentSearchLineEdit(self)
+        self.query.setPlaceholderText("Find in document")
+        self.query.textEdited.connect(self.start_timer)
+        self.query.enter_pressed_signal.connect(self.handle_enter_pressed)
+        self.query.escape_pressed_signal.connect(self.close_bar)
+
+        self.count = QLabel()
+        self.count.setMinimumWidth(
+            self.count.fontMetrics().width("00000 of 00000")
+        )
+        self.count.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+        self.previous_button = QToolButton()
+        self.previous_button.setArrowType(Qt.UpArrow)
+        self.previous_button.setToolTip("Previous match (Shift+Enter)")
+        self.previous_button.clicked.connect(
+            self.previous_requested_signal.emit
+        )
+
+        self.next_button = QToolButton()
+        self.next_button.setArrowType(Qt.DownArrow)
+        self.next_button.setToolTip("Next match (Enter)")
+        self.next_button.clicked.connect(self.next_requested_signal.emit)
+
+        self.close_button = QToolButton()
+        self.close_button.setText("x")
+        self.close_button.setToolTip("Close (Escape)")
+        self.close_button.clicked.connect(self.close_bar)
+
+        box_layout = QHBoxLayout()
+        box_layout.setContentsMargins(4, 2, 4, 2)
+        box_layout.addWidget(self.query)
+        box_layout.addWidget(self.count)
+        box_layout.addWidget(self.previous_button)
+        box_layout.addWidget(self.next_button)
+        box_layout.addWidget(self.close_button)
+
+        self.setLayout(box_layout)
+
+    def open_bar(self, text=''):
+        if text:
+            self.query.setText(text)
+            self.search()
+
+        self.show()
+        self.raise_()
+
+        self.query.setFocus()
+        self.query.selectAll()
+
+    def close_bar(self):
+        self.timer.stop()
+        self.hide()
+
+        self.closed_signal.emit()
+
+    def start_timer(self, text):
+        self.timer.start(self.search_delay)
+
+    def search(self):
+        self.timer.stop()
+        self.search_requested_signal.emit(self.query.text())
+
+    def handle_enter_pressed(self, backwards):
+        # Search for the text typed so far before moving on
+        if self.timer.isActive():
+            self.search()
+        elif backwards:
+            self.previous_requested_signal.emit()
+        else:
+            self.next_requested_signal.emit()
+
+    def get_query(self):
+        return self.query.text()
+
+    def set_count(self, current, count):
+        if self.query.text() == '':
+            self.count.setText('')
+        elif count == 0:
+            self.count.setText("No matches")
+        elif current is None:
+            self.count.setText("%d found" % count)
+        else:
+            self.count.setText("%d of %d" % (current + 1, count))
+
+
+class PugdebugDocumentSearchLineEdit(QLineEdit):
+
+    # Enter pressed, with whether shift was held
+    enter_pressed_signal = pyqtSignal(bool)
+    escape_pressed_signal = pyqtSignal()
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            backwards = bool(event.modifiers() & Qt.ShiftModifier)
+            self.enter_pressed_signal.emit(backwards)
+        elif event.key() == Qt.Key_Escape:
+            self.escape_pressed_signal.emit()
+        else:
+            super(PugdebugDocumentSearchLineEdit, self).keyPressEvent(event)
@@ -7,49 +7,139 @@
     license: GNU GPL v3, see LICENSE for more details
 """
 
+import collections
+
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtWidgets import QTabWidget, QTabBar
+from PyQt5.QtWidgets import QTabWidget, QTabBar, QMenu
 
 from pugdebug import settings
 
 
 class PugdebugDocumentViewer(QTabWidget):
 
-    tabs = {}
+    # Document widgets by their paths, and paths by the widgets. Tab
+    # indexes are not kept, they change when tabs are closed or moved
+    widgets_by_path = None
+    paths_by_widget = None
+
+    # Paths of the tabs, from the least recently used one
+    recently_used = None
+
+    # Paths of the tabs that are never closed to make room for new ones
+    pinned = None
 
     def __init__(self):
         super(PugdebugDocumentViewer, self).__init__()
 
+        self.widgets_by_path = {}
+        self.paths_by_widget = {}
+
+        self.recently_used = collections.OrderedDict()
+        self.pinned = set()
+
         # Use the extended tab bar widget to have middle click close tabs
         self.tab_bar = PugdebugTabBar()
         self.tab_bar.middle_clicked_signal.connect(self.tabCloseRequested.emit)
+        self.tab_bar.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tab_bar.customContextMenuRequested.connect(self.show_tab_menu)
         self.setTabBar(self.tab_bar)
 
         self.setTabsClosable(True)
 
+        self.currentChanged.connect(self.handle_current_changed)
+
         settings.edit_dialog_saved().connect(self.update_editor_features)
 
     def add_tab(self, document_widget, filename, path):
+        self.widgets_by_path[path] = document_widget
+        self.paths_by_widget[document_widget] = path
+
         tab_index = self.addTab(document_widget, filename)
         self.setCurrentIndex(tab_index)
-
-        self.tabs[tab_index] = path
+        self.mark_used(path)
 
     def close_tab(self, tab_index):
+        document_widget = self.widget(tab_index)
+
+        path = self.paths_by_widget.pop(document_widget, None)
+        self.widgets_by_path.pop(path, None)
+
+        self.recently_used.pop(path, None)
+        self.pinned.discard(path)
+
         self.removeTab(tab_index)
 
-        self.tabs.pop(tab_index, None)
+    def get_path(self, tab_index):
+        return self.paths_by_widget.get(self.widget(tab_index))
+
+    def handle_current_changed(self, tab_index):
+        path = self.get_path(tab_index)
+        if path is not None:
+            self.mark_used(path)
 
-        tabs = {}
+    def mark_used(self, path):
+        self.recently_used[path] = None
+        self.recently_used.move_to_end(path)
+
+    def get_least_recently_used(self, max_tabs):
+        """Get the paths of the tabs to close to keep at most max_tabs
+
+        Pinned tabs and the current tab are never closed.
+        """
+        number_to_close = self.count() - max_tabs
 
-        # Reindex the tabs
-        number_of_tabs = len(self.tabs)
-        if number_of_tabs > 0:
-            for index in range(0, number_of_tabs):
-                document_widget = self.widget(index)
-                tabs[index] = document_widget.get_path()
+        if number_to_close <= 0:
+            return []
 
-        self.tabs = tabs
+        current_path = self.get_path(self.currentIndex())
+
+        paths = []
+
+        for path in self.recently_used:
+            if len(paths) == number_to_close:
+                break
+
+            if path not in self.pinned and path != current_path:
+                paths.append(path)
+
+        return paths
+
+    def is_pinned(self, path):
+        return path in self.pinned
+
+    def toggle_pinned(self, tab_index):
+        path = self.get_path(tab_index)
+        if path is None:
+            return
+
+        if path in self.pinned:
+            self.pinned.remove(path)
+            self.setTabToolTip(tab_index, '')
+            self.setTabText(tab_index, self.tabText(tab_index)[2:])
+        else:
+            self.pinned.add(path)
+            self.setTabToolTip(tab_index, 'Pinned')
+            self.setTabText(tab_index, '\u2022 ' + self.tabText(tab_index))
+
+    def show_tab_menu(self, position):
+        tab_index = self.tab_bar.tabAt(position)
+        if tab_index == -1:
+            return
+
+        menu = QMenu(self)
+
+        if self.is_pinned(self.get_path(tab_index)):
+            pin_action = menu.addAction('Unpin tab')
+        else:
+            pin_action = menu.addAction('Pin tab')
+        pin_action.triggered.connect(lambda: self.toggle_pinned(tab_index))
+
+        close_action = menu.addAction('Close tab')
+        close_action.triggered.connect(
+            lambda: self.tabCloseRequested.emit(tab_index)
+        )
+
+        menu.exec_(self.tab_bar.mapToGlobal(position))
 
     def focus_tab(self, path):
         tab_index = self.find_tab_index_by_path(path)
@@ -57,11 +147,9 @@ class PugdebugDocumentViewer(QTabWidget):
             self.setCurrentIndex(tab_index)
 
     def find_tab_index_by_path(self, path):
-        tab_index = None
-        for i, p in self.tabs.items():
-            if p == path:
-                tab_index = i
-        return tab_index
+        document_widget = self.widgets_by_path.get(path)
+        if document_widget is not None:
+            return self.indexOf(document_widget)
 
     def get_current_document(self):
         index = self.currentIndex()
@@ -71,17 +159,15 @@ class PugdebugDocumentViewer(QTabWidget):
         return self.widget(index)
 
     def get_document_by_path(self, path):
-        tab_index = self.find_tab_index_by_path(path)
-        if tab_index is not None:
-            return self.widget(tab_index)
+        return self.widgets_by_path.get(path)
 
     def remove_line_highlights(self):
-        for index, path in self.tabs.items():
-            self.widget(index).remove_line_highlights()
+        for document_widget in self.widgets_by_path.values():
+            document_widget.remove_line_highlights()
 
     def update_editor_features(self):
-        for index, path in self.tabs.items():
-            self.widget(index).update_editor_features()
+        for document_widget in self.widgets_by_path.values():
+            document_widget.update_editor_features()
 
 
 class PugdebugTabBar(QTabBar):
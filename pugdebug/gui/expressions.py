@@ -10,7 +10,7 @@
 import base64
 
 from PyQt5.QtCore import Qt, pyqtSignal, QSize
-from PyQt5.QtGui import QIcon, QKeySequence
+from PyQt5.QtGui import QIcon, QKeySequence, QBrush
 from PyQt5.QtWidgets import (QMenu, QWidget, QTreeWidget, QTreeWidgetItem,
                              QAction, QToolBar, QVBoxLayout, QAbstractItemView)
 
@@ -21,6 +21,7 @@ class PugdebugExpressionViewer(QWidget):
 
     expression_added_signal = pyqtSignal(int, str)
     expression_changed_signal = pyqtSignal(int, str)
+    expression_revealed_signal = pyqtSignal(int, str)
 
     def __init__(self):
         super(PugdebugExpressionViewer, self).__init__()
@@ -38,14 +39,32 @@ class PugdebugExpressionViewer(QWidget):
         self.delete_action.setShortcutContext(Qt.WidgetShortcut)
         self.delete_action.triggered.connect(self.handle_delete_action)
 
+        # Action for evaluating only the expressions that can be seen
+        self.only_visible_action = QAction("Only &visible", self)
+        self.only_visible_action.setToolTip(
+            "Evaluate only the expressions that are visible or expanded"
+        )
+        self.only_visible_action.setCheckable(True)
+        self.only_visible_action.setChecked(
+            settings.value('expressions_viewer/only_visible')
+        )
+        self.only_visible_action.toggled.connect(
+            self.handle_only_visible_action
+        )
+
         self.toolbar = QToolBar()
         self.toolbar.setIconSize(QSize(16, 16))
         self.toolbar.addAction(self.add_action)
         self.toolbar.addAction(self.delete_action)
+        self.toolbar.addSeparator()
+        self.toolbar.addAction(self.only_visible_action)
+
+        # Indexes of expressions skipped in the last evaluation
+        self.skipped = set()
 
         self.tree = QTreeWidget()
-        self.tree.setColumnCount(3)
-        self.tree.setHeaderLabels(['Expression', 'Type', 'Value'])
+        self.tree.setColumnCount(4)
+        self.tree.setHeaderLabels(['Expression', 'Type', 'Value', 'Time'])
         self.tree.setSelectionMode(QAbstractItemView.ContiguousSelection)
         self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self.show_context_menu)
@@ -60,6 +79,10 @@ class PugdebugExpressionViewer(QWidget):
         self.restore_state()
 
         self.tree.itemChanged.connect(self.handle_item_changed)
+        self.tree.itemExpanded.connect(self.evaluate_revealed)
+        self.tree.verticalScrollBar().valueChanged.connect(
+            self.evaluate_revealed
+        )
 
     def show_context_menu(self, point):
         # Remove all actions from the tree widget
@@ -86,18 +109,22 @@ class PugdebugExpressionViewer(QWidget):
         # Restore all actions on the tree widget
         self.tree.addActions(self.__tree_actions)
 
-    def add_expression(self, expression):
-        item = QTreeWidgetItem([expression, '', ''])
+    def add_expression(self, expression, enabled=True):
+        item = QTreeWidgetItem([expression, '', '', ''])
         item.setFlags(
             Qt.ItemIsEnabled |
             Qt.ItemIsEditable |
-            Qt.ItemIsSelectable
+            Qt.ItemIsSelectable |
+            Qt.ItemIsUserCheckable
         )
+        item.setCheckState(0, Qt.Checked if enabled else Qt.Unchecked)
+        item.setToolTip(0, "Uncheck to stop evaluating the expression")
         self.tree.addTopLevelItem(item)
 
         #  Emit the signal to evaluate the expression
-        index = self.tree.indexOfTopLevelItem(item)
-        self.expression_added_signal.emit(index, expression)
+        if enabled:
+            index = self.tree.indexOfTopLevelItem(item)
+            self.expression_added_signal.emit(index, expression)
 
     def delete_selected(self):
         """Deletes currently selected items from the tree"""
@@ -123,6 +150,7 @@ class PugdebugExpressionViewer(QWidget):
             item = self.tree.topLevelItem(index)
             item.setData(1, Qt.DisplayRole, '')
             item.setData(2, Qt.DisplayRole, '')
+            item.setData(3, Qt.DisplayRole, '')
             item.takeChildren()
 
     def delete_expression(self, item):
@@ -131,7 +159,7 @@ class PugdebugExpressionViewer(QWidget):
         self.tree.takeTopLevelItem(index)
 
     def get_expressions(self):
-        """Returns a list of expressions which are to be evaluated"""
+        """Returns a list of all expressions"""
         expressions = []
         for x in range(0, self.tree.topLevelItemCount()):
             expression = self.tree.topLevelItem(x).text(0)
@@ -139,18 +167,104 @@ class PugdebugExpressionViewer(QWidget):
 
         return expressions
 
+    def get_expressions_to_evaluate(self):
+        """Returns a list of expressions which are to be evaluated
+
+        Disabled expressions are None. If only the visible expressions
+        are evaluated, the ones that are not visible nor expanded are
+        None as well, and get evaluated once they are revealed.
+        """
+        expressions = []
+        self.skipped = set()
+
+        for x in range(0, self.tree.topLevelItemCount()):
+            item = self.tree.topLevelItem(x)
+            expression = None
+
+            if self.is_enabled(item):
+                if self.is_revealed(item):
+                    expression = item.text(0)
+                else:
+                    self.skipped.add(x)
+
+            expressions.append(expression)
+
+        return expressions
+
+    def is_enabled(self, item):
+        return item.checkState(0) == Qt.Checked
+
+    def is_revealed(self, item):
+        if not self.only_visible_action.isChecked() or item.isExpanded():
+            return True
+
+        rect = self.tree.visualItemRect(item)
+        return rect.intersects(self.tree.viewport().rect())
+
+    def evaluate_revealed(self):
+        """Evaluate skipped expressions which got visible or expanded"""
+        for index in sorted(self.skipped):
+            item = self.tree.topLevelItem(index)
+            if item is None:
+                continue
+
+            if self.is_enabled(item) and self.is_revealed(item):
+                self.skipped.discard(index)
+                self.expression_revealed_signal.emit(index, item.text(0))
+
     def set_evaluated(self, index, result):
-        """Displays an evaluated expression result"""
+        """Displays an evaluated expression result
+
+        Expressions that took longer than the slow threshold
+        are flagged.
+        """
+        item = self.tree.topLevelItem(index)
+
+        if result is None or item is None:
+            return
+
+        if result['type'] == 'timeout':
+            self.set_timed_out(item, result)
+            return
+
         type = self.decode_type(result)
         value = self.decode_value(result)
 
-        item = self.tree.topLevelItem(index)
         item.setText(1, type)
         item.setText(2, value)
+        item.setForeground(1, QBrush())
+        item.setToolTip(1, '')
+
+        elapsed = result.get('elapsed')
+        if elapsed is not None:
+            elapsed = elapsed * 1000
+            item.setText(3, '%d ms' % elapsed)
+
+            threshold = settings.value('expressions_viewer/slow_threshold')
+            if elapsed > threshold:
+                item.setForeground(3, QBrush(Qt.red))
+                item.setToolTip(3, "Slow expression, uncheck it to stop "
+                                   "evaluating it")
+            else:
+                item.setForeground(3, QBrush())
+                item.setToolTip(3, '')
 
         variables = result['variables'] if 'variables' in result else []
         self.set_variables(item, variables)
 
+    def set_timed_out(self, item, result):
+        """Displays an expression whose evaluation timed out
+
+        The evaluation is retried after the next step.
+        """
+        item.setText(1, 'timed out')
+        item.setText(2, '')
+        item.setText(3, result['value'])
+        item.setForeground(1, QBrush(Qt.darkYellow))
+        item.setToolTip(1, "The evaluation %s, it is retried after the "
+                           "next step" % result['value'])
+        item.takeChildren()
+
     def set_variables(self, parent, variables):
         """Display an array of variables for the given parent item"""
         for index, variable in enumerate(variables):
@@ -216,13 +330,26 @@ class PugdebugExpressionViewer(QWidget):
         settings.set_value('expressions_viewer/expressions',
                            self.get_expressions())
 
+        disabled = []
+        for x in range(0, self.tree.topLevelItemCount()):
+            item = self.tree.topLevelItem(x)
+            if not self.is_enabled(item):
+                disabled.append(item.text(0))
+
+        settings.set_value('expressions_viewer/disabled', disabled)
+
     def restore_state(self):
         """Load expressions from settings"""
         expressions = settings.value('expressions_viewer/expressions')
+        disabled = settings.value('expressions_viewer/disabled')
+
+        if type(disabled) is not list:
+            disabled = []
 
         if type(expressions) is list:
             for expression in expressions:
-                self.add_expression(str(expression))
+                expression = str(expression)
+                self.add_expression(expression, expression not in disabled)
 
     def handle_add_action(self):
         self.add_expression('$x')
@@ -232,6 +359,12 @@ class PugdebugExpressionViewer(QWidget):
         self.delete_selected()
         self.save_state()
 
+    def handle_only_visible_action(self, checked):
+        settings.set_value('expressions_viewer/only_visible', checked)
+
+        if not checked:
+            self.evaluate_revealed()
+
     def handle_item_changed(self, item, column):
         """Called when the user changes an item"""
 
@@ -246,5 +379,6 @@ class PugdebugExpressionViewer(QWidget):
         index = self.tree.indexOfTopLevelItem(item)
         expression = item.text(0)
 
-        self.expression_changed_signal.emit(index, expression)
+        if self.is_enabled(item):
+            self.expression_changed_signal.emit(index, expression)
         self.save_state()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtWidgets import (QWidget, QLineEdit, QLabel, QTreeWidget,
+                             QTreeWidgetItem, QVBoxLayout, QHBoxLayout)
+
+from pugdebug.models.content_search import PugdebugContentSearch
+
+
+class PugdebugFindInProject(QWidget):
+
+    line_activated_signal = pyqtSignal(str, int)
+
+    # Milliseconds to wait for the next keystroke before searching
+    search_delay = 200
+
+    def __init__(self):
+        super(PugdebugFindInProject, self).__init__()
+
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.search_lines)
+
+        self.content_search = PugdebugContentSearch(self)
+        self.content_search.lines_found_signal.connect(
+            self.handle_lines_found
+        )
+        self.content_search.search_done_signal.connect(
+            self.handle_search_done
+        )
+
+        # Number of lines found by the current search
+        self.found = 0
+
+        self.setup_layout()
+
+    def setup_layout(self):
+        self.query = QLineEdit()
+        self.query.setPlaceholderText("Text to find in the project files")
+        self.query.textEdited.connect(self.start_timer)
+        self.query.returnPressed.connect(self.search_lines)
+
+        self.status = QLabel()
+
+        self.lines = QTreeWidget()
+        self.lines.setColumnCount(3)
+        self.lines.setHeaderLabels(['File', 'Line', 'Text', 'Full filename'])
+        self.lines.setColumnWidth(0, 300)
+        self.lines.setColumnHidden(3, True)
+        self.lines.setRootIsDecorated(False)
+        self.lines.setUniformRowHeights(True)
+        self.lines.itemActivated.connect(self.handle_item_activated)
+
+        query_layout = QHBoxLayout()
+        query_layout.addWidget(self.query)
+        query_layout.addWidget(self.status)
+
+        box_layout = QVBoxLayout()
+        box_layout.addLayout(query_layout)
+        box_layout.addWidget(self.lines)
+
+        self.setLayout(box_layout)
+
+    def focus_query(self):
+        self.query.setFocus()
+        self.query.selectAll()
+
+    def start_timer(self, text):
+        self.content_search.cancel()
+        self.timer.start(self.search_delay)
+
+    def search_lines(self):
+        self.timer.stop()
+
+        self.lines.clear()
+        self.found = 0
+        self.status.setText("Searching ...")
+
+        self.content_search.search(self.query.text())
+
+    def handle_lines_found(self, generation, root, path, lines):
+        if generation != self.content_search.generation:
+            return
+
+        full_path = os.path.join(root, path)
+
+        items = []
+        for line_number, text in lines:
+            item = QTreeWidgetItem([path, str(line_number), text,
+                                    full_path])
+            item.setToolTip(0, full_path)
+            items.append(item)
+
+        self.lines.addTopLevelItems(items)
+
+        self.found += len(lines)
+        self.status.setText("%d found ..." % self.found)
+
+    def handle_search_done(self, generation, more):
+        if generation != self.content_search.generation:
+            return
+
+        if more:
+            self.status.setText("First %d found" % self.found)
+        else:
+            self.status.setText("%d found" % self.found)
+
+    def handle_item_activated(self, item, column):
+        full_path = item.text(3)
+        line = int(item.text(1))
+
+        self.line_activated_signal.emit(full_path, line)
@@ -12,7 +12,9 @@ from PyQt5.QtWidgets import (QMainWindow, QToolBar, QMenuBar, QDockWidget,
                              QAction)
 from PyQt5.QtGui import QKeySequence
 
-from pugdebug.gui.search import PugdebugFileSearchWindow
+from pugdebug.gui.search import (PugdebugFileSearchWindow,
+                                 PugdebugSymbolSearchWindow)
+from pugdebug.gui.find_in_project import PugdebugFindInProject
 from pugdebug.gui.documents import PugdebugDocumentViewer
 from pugdebug.gui.variables import PugdebugVariableViewer
 from pugdebug.gui.stacktraces import PugdebugStacktraceViewer
@@ -25,6 +27,8 @@ from pugdebug import settings, file_browser, projects
 class PugdebugMainWindow(QMainWindow):
 
     search_file_selected_signal = pyqtSignal(str)
+    search_symbol_selected_signal = pyqtSignal(str, int)
+    search_symbol_breakpoint_signal = pyqtSignal(str)
 
     def __init__(self):
         super(PugdebugMainWindow, self).__init__()
@@ -38,6 +42,8 @@ class PugdebugMainWindow(QMainWindow):
         self.stacktrace_viewer = PugdebugStacktraceViewer()
         self.expression_viewer = PugdebugExpressionViewer()
         self.file_search_window = PugdebugFileSearchWindow(self)
+        self.symbol_search_window = PugdebugSymbolSearchWindow(self)
+        self.find_in_project = PugdebugFindInProject()
 
         self.setCentralWidget(self.document_viewer)
 
@@ -111,6 +117,12 @@ class PugdebugMainWindow(QMainWindow):
             Qt.BottomDockWidgetArea
         )
 
+        self.find_in_project_dock = self.__add_dock_widget(
+            self.find_in_project,
+            "Find in Project",
+            Qt.BottomDockWidgetArea
+        )
+
     def setup_file_actions(self):
         self.new_project_action = QAction("&New project...", self)
         self.new_project_action.setShortcut(QKeySequence("Ctrl+N"))
@@ -192,6 +204,16 @@ class PugdebugMainWindow(QMainWindow):
         )
         self.step_out_action.setShortcut(QKeySequence("F8"))
 
+        self.cancel_command_action = QAction("Cancel", self)
+        self.cancel_command_action.setToolTip(
+            "Cancel waiting for the current command (F9)"
+        )
+        self.cancel_command_action.setStatusTip(
+            "Stop waiting for the reply to the current command, like "
+            "evaluating an expression that takes too long. Shortcut: F9"
+        )
+        self.cancel_command_action.setShortcut(QKeySequence("F9"))
+
     def setup_search_actions(self):
         self.file_search_action = QAction("&File search...", self)
         self.file_search_action.setToolTip(
@@ -203,6 +225,30 @@ class PugdebugMainWindow(QMainWindow):
         self.file_search_action.setShortcut(QKeySequence("Ctrl+T"))
         self.file_search_action.triggered.connect(self.file_search_window.exec)
 
+        self.symbol_search_action = QAction("S&ymbol search...", self)
+        self.symbol_search_action.setToolTip(
+            "Search for classes, functions and methods in the current project"
+        )
+        self.symbol_search_action.setStatusTip(
+            "Search for symbols. Shortcut: Ctrl+Shift+T"
+        )
+        self.symbol_search_action.setShortcut(QKeySequence("Ctrl+Shift+T"))
+        self.symbol_search_action.triggered.connect(
+            self.symbol_search_window.exec
+        )
+
+        self.find_in_project_action = QAction("Find in &project...", self)
+        self.find_in_project_action.setToolTip(
+            "Find text in the files of the current project"
+        )
+        self.find_in_project_action.setStatusTip(
+            "Find text in the project files. Shortcut: Ctrl+Shift+F"
+        )
+        self.find_in_project_action.setShortcut(QKeySequence("Ctrl+Shift+F"))
+        self.find_in_project_action.triggered.connect(
+            self.show_find_in_project
+        )
+
     def setup_toolbar(self):
         toolbar = QToolBar("Main Toolbar")
         toolbar.setObjectName("main-toolbar")
@@ -217,6 +263,8 @@ class PugdebugMainWindow(QMainWindow):
         toolbar.addAction(self.step_over_action)
         toolbar.addAction(self.step_into_action)
         toolbar.addAction(self.step_out_action)
+        toolbar.addSeparator()
+        toolbar.addAction(self.cancel_command_action)
 
         self.addToolBar(toolbar)
 
@@ -246,9 +294,13 @@ class PugdebugMainWindow(QMainWindow):
         debug_menu.addAction(self.step_over_action)
         debug_menu.addAction(self.step_into_action)
         debug_menu.addAction(self.step_out_action)
+        debug_menu.addSeparator()
+        debug_menu.addAction(self.cancel_command_action)
 
         search_menu = menu_bar.addMenu("&Search")
         search_menu.addAction(self.file_search_action)
+        search_menu.addAction(self.symbol_search_action)
+        search_menu.addAction(self.find_in_project_action)
 
         self.setMenuBar(menu_bar)
 
@@ -259,6 +311,7 @@ class PugdebugMainWindow(QMainWindow):
         self.step_over_action.setEnabled(enabled)
         self.step_into_action.setEnabled(enabled)
         self.step_out_action.setEnabled(enabled)
+        self.cancel_command_action.setEnabled(enabled)
 
         self.start_listening_action.setEnabled(not enabled)
 
@@ -283,15 +336,27 @@ class PugdebugMainWindow(QMainWindow):
     def get_expression_viewer(self):
         return self.expression_viewer
 
+    def get_find_in_project(self):
+        return self.find_in_project
+
+    def show_find_in_project(self):
+        self.find_in_project_dock.show()
+        self.find_in_project_dock.raise_()
+        self.find_in_project.focus_query()
+
     def update_window_title(self):
         self.setWindowTitle("pugdebug / " + projects.active())
 
     def set_debugging_status(self, status):
         self.permanent_statusbar.set_debugging_status(status)
 
+    def set_debugger_features(self, features):
+        self.permanent_statusbar.set_debugger_features(features)
+
     def __add_dock_widget(self, widget, title, area):
         dw = QDockWidget(title, self)
         object_name = "dock-widget-%s" % title.lower().replace(" ", "-")
         dw.setObjectName(object_name)
         dw.setWidget(widget)
         self.addDockWidget(area, dw)
+        return dw
@@ -8,85 +8,225 @@
 """
 
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QEvent
+from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import (QDialog, QLineEdit, QVBoxLayout, QFormLayout,
-                             QListWidget, QAbstractItemView)
+                             QListWidget, QListWidgetItem, QAbstractItemView,
+                             QPushButton)
 
-from pugdebug.models.file_search import PugdebugFileSearch
+from pugdebug.models.file_search import PugdebugFileSearch, get_indexer
+from pugdebug.models import symbol_search
 from pugdebug import settings, projects
 
 
-class PugdebugFileSearchWindow(QDialog):
+class PugdebugSearchWindow(QDialog):
+    """A dialog that searches as you type and lists what was found
+
+    Subclasses create the search model, and decide how the results
+    are listed and what happens when one is selected.
+    """
+
+    # Milliseconds to wait for the next keystroke before searching
+    search_delay = 30
+
+    window_title = "Search for ..."
 
     def __init__(self, parent):
-        super(PugdebugFileSearchWindow, self).__init__(parent)
+        super(PugdebugSearchWindow, self).__init__(parent)
 
         self.parent = parent
 
-        self.setWindowTitle("Search for files ...")
+        # Generation of the search the listed results were found by
+        self.search_generation = 0
+
+        self.setWindowTitle(self.window_title)
 
         self.timer = QTimer()
         self.timer.setSingleShot(True)
-        self.timer.timeout.connect(self.search_files)
+        self.timer.timeout.connect(self.search)
+
+        self.search_model = self.create_search_model()
+        self.finished.connect(self.search_model.cancel)
 
         self.setup_layout()
 
         self.resize(500, 250)
 
+    def create_search_model(self):
+        """Create the search model, and connect its found signal
+        to handle_results_found
+        """
+        raise NotImplementedError
+
+    def refresh_index(self):
+        """Pick up changes to the project since the last search
+        """
+        raise NotImplementedError
+
+    def create_item(self, result):
+        raise NotImplementedError
+
+    def result_selected(self, item):
+        raise NotImplementedError
+
     def exec(self):
         self.project_root = settings.value('project/' + projects.active() +
                                            '/path/project_root')
-        self.file_search = PugdebugFileSearch(self, self.project_root)
-        super(PugdebugFileSearchWindow, self).exec()
+
+        self.refresh_index()
+
+        super(PugdebugSearchWindow, self).exec()
 
     def setup_layout(self):
-        self.file_name = PugdebugSearchFileLineEdit(self)
-        self.file_name.textEdited.connect(self.start_timer)
-        self.file_name.returnPressed.connect(self.select_file)
-        self.file_name.up_or_down_pressed_signal.connect(self.select_index)
+        self.search_input = PugdebugSearchFileLineEdit(self)
+        self.search_input.textEdited.connect(self.start_timer)
+        self.search_input.returnPressed.connect(self.select_result)
+        self.search_input.up_or_down_pressed_signal.connect(self.select_index)
 
-        self.files = QListWidget()
-        self.files.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.files.itemActivated.connect(self.file_selected)
+        self.results = QListWidget()
+        self.results.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.results.itemActivated.connect(self.result_selected)
 
         search_layout = QFormLayout()
-        search_layout.addRow("Search for:", self.file_name)
+        search_layout.addRow("Search for:", self.search_input)
 
         box_layout = QVBoxLayout()
         box_layout.addLayout(search_layout)
-        box_layout.addWidget(self.files)
+        box_layout.addWidget(self.results)
 
         self.setLayout(box_layout)
 
     def start_timer(self, text):
-        self.timer.start(500)
+        # The search for the text before is of no use anymore,
+        # only wait for keystrokes that come in a burst
+        self.search_model.cancel()
+        self.timer.start(self.search_delay)
 
-    def search_files(self):
-        self.files.clear()
-        files = self.file_search.search(self.file_name.text())
-        self.files.addItems(files)
-        self.files.setCurrentRow(0)
+    def search(self):
+        self.search_model.search(self.search_input.text())
 
-    def select_file(self):
-        selected_item = self.files.currentItem()
-        self.file_selected(selected_item)
+    def handle_results_found(self, generation, results, done):
+        if generation != self.search_model.generation:
+            return
+
+        # Results of the same search come in more than once,
+        # keep the row the user moved to
+        current_row = self.results.currentRow()
+        if self.search_generation != generation:
+            self.search_generation = generation
+            current_row = 0
+
+        self.results.clear()
+
+        for result in results:
+            self.results.addItem(self.create_item(result))
+
+        self.results.setCurrentRow(min(max(current_row, 0),
+                                       self.results.count() - 1))
+
+    def select_result(self):
+        selected_item = self.results.currentItem()
+        if selected_item is not None:
+            self.result_selected(selected_item)
 
     def select_index(self, direction):
-        current_index = self.files.currentRow()
+        current_index = self.results.currentRow()
         next_index = current_index
-        max_index = self.files.count() - 1
+        max_index = self.results.count() - 1
         if direction == 'up' and current_index > 0:
             next_index = current_index - 1
         elif direction == 'down' and current_index < max_index:
             next_index = current_index + 1
-        self.files.setCurrentRow(next_index)
+        self.results.setCurrentRow(next_index)
+
+
+class PugdebugFileSearchWindow(PugdebugSearchWindow):
+
+    window_title = "Search for files ..."
+
+    def create_search_model(self):
+        file_search = PugdebugFileSearch(self)
+        file_search.files_found_signal.connect(self.handle_results_found)
+        return file_search
+
+    def refresh_index(self):
+        # Pick up files added since the last search
+        get_indexer().refresh()
 
-    def file_selected(self, item):
+    def create_item(self, path):
+        return QListWidgetItem(path)
+
+    def result_selected(self, item):
         path = item.data(Qt.DisplayRole)
         full_path = "%s/%s" % (self.project_root, path)
         self.parent.search_file_selected_signal.emit(full_path)
         self.accept()
 
 
+class PugdebugSymbolSearchWindow(PugdebugSearchWindow):
+
+    window_title = "Search for symbols ..."
+
+    # Kinds of symbols that can break when called
+    callable_kinds = ('function', 'method')
+
+    def create_search_model(self):
+        symbol_search_model = symbol_search.PugdebugSymbolSearch(self)
+        symbol_search_model.symbols_found_signal.connect(
+            self.handle_results_found
+        )
+        return symbol_search_model
+
+    def refresh_index(self):
+        # Pick up symbols changed since the last search
+        symbol_search.get_indexer().refresh()
+
+    def setup_layout(self):
+        super(PugdebugSymbolSearchWindow, self).setup_layout()
+
+        self.results.currentItemChanged.connect(self.update_break_button)
+
+        self.break_button = QPushButton("&Break on call")
+        self.break_button.setToolTip(
+            "Break when the selected function or method is called (Ctrl+B)"
+        )
+        self.break_button.setShortcut(QKeySequence("Ctrl+B"))
+        self.break_button.setAutoDefault(False)
+        self.break_button.setEnabled(False)
+        self.break_button.clicked.connect(self.break_on_call)
+
+        self.layout().addWidget(self.break_button, 0, Qt.AlignRight)
+
+    def create_item(self, symbol):
+        name, path, line_number, kind = symbol
+        item = QListWidgetItem("%s    %s:%d" % (name, path, line_number))
+        item.setData(Qt.UserRole, symbol)
+        return item
+
+    def result_selected(self, item):
+        name, path, line_number, kind = item.data(Qt.UserRole)
+        full_path = "%s/%s" % (self.project_root, path)
+        self.parent.search_symbol_selected_signal.emit(full_path, line_number)
+        self.accept()
+
+    def update_break_button(self, item):
+        self.break_button.setEnabled(
+            item is not None and
+            item.data(Qt.UserRole)[3] in self.callable_kinds
+        )
+
+    def break_on_call(self):
+        selected_item = self.results.currentItem()
+        if selected_item is None:
+            return
+
+        name, path, line_number, kind = selected_item.data(Qt.UserRole)
+        if kind not in self.callable_kinds:
+            return
+
+        self.parent.search_symbol_breakpoint_signal.emit(name)
+        self.accept()
+
+
 class PugdebugSearchFileLineEdit(QLineEdit):
 
     up_or_down_pressed_signal = pyqtSignal(str)
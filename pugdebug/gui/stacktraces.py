@@ -7,7 +7,7 @@
     license: GNU GPL v3, see LICENSE for more details
 """
 
-from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem
 
 from pugdebug import settings, projects
@@ -16,6 +16,7 @@ from pugdebug import settings, projects
 class PugdebugStacktraceViewer(QTreeWidget):
 
     item_double_clicked_signal = pyqtSignal(str, int)
+    frame_selected_signal = pyqtSignal(int)
 
     def __init__(self):
         super(PugdebugStacktraceViewer, self).__init__()
@@ -30,8 +31,11 @@ class PugdebugStacktraceViewer(QTreeWidget):
         self.setRootIsDecorated(False)
 
         self.itemDoubleClicked.connect(self.handle_item_double_clicked)
+        self.currentItemChanged.connect(self.handle_current_item_changed)
 
     def set_stacktraces(self, stacktraces):
+        # Do not request variables for the frames while repopulating
+        self.blockSignals(True)
         self.clear()
 
         for stacktrace in stacktraces:
@@ -44,15 +48,30 @@ class PugdebugStacktraceViewer(QTreeWidget):
             ]
             item = QTreeWidgetItem(args)
             item.setToolTip(0, stacktrace['filename'])
+            item.setData(0, Qt.UserRole, int(stacktrace.get('level', 0)))
 
             self.addTopLevelItem(item)
 
+        # The topmost frame is the one the variables are shown for
+        if self.topLevelItemCount() > 0:
+            self.setCurrentItem(self.topLevelItem(0))
+        self.blockSignals(False)
+
     def handle_item_double_clicked(self, item, column):
         file = item.text(3)
         line = int(item.text(1))
 
         self.item_double_clicked_signal.emit(file, line)
 
+    def handle_current_item_changed(self, current, previous):
+        """Handle when a stack frame gets selected
+
+        Emit the depth of the selected frame so the variables
+        of that frame can be shown.
+        """
+        if current is not None:
+            self.frame_selected_signal.emit(current.data(0, Qt.UserRole))
+
     def __cut_filename(self, filename):
         with settings.open_group('project/' + projects.active()):
             path_map = settings.value('path/path_mapping')
@@ -17,8 +17,10 @@ class PugdebugStatusBar(QWidget):
         super(PugdebugStatusBar, self).__init__()
         self.label = QLabel(self)
         self.light = QLabel(self)
+        self.features = QLabel(self)
 
         layout = QHBoxLayout()
+        layout.addWidget(self.features)
         layout.addWidget(self.light)
         layout.addWidget(self.label)
 
@@ -51,3 +53,19 @@ class PugdebugStatusBar(QWidget):
         painter = QPainter(self.pixmap)
         painter.drawRect(0, 0, 10, 10)
         self.light.setPixmap(self.pixmap)
+
+    def set_debugger_features(self, features):
+        """Show the debugger features chosen by the adaptive tuning
+
+        An empty dict hides them.
+        """
+        if features:
+            text = 'Depth: %d  Children: %d  Data: %d' % (
+                features['max_depth'],
+                features['max_children'],
+                features['max_data']
+            )
+        else:
+            text = ''
+
+        self.features.setText(text)
@@ -8,15 +8,25 @@
 """
 
 import base64
+import codecs
 
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QTextCursor
 from PyQt5.QtWidgets import (QTabWidget, QTreeWidget, QTreeWidgetItem, QDialog,
-                             QTextEdit, QGridLayout)
+                             QPlainTextEdit, QLineEdit, QCheckBox, QLabel,
+                             QPushButton, QHBoxLayout, QVBoxLayout)
 
 
 class PugdebugVariableViewer(QTabWidget):
 
     variable_tables = {}
 
+    depth = 0
+
+    details = None
+
+    property_value_requested_signal = pyqtSignal(object)
+
     def __init__(self):
         """Variable viewer
 
@@ -27,7 +37,7 @@ class PugdebugVariableViewer(QTabWidget):
 
         self.setTabsClosable(False)
 
-    def handle_variable_double_clicked(self, item):
+    def handle_variable_double_clicked(self, item, context):
         """Handle when a variable is double clicked
 
         If the double clicked item is of string type
@@ -35,7 +45,20 @@ class PugdebugVariableViewer(QTabWidget):
         strings more easier.
         """
         if item.text(1).find('string') > -1:
-            PugdebugVariableDetails(self, item)
+            variable = item.data(0, Qt.UserRole)
+            self.details = PugdebugVariableDetails(self, variable,
+                                                   self.depth, context)
+
+    def request_property_value(self, request):
+        self.property_value_requested_signal.emit(request)
+
+    def handle_got_property_value(self, property_value):
+        """Handle when a chunk of a variable's value is received
+
+        Pass the chunk on to the details dialog, if it is still open.
+        """
+        if self.details is not None and self.details.isVisible():
+            self.details.add_chunk(property_value)
 
     def clear(self):
         """Clear the variable tables
@@ -43,7 +66,14 @@ class PugdebugVariableViewer(QTabWidget):
         for context_key in self.variable_tables:
             self.variable_tables[context_key].clear()
 
-    def set_variables(self, variables):
+    def set_variables(self, variables, depth=0):
+        """Set the variables of a stack frame
+
+        The depth is the level of the stack frame
+        the variables belong to.
+        """
+        self.depth = depth
+
         for context in variables:
             table = self.get_variable_table(context)
 
@@ -70,7 +100,8 @@ class PugdebugVariableViewer(QTabWidget):
                 self.addTab(table, context)
 
             table.itemDoubleClicked.connect(
-                self.handle_variable_double_clicked
+                lambda item, column, context=context:
+                    self.handle_variable_double_clicked(item, context)
             )
 
             self.setCurrentIndex(0)
@@ -120,6 +151,8 @@ class PugdebugVariableViewer(QTabWidget):
         else:
             item = QTreeWidgetItem(parent, args)
 
+        item.setData(0, Qt.UserRole, variable)
+
         if 'variables' in variable:
             for subvar in variable['variables']:
                 self.add_variable(table, subvar, item)
@@ -135,18 +168,205 @@ class PugdebugVariableViewer(QTabWidget):
 
 class PugdebugVariableDetails(QDialog):
 
-    def __init__(self, parent, item):
+    def __init__(self, parent, variable, depth, context):
         """Dialog to inspect variables in more detail
 
         Show the contents of a variable in a text edit.
+
+        The value shown in the variables table is cut at max_data, so
+        the full value is requested from xdebug chunk by chunk and
+        streamed into the text edit. The value can be searched and
+        shown as a hex dump.
         """
         super(PugdebugVariableDetails, self).__init__(parent)
 
-        edit = QTextEdit(item.text(2))
+        self.viewer = parent
+
+        self.setWindowTitle(variable['name'])
+        self.resize(700, 500)
+
+        self.request = {
+            'fullname': variable.get('fullname', variable['name']),
+            'depth': depth,
+            'context': context,
+            'offset': 0,
+            'size': int(variable.get('size', 0))
+        }
 
-        layout = QGridLayout(self)
-        layout.addWidget(edit, 0, 0, 0, 0)
+        self.data = bytearray()
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('Search')
+        self.search_input.returnPressed.connect(self.search)
+
+        self.hex_mode_input = QCheckBox('Hex')
+        self.hex_mode_input.toggled.connect(self.render)
+
+        self.progress = QLabel()
+
+        cancel_button = QPushButton('Stop loading')
+        cancel_button.clicked.connect(self.cancel)
+        self.cancel_button = cancel_button
+
+        toolbar_layout = QHBoxLayout()
+        toolbar_layout.addWidget(self.search_input)
+        toolbar_layout.addWidget(self.hex_mode_input)
+        toolbar_layout.addWidget(self.progress)
+        toolbar_layout.addWidget(cancel_button)
+
+        # QPlainTextEdit only lays out the visible blocks,
+        # so multi-megabyte values stay responsive
+        self.edit = QPlainTextEdit()
+        self.edit.setReadOnly(True)
+        self.edit.setLineWrapMode(QPlainTextEdit.NoWrap)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(toolbar_layout)
+        layout.addWidget(self.edit)
 
         self.setLayout(layout)
 
+        value = variable.get('value')
+        if value is not None and 'encoding' in variable:
+            value = base64.b64decode(value)
+        elif value is not None:
+            value = bytes(value, 'UTF-8')
+        else:
+            value = b''
+
+        if len(value) >= self.request['size']:
+            self.append(value)
+            self.finish()
+        else:
+            self.viewer.request_property_value(dict(self.request))
+
         self.show()
+
+    def add_chunk(self, property_value):
+        """Add a chunk of the value
+
+        Request the next chunk until the whole value is read. Stop
+        and show the error if reading the chunk failed.
+        """
+        if (self.request is None or
+                property_value['fullname'] != self.request['fullname'] or
+                property_value['offset'] != self.request['offset']):
+            return
+
+        if 'error' in property_value:
+            self.finish()
+            self.progress.setText('%s, error: %s' % (
+                self.progress.text(), property_value['error']
+            ))
+            self.progress.setToolTip(property_value['error'])
+            return
+
+        data = property_value['data']
+
+        # Xdebug versions that page only children send the start of
+        # the value for every page, read the whole value in one page
+        if (property_value['offset'] > 0 and len(data) > 0 and
+                'page_size' not in self.request and
+                data == self.data[:len(data)]):
+            self.data = bytearray()
+            self.decoder.reset()
+            self.edit.clear()
+            self.request['offset'] = 0
+            self.request['page_size'] = property_value['size']
+            self.viewer.request_property_value(dict(self.request))
+            return
+
+        self.request['size'] = property_value['size']
+        self.request['offset'] += len(data)
+
+        self.append(data)
+
+        if len(data) > 0 and self.request['offset'] < self.request['size']:
+            self.viewer.request_property_value(dict(self.request))
+        else:
+            self.finish()
+
+    def append(self, data):
+        start = len(self.data)
+        self.data.extend(data)
+
+        if self.hex_mode_input.isChecked():
+            # Only whole rows can be appended to the hex dump
+            start = start - start % 16
+            self.render_hex(start)
+        else:
+            self.insert_text(self.decoder.decode(bytes(data)))
+
+        self.update_progress()
+
+    def render(self):
+        """Render the whole value again
+
+        Called when switching between text and hex mode.
+        """
+        self.edit.clear()
+
+        if self.hex_mode_input.isChecked():
+            self.render_hex(0)
+        else:
+            self.decoder.reset()
+            self.insert_text(self.decoder.decode(bytes(self.data)))
+
+    def render_hex(self, start):
+        prefix = ''
+
+        # Every row is a block, replace the last, possibly incomplete, row
+        block = self.edit.document().findBlockByNumber(start // 16)
+        if block.isValid():
+            cursor = QTextCursor(block)
+            cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+        else:
+            prefix = '\n'
+
+        rows = []
+        for offset in range(start, len(self.data), 16):
+            row = self.data[offset:offset + 16]
+            rows.append('%08x  %-47s  %s' % (
+                offset,
+                ' '.join('%02x' % byte for byte in row),
+                ''.join(chr(byte) if 32 <= byte < 127 else '.'
+                        for byte in row)
+            ))
+
+        if rows:
+            self.insert_text(prefix + '\n'.join(rows))
+
+    def insert_text(self, text):
+        cursor = QTextCursor(self.edit.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+
+    def search(self):
+        """Find the next occurrence of the searched text
+
+        Wraps around to the beginning of the value.
+        """
+        text = self.search_input.text()
+        if not text:
+            return
+
+        if not self.edit.find(text):
+            self.edit.moveCursor(QTextCursor.Start)
+            self.edit.find(text)
+
+    def cancel(self):
+        self.finish()
+
+    def finish(self):
+        self.request = None
+        self.cancel_button.setEnabled(False)
+        self.update_progress()
+
+    def update_progress(self):
+        size = len(self.data)
+        if self.request is not None:
+            size = max(size, self.request['size'])
+
+        self.progress.setText('%d / %d bytes' % (len(self.data), size))
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import collections
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+import pygments
+from pygments.token import string_to_tokentype
+
+from pugdebug.tokenizer import token_types, get_token_id
+
+
+class PugdebugHighlightCache():
+    """Cache the highlighting of documents
+
+    The line formats and lexer checkpoints of a document are kept in
+    memory for the most recently highlighted documents, and on disk,
+    keyed by the hash of the document's contents and the style.
+
+    The token ids in line formats are valid only in the process that
+    made them, so the names of the token types are saved with them.
+
+    The number of cached files is counted once, and then kept up to
+    date as files are saved. The directory is scanned again only when
+    there are more files than allowed, and then pruned well below the
+    limit, so saves in a row do not scan it each time.
+    """
+
+    # Bump when the format of the cached files changes
+    version = 1
+
+    def __init__(self, directory, memory_size=32, max_files=1000):
+        self.directory = directory
+        self.memory_size = memory_size
+        self.max_files = max_files
+
+        # Number of files in the directory, None until counted
+        self.file_count = None
+
+        self.memory = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.files_lock = threading.Lock()
+
+    @classmethod
+    def get_key(cls, text, style):
+        key = hashlib.sha1()
+        key.update(text.encode('utf-8', 'surrogatepass'))
+        key.update(('|%s|%s|%d' % (style, pygments.__version__,
+                                   cls.version)).encode('utf-8'))
+        return key.hexdigest()
+
+    def get(self, key):
+        """Get a highlighting from memory
+
+        Returns a (lines, checkpoints) tuple, or None.
+        """
+        with self.lock:
+            highlighting = self.memory.get(key)
+
+            if highlighting is not None:
+                self.memory.move_to_end(key)
+
+            return highlighting
+
+    def load(self, key):
+        """Get a highlighting from memory or from disk
+        """
+        highlighting = self.get(key)
+
+        if highlighting is not None or self.directory is None:
+            return highlighting
+
+        try:
+            with open(self.get_path(key), 'rb') as f:
+                data = pickle.load(f)
+
+            lines = self.__map_token_ids(data['tokens'], data['lines'])
+            highlighting = (lines, data['checkpoints'])
+        except (OSError, EOFError, KeyError, ValueError, TypeError,
+                pickle.UnpicklingError):
+            return None
+
+        self.__remember(key, highlighting)
+
+        return highlighting
+
+    def save(self, key, lines, checkpoints):
+        """Keep a highlighting in memory and save it to disk
+        """
+        self.__remember(key, (lines, checkpoints))
+
+        if self.directory is None:
+            return
+
+        data = {
+            'tokens': [str(token) for token in token_types],
+            'lines': lines,
+            'checkpoints': checkpoints
+        }
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            path = self.get_path(key)
+            is_new = not os.path.exists(path)
+
+            # Write to a temporary file first, so a document highlighted
+            # at the same time in another process is never read half done
+            fd, temporary_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+
+            with self.files_lock:
+                if self.file_count is None:
+                    self.file_count = self.count_files()
+                elif is_new:
+                    self.file_count += 1
+
+                if self.file_count > self.max_files:
+                    self.prune()
+        except OSError:
+            pass
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def count_files(self):
+        return sum(1 for entry in os.scandir(self.directory)
+                   if entry.is_file())
+
+    def prune(self):
+        """Remove the least recently saved files, down to a tenth
+        below the limit
+        """
+        entries = [entry for entry in os.scandir(self.directory)
+                   if entry.is_file()]
+
+        keep = self.max_files - self.max_files // 10
+
+        if len(entries) > keep:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+
+            for entry in entries[:len(entries) - keep]:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+        self.file_count = min(len(entries), keep)
+
+    def __remember(self, key, highlighting):
+        with self.lock:
+            self.memory[key] = highlighting
+            self.memory.move_to_end(key)
+
+            while len(self.memory) > self.memory_size:
+                self.memory.popitem(last=False)
+
+    def __map_token_ids(self, tokens, lines):
+        token_map = [get_token_id(string_to_tokentype(token))
+                     for token in tokens]
+
+        if token_map == list(range(len(token_map))):
+            return lines
+
+        for line in lines:
+            for i in range(1, len(line), 2):
+                line[i] = token_map[line[i]]
+
+        return lines
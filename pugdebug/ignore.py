@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import re
+
+# Characters escaped inside of character classes of regular expressions
+class_special_characters = '\\[]&~|^'
+
+
+def translate(glob):
+    """Translate a gitignore glob into a regular expression
+
+    Wildcards do not match slashes, except for two asterisks that
+    are a whole part of the path.
+    """
+    parts = []
+    i = 0
+    n = len(glob)
+
+    while i < n:
+        character = glob[i]
+        whole_part = i == 0 or glob[i - 1] == '/'
+
+        if glob.startswith('**/', i) and whole_part:
+            # Any number of directories, none too
+            parts.append('(?:.*/)?')
+            i += 3
+        elif glob.startswith('**', i) and whole_part and i + 2 == n:
+            # Everything inside
+            parts.append('.*')
+            i += 2
+        elif character == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif character == '?':
+            parts.append('[^/]')
+            i += 1
+        elif character == '[':
+            end = get_class_end(glob, i)
+
+            if end is None:
+                parts.append(re.escape(character))
+                i += 1
+                continue
+
+            contents = glob[i + 1:end]
+            negated = contents[:1] in ('!', '^')
+            if negated:
+                contents = contents[1:]
+
+            contents = ''.join('\\' + c if c in class_special_characters
+                               else c for c in contents)
+
+            parts.append('(?!/)[%s%s]' % ('^' if negated else '', contents))
+            i = end + 1
+        elif character == '\\' and i + 1 < n:
+            parts.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(character))
+            i += 1
+
+    return ''.join(parts)
+
+
+def get_class_end(glob, start):
+    """Get the position of the bracket that closes a character class
+    """
+    i = start + 1
+
+    if glob[i:i + 1] in ('!', '^'):
+        i += 1
+
+    # A closing bracket right at the start is a part of the class
+    if glob[i:i + 1] == ']':
+        i += 1
+
+    end = glob.find(']', i)
+
+    return end if end != -1 else None
+
+
+def parse_line(line):
+    """Parse a line of an ignore file
+
+    Returns the regular expression of the pattern, whether the pattern
+    is negated and whether it only matches directories, or None if the
+    line has no pattern.
+    """
+    if line.startswith('#'):
+        return None
+
+    # Trailing spaces are ignored, unless escaped
+    stripped = line.rstrip(' ')
+    if stripped.endswith('\\') and len(stripped) < len(line):
+        stripped += ' '
+    line = stripped
+
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    elif line.startswith('\\!') or line.startswith('\\#'):
+        line = line[1:]
+
+    directories_only = line.endswith('/')
+    line = line.rstrip('/')
+
+    if line == '':
+        return None
+
+    # Patterns with a slash match paths relative to the directory
+    # of the ignore file, the others match names at any depth
+    anchored = '/' in line
+    if line.startswith('/'):
+        line = line[1:]
+
+    expression = translate(line)
+    if not anchored:
+        expression = '(?:.*/)?' + expression
+
+    return expression, negated, directories_only
+
+
+class PugdebugIgnoreRules():
+    """The patterns of an ignore file, like .gitignore
+
+    All the patterns of the file are compiled into one regular
+    expression. The patterns are in reverse order in it, so the first
+    one that matches is the last one in the file, which decides.
+    """
+
+    def __init__(self, lines):
+        rules = [rule for rule in map(parse_line, lines) if rule is not None]
+
+        self.files = self.compile([rule for rule in rules if not rule[2]])
+        self.directories = self.compile(rules)
+
+    def compile(self, rules):
+        if len(rules) == 0:
+            return None
+
+        rules = rules[::-1]
+
+        expression = '|'.join('(%s)' % rule[0] for rule in rules)
+        negations = [rule[1] for rule in rules]
+
+        return re.compile('(?:%s)\\Z' % expression, re.DOTALL), negations
+
+    def match(self, path, is_directory):
+        """Match a path relative to the directory of the ignore file
+
+        Returns True if the path is ignored, False if it is not ignored
+        by a negated pattern, or None if no pattern matches it.
+        """
+        compiled = self.directories if is_directory else self.files
+
+        if compiled is None:
+            return None
+
+        expression, negations = compiled
+
+        match = expression.match(path)
+        if match is None:
+            return None
+
+        # Only the group of the pattern that matched took part
+        return not negations[match.lastindex - 1]
+
+
+def is_ignored(rules, path, is_directory):
+    """Check if a path is ignored
+
+    The rules are tuples of the prefix of the directory of an ignore
+    file and its patterns, for the directories from the root down to
+    the directory of the path. Rules deeper in the tree decide first.
+    """
+    for prefix, directory_rules in reversed(rules):
+        ignored = directory_rules.match(path[len(prefix):], is_directory)
+
+        if ignored is not None:
+            return ignored
+
+    return False
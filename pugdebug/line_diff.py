@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import bisect
+import difflib
+import re
+
+# Line separators the same as QTextDocument splits plain text into blocks
+line_separators = re.compile('\r\n|[\r\n\u2029]')
+
+
+def get_lines(text):
+    """Split text into lines the same way it is split into blocks
+    """
+    return line_separators.split(text)
+
+
+class PugdebugLineDiff():
+    """Differences between the lines of two versions of a document
+
+    The changes are difflib opcodes, without the equal ranges. Line
+    numbers are zero based, like block numbers.
+    """
+
+    def __init__(self, old_lines, new_lines):
+        self.old_count = len(old_lines)
+        self.new_count = len(new_lines)
+
+        self.opcodes = self.__get_opcodes(old_lines, new_lines)
+
+        # Start lines of the changes, to find them with bisect
+        self.starts = [opcode[1] for opcode in self.opcodes]
+
+    def has_changes(self):
+        return len(self.opcodes) > 0
+
+    def map_line(self, line, nearest=False):
+        """Map a line of the old version to the new version
+
+        Returns None if the line was changed or removed. If the nearest
+        line is wanted instead, a changed line is mapped to the line at
+        the same place in the lines that replaced it, a removed line to
+        the line after the removed ones. There is no nearest line if all
+        the lines were removed, then None is returned too.
+        """
+        index = bisect.bisect_right(self.starts, line) - 1
+
+        if index < 0:
+            return line
+
+        tag, i1, i2, j1, j2 = self.opcodes[index]
+
+        if line >= i2:
+            return line + j2 - i2
+
+        if not nearest:
+            return None
+
+        if j2 > j1:
+            return j1 + min(line - i1, j2 - j1 - 1)
+
+        if self.new_count == 0:
+            return None
+
+        return min(j1, self.new_count - 1)
+
+    def map_lines(self, lines):
+        """Map lines of the old version to distinct lines of the new version
+
+        Unchanged lines keep their place first, then changed lines are
+        mapped to the nearest line, in the order they are given. A line
+        that maps to a line another line was mapped to already, or that
+        has no nearest line, is mapped to None.
+        """
+        mapped = [self.map_line(line) for line in lines]
+        taken = set(mapped)
+
+        for index, line in enumerate(lines):
+            if mapped[index] is not None:
+                continue
+
+            new_line = self.map_line(line, nearest=True)
+
+            if new_line is not None and new_line not in taken:
+                mapped[index] = new_line
+                taken.add(new_line)
+
+        return mapped
+
+    def __get_opcodes(self, old_lines, new_lines):
+        # Usually only a few lines change, match the common
+        # start and end before diffing what is left
+        old_count = len(old_lines)
+        new_count = len(new_lines)
+
+        prefix = 0
+        max_prefix = min(old_count, new_count)
+        while (prefix < max_prefix and
+               old_lines[prefix] == new_lines[prefix]):
+            prefix += 1
+
+        suffix = 0
+        max_suffix = max_prefix - prefix
+        while (suffix < max_suffix and
+               old_lines[old_count - suffix - 1] ==
+               new_lines[new_count - suffix - 1]):
+            suffix += 1
+
+        matcher = difflib.SequenceMatcher(
+            None,
+            old_lines[prefix:old_count - suffix],
+            new_lines[prefix:new_count - suffix],
+            autojunk=False
+        )
+
+        return [(tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix)
+                for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+                if tag != 'equal']
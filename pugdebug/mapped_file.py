@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import bisect
+import re
+
+from array import array
+
+# Line separators the same as QTextDocument splits plain text into blocks,
+# in UTF-8, as in line_diff
+line_separators = re.compile(b'\r\n|[\r\n]|\xe2\x80\xa9')
+
+# Longest line separator, less one byte
+separator_overlap = 2
+
+
+class PugdebugMappedFile():
+    """A large file, read line by line
+
+    The file is not kept open, or mapped into memory. Files that get
+    truncated while they are mapped kill the process on the next read
+    of the mapping, and open files can not be changed on Windows.
+    Instead, only the bytes of the lines that are asked for are read
+    and decoded.
+
+    The offsets of the starts of lines are found lazily, up to the
+    last line asked for. Reading past the end of a file that got
+    shorter since only reads less.
+    """
+
+    # Bytes read in one go
+    index_chunk_size = 1024 * 1024
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+
+        with open(path, 'rb') as f:
+            self.size = f.seek(0, 2)
+
+        self.line_starts = array('Q', [0])
+        self.indexed = 0
+
+    def close(self):
+        """Forget the line starts, the file is not kept open
+        """
+        self.line_starts = array('Q', [0])
+        self.indexed = 0
+
+    def get_line_count(self):
+        self.__index_lines(None)
+        return len(self.line_starts)
+
+    def get_text(self, first, last):
+        """Get the text of the lines from first up to, not including, last
+        """
+        self.__index_lines(last)
+
+        if first >= len(self.line_starts):
+            return ''
+
+        start = self.line_starts[first]
+
+        if last < len(self.line_starts):
+            end = self.line_starts[last]
+        else:
+            end = self.size
+
+        data = self.read(start, end)
+
+        # Without the line separator of the last line
+        if last < len(self.line_starts):
+            for separator in (b'\r\n', b'\xe2\x80\xa9', b'\r', b'\n'):
+                if data.endswith(separator):
+                    data = data[:-len(separator)]
+                    break
+
+        return data.decode(self.encoding, 'replace')
+
+    def read(self, start, end, f=None):
+        """Read the bytes from start up to end, less if the file got shorter
+        """
+        if f is None:
+            try:
+                with open(self.path, 'rb') as f:
+                    return self.read(start, end, f)
+            except OSError:
+                return b''
+
+        f.seek(start)
+        return f.read(max(0, end - start))
+
+    def find_all(self, pattern, length):
+        """Find the matches of a bytes pattern in the file
+
+        The matches of the pattern are all of the given length in bytes,
+        the file is searched chunk by chunk, overlapping by less than
+        a match. Yields the line numbers and the columns of the starts
+        of the matches. Columns are counted in characters, only the
+        bytes before a match on its line are decoded.
+        """
+        self.__index_lines(None)
+
+        line_starts = self.line_starts
+        overlap = max(0, length - 1)
+
+        line = 0
+        counted = 0
+        column = 0
+
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return
+
+        with f:
+            for offset in range(0, self.size, self.index_chunk_size):
+                data = self.read(offset,
+                                 offset + self.index_chunk_size + overlap, f)
+
+                for match in pattern.finditer(data):
+                    # Found again at the start of the next chunk
+                    if match.start() >= self.index_chunk_size:
+                        break
+
+                    position = offset + match.start()
+
+                    if (line + 1 < len(line_starts) and
+                            line_starts[line + 1] <= position):
+                        line = bisect.bisect_right(line_starts, position,
+                                                   line) - 1
+                        counted = line_starts[line]
+                        column = 0
+
+                    if counted >= offset:
+                        before = data[counted - offset:match.start()]
+                    else:
+                        before = self.read(counted, position, f)
+
+                    column += len(before.decode(self.encoding, 'replace'))
+                    counted = position
+
+                    yield line, column
+
+    def __index_lines(self, line):
+        """Find the starts of lines up to the given line, or all of them
+
+        A separator can be split between chunks, the last bytes of
+        a chunk are searched again with the next one.
+        """
+        line_starts = self.line_starts
+
+        while ((line is None or len(line_starts) <= line) and
+               self.indexed < self.size):
+            start = self.indexed
+            end = min(start + self.index_chunk_size, self.size)
+
+            data = self.read(start, end)
+            if len(data) < end - start:
+                # The file got shorter, the rest of it is one line
+                self.indexed = self.size
+                break
+
+            last = end == self.size
+            indexed = len(data) if last else len(data) - separator_overlap
+
+            for match in line_separators.finditer(data):
+                if not last and match.end() >= len(data):
+                    break
+
+                line_starts.append(start + match.end())
+                indexed = max(indexed, match.end())
+
+            self.indexed = start + indexed
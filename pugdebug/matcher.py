@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import bisect
+import heapq
+import itertools
+import re
+import threading
+
+# Characters after which a new word of a path starts
+word_separators = '/\\_-. '
+
+# Scores of the ways a path can match a query, before the bonuses
+# for words and the penalty for the length of the path
+basename_prefix_score = 3000
+basename_score = 2000
+substring_score = 1000
+
+# Bonuses of a character matched out of order, for being in the
+# file name, and for being at the start of a word or following the
+# character matched before it
+basename_bonus = 10
+word_bonus = 10
+
+# Most a character matched out of order can score
+subsequence_character_score = basename_bonus + word_bonus
+
+
+class PugdebugMatcher():
+    """Fuzzy match file paths
+
+    A path matches a query if the characters of the query appear in
+    the path in the same order, ignoring case. Paths that contain the
+    query as a whole, in the file name above all, score the best,
+    then paths that match the query at the starts of words. Shorter
+    paths score better than longer ones.
+
+    The paths are lowercased up front and kept shortest first. Matching
+    paths are found in that order, and scored until none of the paths
+    left can score better than the worst of the best ones found.
+
+    The paths found to match the last query are kept. When the query
+    grows, only those paths need to be matched again, as a path can
+    not match a query if it does not match the start of it.
+    """
+
+    # Paths scored between checking if the search got cancelled,
+    # and reporting the best paths found so far
+    report_interval = 1000
+
+    def __init__(self, paths):
+        self.lock = threading.Lock()
+
+        self.paths = sorted(paths, key=lambda path: (len(path), path))
+        self.lower_paths = [path.lower() for path in self.paths]
+
+        # Offsets of the file names in the paths
+        self.basename_starts = [path.rfind('/') + 1 for path in self.paths]
+
+        # All paths joined, to look for a query in all of them at once
+        self.text = '\n'.join(self.lower_paths)
+
+        # Offsets of the paths in the joined text
+        self.offsets = []
+        offset = 0
+        for path in self.lower_paths:
+            self.offsets.append(offset)
+            offset += len(path) + 1
+
+        self.reset()
+
+    def reset(self):
+        """Forget the paths that matched the last query
+        """
+        # The query, the indexes of the paths that match it,
+        # and the index of the first path not matched yet
+        self.narrowing = ('', [], 0)
+
+    def search(self, query, limit=10, found=None, cancelled=None):
+        """Get the paths that match the query best, best first
+
+        The best paths found so far can be reported to the found
+        callable while searching. If the cancelled callable returns
+        True, the search stops and returns None.
+
+        Searches of a matcher run one at a time, from any thread.
+        """
+        query = self.normalize(query)
+
+        if query == '':
+            return []
+
+        with self.lock:
+            indexes = self.select(query, limit, found, cancelled)
+
+        if indexes is None:
+            return None
+
+        return self.get_paths(indexes)
+
+    def normalize(self, query):
+        return ''.join(query.lower().split())
+
+    def get_paths(self, best):
+        return [self.paths[-order]
+                for score, order in sorted(best, reverse=True)]
+
+    def select(self, query, limit, found=None, cancelled=None):
+        """Select the best scoring paths, as (score, -index) items
+        """
+        best = []
+
+        # Paths that contain the query can score the most,
+        # paths that only contain its characters in order much less
+        if '/' in query:
+            # File names can not contain the query
+            most = substring_score + word_bonus
+        else:
+            most = basename_prefix_score
+
+        substrings = set()
+        if not self.select_from(query, self.find_substring(query), self.score,
+                                most, limit, best, substrings, found,
+                                cancelled):
+            return None
+
+        # Paths left out of the substrings could not score
+        # better than the best ones as substrings either
+        most = subsequence_character_score * len(query)
+        if len(best) < limit or best[0][0] < most:
+            if found is not None and len(best) > 0:
+                found(self.get_paths(best))
+
+            indexes = (index for index in self.find_subsequence(query)
+                       if index not in substrings)
+            if not self.select_from(query, indexes, self.score_subsequence,
+                                    most, limit, best, set(), found,
+                                    cancelled):
+                return None
+
+        return best
+
+    def select_from(self, query, indexes, score, most, limit, best,
+                    selected, found=None, cancelled=None):
+        """Keep the best scoring of the indexes in a heap
+
+        The indexes come shortest path first, once the best a path can
+        score is less than the worst kept score, so can the rest.
+
+        Returns False if the search got cancelled.
+        """
+        lower_paths = self.lower_paths
+
+        # Whether the best paths changed since they were last reported
+        changed = False
+
+        for count, index in enumerate(indexes, 1):
+            selected.add(index)
+
+            if (len(best) == limit and
+                    most - len(lower_paths[index]) <= best[0][0]):
+                break
+
+            if count % self.report_interval == 0:
+                if cancelled is not None and cancelled():
+                    return False
+
+                if found is not None and changed:
+                    found(self.get_paths(best))
+                    changed = False
+
+            # Paths earlier in the order win ties
+            item = (score(query, index), -index)
+
+            if len(best) < limit:
+                heapq.heappush(best, item)
+                changed = True
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+                changed = True
+
+        return True
+
+    def find_substring(self, query):
+        """Find the indexes of the paths that contain the query, in order
+        """
+        offsets = self.offsets
+        text = self.text
+
+        position = text.find(query)
+        while position != -1:
+            index = bisect.bisect_right(offsets, position) - 1
+            yield index
+
+            # Look on in the next path
+            position = text.find('\n', position)
+            if position == -1:
+                break
+            position = text.find(query, position + 1)
+
+    def find_subsequence(self, query):
+        """Find the indexes of the paths that match the query, in order
+
+        The paths are matched lazily, as the indexes are taken, and
+        the paths matched so far are kept for the queries that follow.
+        """
+        matches = self.get_subsequence_pattern(query).match
+        lower_paths = self.lower_paths
+
+        previous_query, previous_indexes, previous_end = self.narrowing
+
+        if query.startswith(previous_query):
+            # The paths before the previous end that did not match
+            # the previous query can not match this one either
+            found = list(itertools.compress(
+                previous_indexes,
+                map(matches, map(lower_paths.__getitem__, previous_indexes))
+            ))
+            start = previous_end
+        else:
+            found = []
+            start = 0
+
+        self.narrowing = (query, found, start)
+
+        yield from found
+
+        for index in itertools.compress(
+                itertools.count(start),
+                map(matches, itertools.islice(lower_paths, start, None))):
+            found.append(index)
+            self.narrowing = (query, found, index + 1)
+            yield index
+
+        self.narrowing = (query, found, len(lower_paths))
+
+    def get_subsequence_pattern(self, query):
+        # Every character is looked for after the first occurrence of
+        # the one before it, which never needs to backtrack
+        return re.compile(''.join('[^%s]*%s' % (re.escape(character),
+                                                re.escape(character))
+                                  for character in query))
+
+    def score(self, query, index):
+        path = self.lower_paths[index]
+        basename_start = self.basename_starts[index]
+
+        position = path.find(query, basename_start)
+
+        if position == basename_start:
+            score = basename_prefix_score
+        elif position != -1:
+            score = basename_score + self.get_word_bonus(index, position)
+        else:
+            position = path.find(query)
+
+            if position != -1:
+                score = (substring_score +
+                         self.get_word_bonus(index, position))
+            else:
+                return self.score_subsequence(query, index)
+
+        return score - len(path)
+
+    def score_subsequence(self, query, index):
+        """Score the characters of the query matched from the end
+
+        Matching from the end prefers matches in the file name.
+        """
+        path = self.paths[index]
+        lower_path = self.lower_paths[index]
+        basename_start = self.basename_starts[index]
+
+        length = len(path)
+
+        score = 0
+        end = length
+        previous = None
+
+        for character in reversed(query):
+            position = lower_path.rfind(character, 0, end)
+
+            if position >= basename_start:
+                score += basename_bonus
+
+            # Same as get_word_bonus, inlined as this is called a lot
+            if position + 1 == previous or position == 0:
+                score += word_bonus
+            else:
+                before = path[position - 1]
+                if (before in word_separators or
+                        (path[position].isupper() and
+                         not before.isupper())):
+                    score += word_bonus
+
+            previous = position
+            end = position
+
+        return score - length
+
+    def get_word_bonus(self, index, position):
+        """Bonus for matching at the start of a word
+        """
+        if position == 0:
+            return word_bonus
+
+        path = self.paths[index]
+        before = path[position - 1]
+
+        if before in word_separators:
+            return word_bonus
+
+        # Start of a word in camel case
+        if path[position].isupper() and not before.isupper():
+            return word_bonus
+
+        return 0
@@ -130,6 +130,14 @@ class PugdebugMessageParser():
 
         return not len(xml)
 
+    def parse_breakpoint_update_message(self, message):
+        if not message:
+            return False
+
+        xml = xml_parser.fromstring(message)
+
+        return not len(xml)
+
     def parse_breakpoint_remove_message(self, message):
         if not message:
             return False
@@ -151,7 +159,8 @@ class PugdebugMessageParser():
 
         xml = xml_parser.fromstring(message)
 
-        attribs = ['type', 'filename', 'lineno', 'state', 'id']
+        attribs = ['type', 'filename', 'lineno', 'function', 'class',
+                   'state', 'id']
         for child in xml:
             breakpoint = {}
             breakpoint = self.get_attribs(child, attribs, breakpoint)
@@ -173,6 +182,24 @@ class PugdebugMessageParser():
 
         return self.get_variable(child)
 
+    def parse_property_value_message(self, message):
+        if not message:
+            return {}
+
+        xml = xml_parser.fromstring(message)
+
+        # Detect errors as having an <error> child
+        if len(xml) > 0 and xml[0].tag.endswith('error'):
+            return {
+                'error': xml[0][0].text
+            }
+
+        attribs = ['size', 'encoding']
+        property_value = self.get_attribs(xml, attribs, {})
+        property_value['value'] = xml.text
+
+        return property_value
+
     def get_variables(self, parent, result):
         for child in parent:
             result.append(self.get_variable(child))
@@ -182,6 +209,7 @@ class PugdebugMessageParser():
     def get_variable(self, xml):
         attribs = [
             'name',
+            'fullname',
             'type',
             'encoding',
             'classname',
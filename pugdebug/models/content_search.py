@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from pugdebug.models.project_index import PugdebugProjectIndexer
+from pugdebug.trigrams import PugdebugTrigramIndex, find_lines
+
+
+class PugdebugContentIndexer(PugdebugProjectIndexer):
+    """Keep the trigram index of the PHP files of the project up to date
+    """
+
+    index_class = PugdebugTrigramIndex
+
+    cache_name = 'content_index'
+
+
+class PugdebugContentSearchTask(QRunnable):
+    def __init__(self, content_search, generation, index, query):
+        super(PugdebugContentSearchTask, self).__init__()
+
+        self.content_search = content_search
+        self.generation = generation
+        self.index = index
+        self.query = query
+
+    def run(self):
+        self.content_search.search_lines(self.generation, self.index,
+                                         self.query)
+
+
+class PugdebugContentSearch(QObject):
+    """Search for text in the PHP files of the project
+
+    Only the files that have all the trigrams of the text are searched.
+    Lines are reported file by file, while searching in the background.
+    Starting a search cancels the search before it.
+    """
+
+    # Stop searching after finding this many lines
+    max_lines = 1000
+
+    # Lines found, with the generation of the search, the project root,
+    # the path of the file, and its line numbers and texts of lines
+    lines_found_signal = pyqtSignal(int, str, str, object)
+
+    # Search is done, with the generation of the search
+    # and whether there were more lines than are reported
+    search_done_signal = pyqtSignal(int, bool)
+
+    def __init__(self, parent=None):
+        super(PugdebugContentSearch, self).__init__(parent)
+
+        self.generation = 0
+
+    def search(self, query):
+        self.generation += 1
+
+        if len(query) < 3:
+            self.search_done_signal.emit(self.generation, False)
+            return
+
+        indexer = get_indexer()
+        if indexer.get_index() is None:
+            self.search_done_signal.emit(self.generation, False)
+            return
+
+        # Pick up files changed since the last search
+        indexer.refresh()
+
+        QThreadPool.globalInstance().start(
+            PugdebugContentSearchTask(self, self.generation,
+                                      indexer.get_index(), query)
+        )
+
+    def cancel(self):
+        self.generation += 1
+
+    def search_lines(self, generation, index, query):
+        """Search for the lines with the query in the candidate files
+
+        Called from a background thread.
+        """
+        found = 0
+
+        for path in index.get_candidates(query):
+            if generation != self.generation:
+                return
+
+            lines = find_lines(os.path.join(index.root, path), query,
+                               self.max_lines - found)
+
+            if len(lines) > 0:
+                self.lines_found_signal.emit(generation, index.root, path,
+                                             lines)
+
+            found += len(lines)
+            if found >= self.max_lines:
+                self.search_done_signal.emit(generation, True)
+                return
+
+        self.search_done_signal.emit(generation, False)
+
+
+indexer = None
+
+
+def get_indexer():
+    global indexer
+    if indexer is None:
+        indexer = PugdebugContentIndexer()
+    return indexer
@@ -9,6 +9,10 @@
 
 from PyQt5.QtCore import QFile, QFileInfo, QIODevice, QTextCodec
 
+from pugdebug import settings
+from pugdebug.line_diff import PugdebugLineDiff, get_lines
+from pugdebug.mapped_file import PugdebugMappedFile
+
 
 class PugdebugDocument():
 
@@ -17,21 +21,84 @@ class PugdebugDocument():
     contents = None
     filename = None
 
-    def __init__(self, path):
+    lines = None
+
+    # Changes to the lines since the file was read the last time
+    changes = None
+
+    # Files over the large file threshold are not read whole, only the
+    # parts of them that are shown are read and decoded
+    is_large = False
+    mapped_file = None
+
+    def __init__(self, path, large_file_threshold=None):
         self.path = path
 
-        self.read_file(path)
+        self.read_file(path, large_file_threshold)
 
-    def read_file(self, path):
+    def read_file(self, path, large_file_threshold=None):
         """Read in a file
+
+        If the file was read before, diff the lines of it.
+
+        Large files are read only in parts instead, without diffing.
+        The threshold for large files, in bytes, is taken from the
+        settings if not given; it has to be given when reading in a
+        thread other than the main one.
         """
         file = QFile(path)
         fileinfo = QFileInfo(file)
 
+        self.filename = fileinfo.fileName()
+
+        self.close()
+
+        if large_file_threshold is None:
+            large_file_threshold = (
+                settings.value('editor/large_file_threshold') * 1024
+            )
+
+        if fileinfo.size() > large_file_threshold:
+            self.is_large = True
+            self.mapped_file = PugdebugMappedFile(path)
+
+            self.contents = None
+            self.lines = None
+            self.changes = None
+            return
+
+        self.is_large = False
+
         file.open(QIODevice.ReadOnly)
         data = file.readAll()
         codec = QTextCodec.codecForName('UTF-8')
 
         self.contents = codec.toUnicode(data)
 
-        self.filename = fileinfo.fileName()
+        lines = get_lines(self.contents)
+        if self.lines is not None:
+            self.changes = PugdebugLineDiff(self.lines, lines)
+        else:
+            self.changes = None
+        self.lines = lines
+
+    def close(self):
+        """Forget the line starts of a large file
+        """
+        if self.mapped_file is not None:
+            self.mapped_file.close()
+            self.mapped_file = None
+
+    def get_text(self, first, last):
+        """Get the text of the lines from first up to, not including, last
+        """
+        if self.is_large:
+            return self.mapped_file.get_text(first, last)
+
+        return '\n'.join(self.lines[first:last])
+
+    def get_line_count(self):
+        if self.is_large:
+            return self.mapped_file.get_line_count()
+
+        return len(self.lines)
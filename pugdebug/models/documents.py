@@ -7,12 +7,28 @@
     license: GNU GPL v3, see LICENSE for more details
 """
 
+import collections
 import hashlib
-import time
+import os
 
-from PyQt5.QtCore import QObject, QFileSystemWatcher, QFileInfo, pyqtSignal
+from PyQt5.QtCore import (QObject, QFileSystemWatcher, QFileInfo, QTimer,
+                          QRunnable, QThreadPool, pyqtSignal)
 
+from pugdebug import settings
 from pugdebug.models.document import PugdebugDocument
+from pugdebug.syntaxer import Syntaxer
+
+
+class PugdebugPrefetchTask(QRunnable):
+    def __init__(self, documents, path, large_file_threshold):
+        super(PugdebugPrefetchTask, self).__init__()
+
+        self.documents = documents
+        self.path = path
+        self.large_file_threshold = large_file_threshold
+
+    def run(self):
+        self.documents.prefetch_document(self.path, self.large_file_threshold)
 
 
 class PugdebugDocuments(QObject):
@@ -21,20 +37,55 @@ class PugdebugDocuments(QObject):
 
     open_documents = {}
 
+    # Documents closed lately, or read ahead of opening them, with the
+    # modification time and size of their files, to open them without
+    # reading the files again
+    closed_documents = None
+    max_closed_documents = 20
+
+    # Paths of the documents being read ahead
+    prefetching = None
+
+    # Timers of the paths waiting to be checked again after they changed
+    recheck_timers = None
+
+    # Number of times a missing file was checked, by path
+    recheck_counts = None
+
+    # Wait this long after the last change of a file, in milliseconds
+    recheck_interval = 100
+
+    # Give up waiting for a missing file after this many checks
+    max_rechecks = 10
+
     document_changed = pyqtSignal(object)
 
     document_removed = pyqtSignal(object)
 
+    # A document got read ahead, with its path, the document
+    # and the modification time and size of its file
+    document_prefetched = pyqtSignal(str, object, object)
+
     def __init__(self):
         super(PugdebugDocuments, self).__init__()
 
         self.watcher = QFileSystemWatcher()
         self.watcher.fileChanged.connect(self.handle_file_changed)
 
+        self.recheck_timers = {}
+        self.recheck_counts = {}
+
+        self.closed_documents = collections.OrderedDict()
+
+        self.prefetching = set()
+        self.document_prefetched.connect(self.handle_document_prefetched)
+
     def open_document(self, path):
         path_key = self.get_path_key(path)
 
-        document = PugdebugDocument(path)
+        document = self.__reopen_document(path)
+        if document is None:
+            document = PugdebugDocument(path)
         self.open_documents[path_key] = document
 
         self.watcher.addPath(path)
@@ -43,10 +94,15 @@ class PugdebugDocuments(QObject):
 
     def close_document(self, path):
         path_key = self.get_path_key(path)
-        self.open_documents.pop(path_key, None)
+        document = self.open_documents.pop(path_key, None)
+
+        if document is not None:
+            self.__keep_closed_document(document)
 
         self.watcher.removePath(path)
 
+        self.__stop_recheck(path)
+
     def refresh_document(self, path):
         """Refresh a document
 
@@ -64,6 +120,56 @@ class PugdebugDocuments(QObject):
         path_key = self.get_path_key(path)
         return path_key in self.open_documents
 
+    def prefetch_documents(self, paths):
+        """Read documents ahead of opening them
+
+        The files are read, and tokenized into the highlight cache,
+        in background threads. Documents that are open, or already
+        read ahead, are skipped.
+        """
+        large_file_threshold = (
+            settings.value('editor/large_file_threshold') * 1024
+        )
+
+        Syntaxer.get_cache()
+
+        for path in paths[:self.max_closed_documents]:
+            if (self.is_document_open(path) or path in self.prefetching or
+                    self.__is_document_cached(path)):
+                continue
+
+            self.prefetching.add(path)
+
+            QThreadPool.globalInstance().start(
+                PugdebugPrefetchTask(self, path, large_file_threshold)
+            )
+
+    def prefetch_document(self, path, large_file_threshold):
+        """Read a document ahead of opening it
+
+        Called from a background thread. Large documents are not kept.
+        """
+        file_stat = self.__get_file_stat(path)
+
+        if file_stat is None or file_stat[1] > large_file_threshold:
+            self.document_prefetched.emit(path, None, None)
+            return
+
+        document = PugdebugDocument(path, large_file_threshold)
+
+        # The text as the document widget gives it to the syntaxer
+        Syntaxer.prefetch('\n'.join(document.lines) + '\n')
+
+        self.document_prefetched.emit(path, document, file_stat)
+
+    def handle_document_prefetched(self, path, document, file_stat):
+        self.prefetching.discard(path)
+
+        if document is None or self.is_document_open(path):
+            return
+
+        self.__cache_document(document, file_stat)
+
     def handle_file_changed(self, path):
         """Handle when a watched file gets changed
 
@@ -75,37 +181,55 @@ class PugdebugDocuments(QObject):
 
         But then again, maybe that file really got deleted? Who knows?!
 
-        Anyway, when a file gets modified, we sleep a short while to
-        see if that file will "get back" and if so, add it back to the
-        watcher. If not, we'll assume the file got deleted.
+        Anyway, when a file gets modified, wait a short while for the
+        changes to settle, restarting the wait on every change, and then
+        check the file again. If the file is missing, keep checking a few
+        more times to see if that file will "get back". If not, we'll
+        assume the file got deleted.
         """
-        if not self.__is_path_watched(path):
-            fileinfo = QFileInfo(path)
+        self.recheck_counts[path] = 0
 
-            total_slept = 0
-            file_exists = fileinfo.exists()
+        timer = self.recheck_timers.get(path)
 
-            while not file_exists:
-                sleep_for = 0.1
-                total_slept += sleep_for
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self.recheck_file(path))
+            self.recheck_timers[path] = timer
 
-                if total_slept > 1:
-                    break
+        timer.start(self.recheck_interval)
 
-                time.sleep(sleep_for)
-                file_exists = fileinfo.exists()
+    def recheck_file(self, path):
+        """Check a file again after it changed
 
-            if file_exists:
+        Refresh the document if the file is there, add it back to the
+        watcher if the watcher dropped it.
+        """
+        if not self.is_document_open(path):
+            self.__stop_recheck(path)
+            return
+
+        if QFileInfo(path).exists():
+            self.__stop_recheck(path)
+
+            if not self.__is_path_watched(path):
                 self.watcher.addPath(path)
 
-                self.refresh_document(path)
-            else:
-                # file got deleted?
-                path_key = self.get_path_key(path)
-                document = self.open_documents[path_key]
-                self.document_removed.emit(document)
-        elif self.__is_path_watched(path):
             self.refresh_document(path)
+            return
+
+        self.recheck_counts[path] += 1
+
+        if self.recheck_counts[path] < self.max_rechecks:
+            self.recheck_timers[path].start(self.recheck_interval)
+            return
+
+        # file got deleted?
+        self.__stop_recheck(path)
+
+        path_key = self.get_path_key(path)
+        document = self.open_documents[path_key]
+        self.document_removed.emit(document)
 
     def get_path_key(self, path):
         path_key = hashlib.md5(path.encode('utf-8'))
@@ -113,3 +237,66 @@ class PugdebugDocuments(QObject):
 
     def __is_path_watched(self, path):
         return path in self.watcher.files()
+
+    def __keep_closed_document(self, document):
+        """Keep a closed document, to reopen it cheaply
+
+        Large documents are read only in parts, they are closed
+        instead.
+        """
+        file_stat = self.__get_file_stat(document.path)
+
+        if document.is_large or file_stat is None:
+            document.close()
+            return
+
+        self.__cache_document(document, file_stat)
+
+    def __cache_document(self, document, file_stat):
+        self.closed_documents[document.path] = (document, file_stat)
+        self.closed_documents.move_to_end(document.path)
+
+        while len(self.closed_documents) > self.max_closed_documents:
+            self.closed_documents.popitem(last=False)
+
+    def __is_document_cached(self, path):
+        if path not in self.closed_documents:
+            return False
+
+        document, file_stat = self.closed_documents[path]
+
+        return file_stat == self.__get_file_stat(path)
+
+    def __reopen_document(self, path):
+        """Get a closed document, if its file did not change since
+        """
+        closed_document = self.closed_documents.pop(path, None)
+
+        if closed_document is None:
+            return None
+
+        document, file_stat = closed_document
+
+        if file_stat != self.__get_file_stat(path):
+            return None
+
+        document.changes = None
+
+        return document
+
+    def __get_file_stat(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def __stop_recheck(self, path):
+        timer = self.recheck_timers.pop(path, None)
+
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
+
+        self.recheck_counts.pop(path, None)
@@ -7,69 +7,225 @@
     license: GNU GPL v3, see LICENSE for more details
 """
 
+import hashlib
 import os
-from PyQt5.QtCore import QDir
-from fuzzywuzzy import fuzz, process
 
+from PyQt5.QtCore import (QObject, QRunnable, QThreadPool, QStandardPaths,
+                          pyqtSignal)
 
-class PugdebugFileSearch():
+from pugdebug import settings, projects
+from pugdebug.file_index import PugdebugFileIndex
+from pugdebug.matcher import PugdebugMatcher
 
-    def __init__(self, parent, path):
-        self.parent = parent
-        self.root = path
 
-    def ignored_paths(self):
-        ignored = []
-        ignores = []
-        ignore_file = "%s/%s" % (self.root, ".gitignore")
+class PugdebugFileIndexTask(QRunnable):
+    def __init__(self, indexer, generation, index, path):
+        super(PugdebugFileIndexTask, self).__init__()
 
-        if os.path.exists(ignore_file) and os.path.isfile(ignore_file):
-            fd = open(ignore_file)
-            ignores = fd.read().rstrip("\n").split("\n")
-            fd.close()
+        self.indexer = indexer
+        self.generation = generation
+        self.index = index
+        self.path = path
 
-        if len(ignores) > 0:
-            ignores = list(map(lambda i: self.root + '/' + i, ignores))
-            ignored = list(filter(lambda i: os.path.isdir(i), ignores))
+    def run(self):
+        self.indexer.scan_index(self.generation, self.index, self.path)
 
-        return ignored
+
+class PugdebugFileIndexer(QObject):
+    """Keep the file index of the active project up to date
+
+    The index is loaded from the cache and scanned for changes in the
+    background, when the project gets activated and whenever a search
+    for files starts. Searches only look at the files in memory.
+    """
+
+    # The files of the index changed, with the generation of the
+    # index, the paths of the files and the matcher of PHP files
+    index_updated_signal = pyqtSignal(int, object, object)
+
+    # Scanning the index finished, with the generation of the index
+    index_scanned_signal = pyqtSignal(int)
+
+    def __init__(self):
+        super(PugdebugFileIndexer, self).__init__()
+
+        self.generation = 0
+        self.index = None
+        self.excludes = []
+        self.files = []
+        self.matcher = PugdebugMatcher([])
+
+        self.scanning = False
+        self.scan_again = False
+
+        self.index_updated_signal.connect(self.handle_index_updated)
+        self.index_scanned_signal.connect(self.handle_index_scanned)
+
+        projects.active_project_changed().connect(self.activate_project)
+
+        self.activate_project()
+
+    def activate_project(self):
+        with settings.open_group('project/' + projects.active()):
+            project_root = settings.value('path/project_root')
+            excludes = settings.value('path/excludes').splitlines()
+
+        if (self.index is not None and self.index.root == project_root and
+                self.excludes == excludes):
+            self.refresh()
+            return
+
+        self.generation += 1
+        self.index = PugdebugFileIndex(project_root, excludes)
+        self.excludes = excludes
+        self.files = []
+        self.matcher = PugdebugMatcher([])
+
+        self.scanning = False
+        self.refresh()
+
+    def refresh(self):
+        """Scan the index for changes in the background
+        """
+        if self.scanning:
+            self.scan_again = True
+            return
+
+        self.scanning = True
+        self.scan_again = False
+
+        QThreadPool.globalInstance().start(
+            PugdebugFileIndexTask(self, self.generation, self.index,
+                                  self.get_path(self.index.root))
+        )
+
+    def get_path(self, project_root):
+        directory = QStandardPaths.writableLocation(
+            QStandardPaths.CacheLocation
+        )
+
+        if not directory:
+            return None
+
+        name = hashlib.md5(project_root.encode('utf-8')).hexdigest()
+
+        return os.path.join(directory, 'file_index', name)
+
+    def scan_index(self, generation, index, path):
+        """Load the index if it is new, and scan it for changes
+
+        Called from a background thread, only one scan of
+        an index runs at a time.
+        """
+        if (path is not None and len(index.directories) == 0 and
+                index.load(path)):
+            self.emit_index_updated(generation, index)
+
+        if index.scan():
+            self.emit_index_updated(generation, index)
+
+            if path is not None:
+                index.save(path)
+
+        self.index_scanned_signal.emit(generation)
+
+    def emit_index_updated(self, generation, index):
+        files = index.get_files()
+        matcher = PugdebugMatcher([path for path in files
+                                   if path.endswith('.php')])
+
+        self.index_updated_signal.emit(generation, files, matcher)
+
+    def handle_index_updated(self, generation, files, matcher):
+        if generation == self.generation:
+            self.files = files
+            self.matcher = matcher
+
+    def handle_index_scanned(self, generation):
+        if generation != self.generation:
+            return
+
+        self.scanning = False
+
+        if self.scan_again:
+            self.refresh()
+
+    def get_files(self):
+        return self.files
+
+    def get_matcher(self):
+        return self.matcher
+
+
+class PugdebugFileSearchTask(QRunnable):
+    def __init__(self, file_search, generation, matcher, search_string):
+        super(PugdebugFileSearchTask, self).__init__()
+
+        self.file_search = file_search
+        self.generation = generation
+        self.matcher = matcher
+        self.search_string = search_string
+
+    def run(self):
+        self.file_search.search_files(self.generation, self.matcher,
+                                      self.search_string)
+
+
+class PugdebugFileSearch(QObject):
+    """Search for files in the background
+
+    Starting a search cancels the search before it. The best files
+    found so far are reported while searching.
+    """
+
+    # Files found, with the generation of the search, the paths
+    # of the files, best first, and whether the search is done
+    files_found_signal = pyqtSignal(int, object, bool)
+
+    def __init__(self, parent):
+        super(PugdebugFileSearch, self).__init__(parent)
+
+        self.generation = 0
 
     def search(self, search_string):
+        self.generation += 1
+
         if len(search_string) < 3:
-            return []
+            self.files_found_signal.emit(self.generation, [], True)
+            return
+
+        QThreadPool.globalInstance().start(
+            PugdebugFileSearchTask(self, self.generation,
+                                   get_indexer().get_matcher(),
+                                   search_string)
+        )
 
-        self.ignored = self.ignored_paths()
+    def cancel(self):
+        self.generation += 1
 
-        files = self.recursive(self.root, search_string, [])
+    def search_files(self, generation, matcher, search_string):
+        """Search for files and report them
 
-        scorer = fuzz.token_sort_ratio
-        files = process.extract(search_string, files, limit=10, scorer=scorer)
+        Called from a background thread.
+        """
+        def found(paths):
+            self.files_found_signal.emit(generation, paths, False)
 
-        return [f[0] for f in files]
+        def cancelled():
+            return generation != self.generation
 
-    def recursive(self, path, search_string, paths):
-        directory = QDir(path)
-        directory.setFilter(QDir.Files | QDir.Dirs | QDir.NoDotAndDotDot)
-        directory.setSorting(QDir.DirsLast)
+        paths = matcher.search(search_string, limit=10, found=found,
+                               cancelled=cancelled)
 
-        for entry in directory.entryInfoList():
-            entry_path = entry.absoluteFilePath()
-            ignored = self.is_ignored(entry_path)
-            if not ignored and entry.isFile() and entry_path.endswith('php'):
-                current_path = entry_path[len(self.root) + 1:]
+        if paths is not None:
+            self.files_found_signal.emit(generation, paths, True)
 
-                if self.is_fuzzy(current_path, search_string):
-                    paths.append(current_path)
-            elif not ignored and entry.isDir():
-                paths = self.recursive(entry_path, search_string, paths)
 
-        return paths
+indexer = None
 
-    def is_ignored(self, path):
-        for ignored in self.ignored:
-            if path.startswith(ignored):
-                return True
-        return False
 
-    def is_fuzzy(self, current_path, search_string):
-        return fuzz.partial_ratio(search_string, current_path) > 50
+def get_indexer():
+    global indexer
+    if indexer is None:
+        indexer = PugdebugFileIndexer()
+    return indexer
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import concurrent.futures
+import functools
+import hashlib
+import multiprocessing
+import os
+import threading
+
+from PyQt5.QtCore import (QObject, QRunnable, QThreadPool, QStandardPaths,
+                          pyqtSignal)
+
+from pugdebug.models import file_search
+
+
+class PugdebugProjectIndexTask(QRunnable):
+    def __init__(self, indexer, generation, index, files, paths, path):
+        super(PugdebugProjectIndexTask, self).__init__()
+
+        self.indexer = indexer
+        self.generation = generation
+        self.index = index
+        self.files = files
+        self.paths = paths
+        self.path = path
+
+    def run(self):
+        self.indexer.update_index(self.generation, self.index, self.files,
+                                  self.paths, self.path)
+
+
+class PugdebugProjectIndexer(QObject):
+    """Keep an index of the PHP files of the project up to date
+
+    The index follows the files of the file index. Changed files are read
+    in a pool of processes, in the background. The index is loaded from
+    the cache when the project is activated, and saved after it changed.
+
+    Files known to have changed, like open documents, can be indexed
+    on their own, without checking all the files of the project.
+
+    Subclasses set the class of the index, and name the directory it
+    is cached in.
+    """
+
+    # Class of the index, created with the project root, it has the
+    # update, update_paths, save and load methods and the stamps
+    index_class = None
+
+    # Directory in the cache the indexes are saved in
+    cache_name = None
+
+    # Files read in one go by a process of the pool
+    chunk_size = 32
+
+    # Updating the index finished, with the generation of the index
+    index_updated_signal = pyqtSignal(int)
+
+    def __init__(self):
+        super(PugdebugProjectIndexer, self).__init__()
+
+        self.generation = 0
+        self.index = None
+        self.files = []
+        self.file_set = set()
+
+        # Pending updates, of all the files and of the changed paths
+        self.refresh_files = False
+        self.changed_paths = set()
+
+        self.updating = False
+
+        self.index_updated_signal.connect(self.handle_index_updated)
+
+        file_indexer = file_search.get_indexer()
+        file_indexer.index_updated_signal.connect(self.handle_files_updated)
+
+    def create_index(self, project_root):
+        return self.index_class(project_root)
+
+    def handle_files_updated(self, generation, files, matcher):
+        """Follow the files of the file index
+
+        Nothing is indexed before the file index lists the files of
+        the project, as the files not listed are removed from the index.
+        """
+        file_indexer = file_search.get_indexer()
+
+        if generation != file_indexer.generation:
+            return
+
+        project_root = file_indexer.index.root
+
+        if self.index is None or self.index.root != project_root:
+            self.generation += 1
+            self.index = self.create_index(project_root)
+            self.changed_paths = set()
+            self.updating = False
+
+        self.files = [path for path in files if path.endswith('.php')]
+        self.file_set = set(self.files)
+
+        self.refresh()
+
+    def refresh(self):
+        """Index the files that changed in the background
+        """
+        self.refresh_files = True
+        self.start_update()
+
+    def update_paths(self, full_paths):
+        """Index the files of the paths in the background
+
+        Only the files of the project that are indexed are updated.
+        """
+        if self.index is None:
+            return
+
+        for full_path in full_paths:
+            path = os.path.relpath(full_path, self.index.root)
+            path = path.replace(os.sep, '/')
+
+            if path in self.file_set:
+                self.changed_paths.add(path)
+
+        self.start_update()
+
+    def start_update(self):
+        if self.index is None or self.updating:
+            return
+
+        if self.refresh_files:
+            files = self.files
+        elif len(self.changed_paths) > 0:
+            files = None
+        else:
+            return
+
+        paths = list(self.changed_paths)
+
+        self.updating = True
+        self.refresh_files = False
+        self.changed_paths = set()
+
+        QThreadPool.globalInstance().start(
+            PugdebugProjectIndexTask(self, self.generation, self.index,
+                                     files, paths,
+                                     self.get_path(self.index.root))
+        )
+
+    def get_path(self, project_root):
+        directory = QStandardPaths.writableLocation(
+            QStandardPaths.CacheLocation
+        )
+
+        if not directory:
+            return None
+
+        name = hashlib.md5(project_root.encode('utf-8')).hexdigest()
+
+        return os.path.join(directory, self.cache_name, name)
+
+    def update_index(self, generation, index, files, paths, path):
+        """Load the index if it is new, and index the changed files
+
+        All the files are checked for changes, or if files is None,
+        only the paths are. Called from a background thread, only one
+        update of an index runs at a time.
+        """
+        loaded = (path is not None and len(index.stamps) == 0 and
+                  index.load(path))
+
+        if files is None:
+            # A few files are read faster than they are sent to the pool
+            changed = index.update_paths(paths)
+        else:
+            read = functools.partial(get_executor().map,
+                                     chunksize=self.chunk_size)
+
+            try:
+                changed = index.update(files, read)
+            except concurrent.futures.process.BrokenProcessPool:
+                discard_executor()
+                changed = index.update(files)
+
+        if changed and path is not None:
+            index.save(path)
+
+        if loaded or changed:
+            self.emit_index_changed(generation, index)
+
+        self.index_updated_signal.emit(generation)
+
+    def emit_index_changed(self, generation, index):
+        """Called from the background thread when the index changed
+        """
+        pass
+
+    def handle_index_updated(self, generation):
+        if generation != self.generation:
+            return
+
+        self.updating = False
+
+        self.start_update()
+
+    def get_index(self):
+        return self.index
+
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Get the pool of processes that read the project files
+
+    Forking a process with threads running is not safe, the
+    processes are spawned.
+    """
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return executor
+
+
+def discard_executor():
+    global executor
+    with executor_lock:
+        executor = None
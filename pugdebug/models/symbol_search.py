@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from pugdebug.matcher import PugdebugMatcher
+from pugdebug.models.project_index import PugdebugProjectIndexer
+from pugdebug.symbols import PugdebugSymbolIndex
+
+
+def get_match_name(name):
+    """Get the name of a symbol as the matcher matches it
+
+    The matcher prefers matches in the file names of paths, with
+    the namespaces as directories it prefers the short names.
+    """
+    return name.replace('\\', '/')
+
+
+def get_symbol_name(match_name):
+    return match_name.replace('/', '\\')
+
+
+class PugdebugSymbolIndexer(PugdebugProjectIndexer):
+    """Keep the index of the symbols of the project up to date
+    """
+
+    index_class = PugdebugSymbolIndex
+
+    cache_name = 'symbol_index'
+
+    # The symbols changed, with the generation of the index, the
+    # locations of the symbols by name and the matcher of the names
+    symbols_updated_signal = pyqtSignal(int, object, object)
+
+    def __init__(self):
+        super(PugdebugSymbolIndexer, self).__init__()
+
+        self.locations = {}
+        self.matcher = PugdebugMatcher([])
+
+        self.symbols_updated_signal.connect(self.handle_symbols_updated)
+
+    def create_index(self, project_root):
+        self.locations = {}
+        self.matcher = PugdebugMatcher([])
+
+        return super(PugdebugSymbolIndexer, self).create_index(project_root)
+
+    def emit_index_changed(self, generation, index):
+        locations = index.get_locations()
+        matcher = PugdebugMatcher([get_match_name(name)
+                                   for name in locations])
+
+        self.symbols_updated_signal.emit(generation, locations, matcher)
+
+    def handle_symbols_updated(self, generation, locations, matcher):
+        if generation == self.generation:
+            self.locations = locations
+            self.matcher = matcher
+
+    def get_locations(self):
+        return self.locations
+
+    def get_matcher(self):
+        return self.matcher
+
+
+class PugdebugSymbolSearchTask(QRunnable):
+    def __init__(self, symbol_search, generation, matcher, locations,
+                 search_string):
+        super(PugdebugSymbolSearchTask, self).__init__()
+
+        self.symbol_search = symbol_search
+        self.generation = generation
+        self.matcher = matcher
+        self.locations = locations
+        self.search_string = search_string
+
+    def run(self):
+        self.symbol_search.search_symbols(self.generation, self.matcher,
+                                          self.locations, self.search_string)
+
+
+class PugdebugSymbolSearch(QObject):
+    """Search for symbols in the background
+
+    Starting a search cancels the search before it. The best symbols
+    found so far are reported while searching.
+    """
+
+    # Symbols found, with the generation of the search, the names,
+    # paths, line numbers and kinds of the symbols, best first, and
+    # whether the search is done
+    symbols_found_signal = pyqtSignal(int, object, bool)
+
+    # Most names listed, a name can be declared in more than one place
+    limit = 10
+
+    def __init__(self, parent):
+        super(PugdebugSymbolSearch, self).__init__(parent)
+
+        self.generation = 0
+
+    def search(self, search_string):
+        self.generation += 1
+
+        if len(search_string) < 3:
+            self.symbols_found_signal.emit(self.generation, [], True)
+            return
+
+        indexer = get_indexer()
+
+        QThreadPool.globalInstance().start(
+            PugdebugSymbolSearchTask(self, self.generation,
+                                     indexer.get_matcher(),
+                                     indexer.get_locations(),
+                                     search_string)
+        )
+
+    def cancel(self):
+        self.generation += 1
+
+    def search_symbols(self, generation, matcher, locations, search_string):
+        """Search for symbols and report them
+
+        Called from a background thread.
+        """
+        def get_symbols(match_names):
+            symbols = []
+
+            for match_name in match_names:
+                name = get_symbol_name(match_name)
+
+                for path, line_number, kind in locations.get(name, []):
+                    symbols.append((name, path, line_number, kind))
+
+            return symbols
+
+        def found(match_names):
+            self.symbols_found_signal.emit(generation,
+                                           get_symbols(match_names), False)
+
+        def cancelled():
+            return generation != self.generation
+
+        match_names = matcher.search(get_match_name(search_string),
+                                     limit=self.limit,
+                                     found=found, cancelled=cancelled)
+
+        if match_names is not None:
+            self.symbols_found_signal.emit(generation,
+                                           get_symbols(match_names), True)
+
+
+indexer = None
+
+
+def get_indexer():
+    global indexer
+    if indexer is None:
+        indexer = PugdebugSymbolIndexer()
+    return indexer
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+
+# Separates the remote path from the local path of a mapping
+mapping_separator = '=>'
+
+
+def parse_mappings(text):
+    """Parse path mappings, one mapping per line
+
+    A mapping is a remote path and a local path, separated by "=>".
+    Empty lines and lines starting with "#" are skipped.
+
+    Raises ValueError if a line is not a mapping.
+    """
+    mappings = []
+
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+
+        if line == '' or line.startswith('#'):
+            continue
+
+        remote, separator, local = line.partition(mapping_separator)
+        remote = remote.strip()
+        local = local.strip()
+
+        if separator == '' or remote == '' or local == '':
+            raise ValueError('Path mapping on line %d must be like '
+                             '/remote/path => /local/path' % number)
+
+        mappings.append((remote, local))
+
+    return mappings
+
+
+def split_path(path):
+    """Split a path into its directories and its file name
+
+    Backslashes of Windows paths are split on the same as slashes.
+    Trailing slashes are dropped, so a directory splits the same
+    with or without them.
+    """
+    return normalize_path(path).rstrip('/').split('/')
+
+
+def normalize_path(path):
+    """Separate the directories of a path with slashes only
+    """
+    return path.replace('\\', '/')
+
+
+class PugdebugPathTrie():
+    """Paths that other paths start with, and what they map to
+
+    The paths are split into their directories, so /var/www is not
+    a prefix of /var/www2. The longest path a path starts with wins.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, prefix, target):
+        """Add a prefix, if it was not added before
+        """
+        node = self.root
+
+        for part in split_path(prefix):
+            node = node.setdefault(part, {})
+
+        # Directory names can not be None, it marks the end of a prefix
+        node.setdefault(None, normalize_path(target).rstrip('/'))
+
+    def map(self, path):
+        """Map a path by the longest prefix it starts with
+
+        Returns None if the path starts with none of the prefixes.
+        """
+        parts = split_path(path)
+        node = self.root
+        found = None
+
+        for depth, part in enumerate(parts):
+            if None in node:
+                found = (depth, node[None])
+
+            node = node.get(part)
+            if node is None:
+                break
+        else:
+            if None in node:
+                found = (len(parts), node[None])
+
+        if found is None:
+            return None
+
+        depth, target = found
+        rest = parts[depth:]
+
+        if len(rest) == 0:
+            return target or '/'
+
+        return target + '/' + '/'.join(rest)
+
+
+class PugdebugPathMapper():
+    """Map paths between the remote server and the local project
+
+    Remote paths are mapped to local paths, and back, by the longest
+    prefix of all the mappings they start with. Paths that start with
+    none of the prefixes are not mapped.
+
+    The mappings are compiled into a trie for each direction once.
+    Remote paths mapped to local files that exist are remembered,
+    until the local file is forgotten. Mapped paths of files that do
+    not exist are not remembered, as they can be created any time.
+    """
+
+    def __init__(self, mappings):
+        self.remote_trie = PugdebugPathTrie()
+        self.local_trie = PugdebugPathTrie()
+
+        for remote, local in mappings:
+            self.remote_trie.add(remote, local)
+            self.local_trie.add(local, remote)
+
+        self.local_paths = {}
+        self.remote_paths = {}
+
+    def to_local(self, path):
+        """Map a remote path to a local path
+
+        Returns False if the path is mapped to a file that does not exist.
+        """
+        local_path = self.local_paths.get(path)
+
+        if local_path is not None:
+            return local_path
+
+        local_path = self.remote_trie.map(path)
+
+        if local_path is None:
+            return path
+
+        # With the separators of local paths
+        local_path = os.path.normpath(local_path)
+
+        if not os.path.isfile(local_path):
+            return False
+
+        self.local_paths[path] = local_path
+
+        return local_path
+
+    def to_remote(self, path):
+        """Map a local path to a remote path
+        """
+        remote_path = self.remote_paths.get(path)
+
+        if remote_path is None:
+            remote_path = self.local_trie.map(path)
+
+            if remote_path is None:
+                remote_path = path
+
+            self.remote_paths[path] = remote_path
+
+        return remote_path
+
+    def forget(self, local_path):
+        """Forget the remote paths mapped to a local file
+
+        The file gets checked again the next time a path maps to it.
+        """
+        self.local_paths = {path: mapped_path for path, mapped_path
+                            in self.local_paths.items()
+                            if mapped_path != local_path}
+
+    def forget_all(self):
+        self.local_paths = {}
@@ -8,9 +8,10 @@ from PyQt5.QtGui import QFont, QIcon, QKeySequence
 from PyQt5.QtWidgets import (QDialog, QPushButton, QVBoxLayout, QHBoxLayout,
                              QFormLayout, QLineEdit, QSpinBox, QCheckBox,
                              QGroupBox, QListView, QAction, QMenu, QMessageBox,
-                             QFileDialog)
+                             QFileDialog, QPlainTextEdit)
 
 from pugdebug import settings, utils
+from pugdebug.path_mapper import parse_mappings
 
 
 class ProjectsBrowserModel(QAbstractListModel):
@@ -212,9 +213,23 @@ class ProjectEditDialog(QDialog):
 
         self.path_mapping_input = QLineEdit()
 
+        self.path_mappings_input = QPlainTextEdit()
+        self.path_mappings_input.setPlaceholderText(
+            'One per line, as in /usr/share/php => vendor')
+        self.path_mappings_input.setFixedHeight(
+            self.path_mappings_input.fontMetrics().lineSpacing() * 4)
+
+        self.excludes_input = QPlainTextEdit()
+        self.excludes_input.setPlaceholderText(
+            'One pattern per line, as in .gitignore')
+        self.excludes_input.setFixedHeight(
+            self.excludes_input.fontMetrics().lineSpacing() * 4)
+
         path_layout = QFormLayout()
         path_layout.addRow('Root:', project_root_layout)
         path_layout.addRow('Maps from:', self.path_mapping_input)
+        path_layout.addRow('Other mappings:', self.path_mappings_input)
+        path_layout.addRow('Excludes:', self.excludes_input)
 
         path_group = QGroupBox('Path')
         path_group.setLayout(path_layout)
@@ -238,6 +253,21 @@ class ProjectEditDialog(QDialog):
         self.max_data_input = QSpinBox()
         self.max_data_input.setRange(1, 999999999)
 
+        self.adaptive_features_input = QCheckBox(
+            'Lower the limits to keep steps fast')
+
+        self.step_latency_budget_input = QSpinBox()
+        self.step_latency_budget_input.setRange(10, 60000)
+        self.step_latency_budget_input.setSuffix(' ms')
+
+        self.eval_timeout_input = QSpinBox()
+        self.eval_timeout_input.setRange(100, 3600000)
+        self.eval_timeout_input.setSuffix(' ms')
+
+        self.command_timeout_input = QSpinBox()
+        self.command_timeout_input.setRange(100, 3600000)
+        self.command_timeout_input.setSuffix(' ms')
+
         debugger_layout = QFormLayout()
         debugger_layout.addRow('Host:', self.host_input)
         debugger_layout.addRow('Port:', self.port_number_input)
@@ -246,6 +276,12 @@ class ProjectEditDialog(QDialog):
         debugger_layout.addRow('Max depth:', self.max_depth_input)
         debugger_layout.addRow('Max children:', self.max_children_input)
         debugger_layout.addRow('Max data:', self.max_data_input)
+        debugger_layout.addRow('', self.adaptive_features_input)
+        debugger_layout.addRow('Step latency budget:',
+                               self.step_latency_budget_input)
+        debugger_layout.addRow('Eval timeout:', self.eval_timeout_input)
+        debugger_layout.addRow('Command timeout:',
+                               self.command_timeout_input)
 
         debugger_group = QGroupBox('Debugger')
         debugger_group.setLayout(debugger_layout)
@@ -305,9 +341,17 @@ class ProjectEditDialog(QDialog):
 
                 self.path_mapping_input.setText(
                     settings.value('path/path_mapping'))
+
+                self.path_mappings_input.setPlainText(
+                    settings.value('path/path_mappings'))
+
+                self.excludes_input.setPlainText(
+                    settings.value('path/excludes'))
             else:
                 self.project_root_input.setText('')
                 self.path_mapping_input.setText('')
+                self.path_mappings_input.setPlainText('')
+                self.excludes_input.setPlainText('')
 
             self.host_input.setText(
                 settings.value('debugger/host'))
@@ -330,6 +374,18 @@ class ProjectEditDialog(QDialog):
             self.max_data_input.setValue(
                 settings.value('debugger/max_data'))
 
+            self.adaptive_features_input.setChecked(
+                settings.value('debugger/adaptive_features'))
+
+            self.step_latency_budget_input.setValue(
+                settings.value('debugger/step_latency_budget'))
+
+            self.eval_timeout_input.setValue(
+                settings.value('debugger/eval_timeout'))
+
+            self.command_timeout_input.setValue(
+                settings.value('debugger/command_timeout'))
+
         super().show()
 
     def validate(self):
@@ -356,6 +412,8 @@ class ProjectEditDialog(QDialog):
                 raise ValueError('Project root path \'%s\' does not exist or '
                                  'cannot be read' % project_root)
 
+            parse_mappings(self.path_mappings_input.toPlainText())
+
             self.accept()
 
         except ValueError as err:
@@ -369,6 +427,9 @@ class ProjectEditDialog(QDialog):
             'path/project_root': os.path.normpath(
                 self.project_root_input.text().strip()),
             'path/path_mapping': self.path_mapping_input.text().strip(),
+            'path/path_mappings':
+                self.path_mappings_input.toPlainText().strip(),
+            'path/excludes': self.excludes_input.toPlainText().strip(),
             'debugger/host': self.host_input.text().strip(),
             'debugger/port_number': self.port_number_input.value(),
             'debugger/idekey': self.idekey_input.text().strip(),
@@ -377,6 +438,12 @@ class ProjectEditDialog(QDialog):
             'debugger/max_depth': self.max_depth_input.value(),
             'debugger/max_children': self.max_children_input.value(),
             'debugger/max_data': self.max_data_input.value(),
+            'debugger/adaptive_features':
+                self.adaptive_features_input.isChecked(),
+            'debugger/step_latency_budget':
+                self.step_latency_budget_input.value(),
+            'debugger/eval_timeout': self.eval_timeout_input.value(),
+            'debugger/command_timeout': self.command_timeout_input.value(),
         }
 
         get_instance().update(old_name, new_name, new_settings)
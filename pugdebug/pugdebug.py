@@ -11,6 +11,7 @@ import os
 
 import logging
 import signal
+import time
 
 from PyQt5.QtCore import QObject
 from PyQt5.QtWidgets import QErrorMessage, QMessageBox
@@ -19,7 +20,10 @@ from pugdebug.debugger import PugdebugDebugger
 from pugdebug.gui.main_window import PugdebugMainWindow
 from pugdebug.gui.document import PugdebugDocument
 from pugdebug.models.documents import PugdebugDocuments
-from pugdebug import settings, file_browser, projects
+from pugdebug.models.file_search import get_indexer
+from pugdebug.models import content_search, symbol_search
+from pugdebug.path_mapper import PugdebugPathMapper, parse_mappings
+from pugdebug import settings, file_browser, projects, utils
 
 
 class Pugdebug(QObject):
@@ -47,9 +51,18 @@ class Pugdebug(QObject):
         self.stacktrace_viewer = self.main_window.get_stacktrace_viewer()
         self.breakpoint_viewer = self.main_window.get_breakpoint_viewer()
         self.expression_viewer = self.main_window.get_expression_viewer()
+        self.find_in_project = self.main_window.get_find_in_project()
 
         self.documents = PugdebugDocuments()
 
+        # Compiled from the mappings of the active project when needed
+        self.path_mapper = None
+
+        # Index the files of the active project in the background
+        get_indexer()
+        content_search.get_indexer()
+        symbol_search.get_indexer()
+
         self.connect_signals()
 
         signal.signal(signal.SIGINT, signal.SIG_DFL)
@@ -62,23 +75,46 @@ class Pugdebug(QObject):
         """
         file_browser.file_activated().connect(self.open_local_document)
         self.connect_search_files_signals()
+        self.connect_find_in_project_signals()
         self.connect_document_viewer_signals()
         self.connect_documents_signals()
+        self.connect_path_mapping_signals()
         self.connect_toolbar_action_signals()
         self.connect_debugger_signals()
         self.connect_expression_viewer_signals()
         self.connect_stacktrace_viewer_signals()
         self.connect_breakpoint_viewer_signals()
+        self.connect_variable_viewer_signals()
 
     def connect_search_files_signals(self):
         """Connect search for files signals
 
         Connects the signal that is emited when a file search result
         is selected from the search for files dialog.
+
+        Connects the signals that are emited when a symbol search result
+        is selected, or is set to break on call, from the search for
+        symbols dialog.
         """
         self.main_window.search_file_selected_signal.connect(
             self.open_document
         )
+        self.main_window.search_symbol_selected_signal.connect(
+            self.jump_to_line_in_local_file
+        )
+        self.main_window.search_symbol_breakpoint_signal.connect(
+            self.toggle_call_breakpoint
+        )
+
+    def connect_find_in_project_signals(self):
+        """Connect find in project signals
+
+        Connects the signal that is emited when a line found in the
+        project files is activated. The paths of the lines are local.
+        """
+        self.find_in_project.line_activated_signal.connect(
+            self.jump_to_line_in_local_file
+        )
 
     def connect_document_viewer_signals(self):
         """Connect document viewer signals
@@ -103,6 +139,23 @@ class Pugdebug(QObject):
             self.handle_document_removed
         )
 
+    def connect_path_mapping_signals(self):
+        """Connect path mapping signals
+
+        Connects the signal that gets fired when the active project changes,
+        or gets edited, to compile the path mappings again.
+
+        Connects the signal that gets fired when the project files get
+        indexed, as the files that paths got mapped to could be removed.
+        """
+        projects.active_project_changed().connect(
+            self.handle_active_project_changed
+        )
+
+        get_indexer().index_updated_signal.connect(
+            self.handle_project_files_updated
+        )
+
     def connect_toolbar_action_signals(self):
         """Connect toolbar action signals
 
@@ -129,6 +182,9 @@ class Pugdebug(QObject):
         self.main_window.step_over_action.triggered.connect(self.step_over)
         self.main_window.step_into_action.triggered.connect(self.step_into)
         self.main_window.step_out_action.triggered.connect(self.step_out)
+        self.main_window.cancel_command_action.triggered.connect(
+            self.cancel_command
+        )
 
     def connect_debugger_signals(self):
         """Connect debugger signals
@@ -169,6 +225,11 @@ class Pugdebug(QObject):
             self.handle_got_stacktraces
         )
 
+        # Property value signals
+        self.debugger.got_property_value_signal.connect(
+            self.variable_viewer.handle_got_property_value
+        )
+
         # Breakpoints signals
         self.debugger.breakpoint_removed_signal.connect(
             self.handle_breakpoint_removed
@@ -185,6 +246,11 @@ class Pugdebug(QObject):
             self.handle_expressions_evaluated
         )
 
+        # Debugger features signals
+        self.debugger.debugger_features_changed_signal.connect(
+            self.main_window.set_debugger_features
+        )
+
         # Error signals
         self.debugger.error_signal.connect(
             self.handle_error
@@ -197,17 +263,28 @@ class Pugdebug(QObject):
         self.expression_viewer.expression_changed_signal.connect(
             self.handle_expression_added_or_changed
         )
+        self.expression_viewer.expression_revealed_signal.connect(
+            self.handle_expression_added_or_changed
+        )
 
     def connect_stacktrace_viewer_signals(self):
         self.stacktrace_viewer.item_double_clicked_signal.connect(
             self.jump_to_line_in_file
         )
+        self.stacktrace_viewer.frame_selected_signal.connect(
+            self.handle_frame_selected
+        )
 
     def connect_breakpoint_viewer_signals(self):
         self.breakpoint_viewer.item_double_clicked_signal.connect(
             self.jump_to_line_in_file
         )
 
+    def connect_variable_viewer_signals(self):
+        self.variable_viewer.property_value_requested_signal.connect(
+            self.handle_property_value_requested
+        )
+
     def open_local_document(self, path):
         return self.open_document(path, False)
 
@@ -246,6 +323,8 @@ class Pugdebug(QObject):
                 document_model.filename,
                 path
             )
+
+            self.close_least_recently_used_documents()
         else:
             logging.debug("Focusing opened document")
             # Just focus the tab that has the opened document
@@ -280,12 +359,44 @@ class Pugdebug(QObject):
             logging.debug("Removing breakpoint")
             self.remove_breakpoint(breakpoint)
 
+    def toggle_call_breakpoint(self, name):
+        """Toggle a breakpoint on calls of a function or a method
+
+        Methods are named as Class::method. A breakpoint on calls has no
+        file and no line, the file does not need to be open to set it.
+
+        If there is no breakpoint set on the calls, we set it.
+        If there is a breakpoint set on the calls, we remove it.
+        """
+        class_name, separator, function = name.rpartition('::')
+
+        logging.debug("Getting a call breakpoint on %s" % name)
+
+        breakpoint = self.get_call_breakpoint(class_name, function)
+
+        if breakpoint is None:
+            logging.debug("Setting call breakpoint")
+            breakpoint = {
+                'type': 'call',
+                'function': function
+            }
+            if class_name:
+                breakpoint['class'] = class_name
+            self.set_breakpoint(breakpoint)
+        else:
+            logging.debug("Removing call breakpoint")
+            self.remove_breakpoint(breakpoint)
+
     def handle_document_changed(self, document_model):
         """Handle when a document gets chaned
 
         Pass on to the document widget the new document model.
 
-        Remove stale breakpoints.
+        Move the breakpoints of the document to follow the changed lines.
+        If the changes are not known, remove stale breakpoints.
+
+        Index the changed contents for finding in the project, and
+        for searching for symbols.
         """
         path = document_model.path
 
@@ -294,7 +405,13 @@ class Pugdebug(QObject):
         document_widget = self.document_viewer.get_document_by_path(path)
         document_widget.handle_document_changed(document_model)
 
-        self.remove_stale_breakpoints(path)
+        if document_model.changes is None:
+            self.remove_stale_breakpoints(path)
+        else:
+            self.move_breakpoints(path, document_model.changes)
+
+        content_search.get_indexer().update_paths([path])
+        symbol_search.get_indexer().update_paths([path])
 
     def handle_document_removed(self, document_model):
         """Handle when a document gets removed outside of pugdebug
@@ -303,10 +420,34 @@ class Pugdebug(QObject):
 
         logging.debug("Document removed: %s" % path)
 
+        if self.path_mapper is not None:
+            self.path_mapper.forget(path)
+
         tab_index = self.document_viewer.find_tab_index_by_path(path)
         self.close_document(tab_index)
 
-    def close_document(self, tab_index):
+    def close_least_recently_used_documents(self):
+        """Close the least recently used documents over the limit
+
+        Pinned documents and the current document are not closed. The
+        breakpoints of the closed documents are kept.
+        """
+        max_open_documents = settings.value('editor/max_open_documents')
+
+        if max_open_documents <= 0:
+            return
+
+        paths = self.document_viewer.get_least_recently_used(
+            max_open_documents
+        )
+
+        for path in paths:
+            logging.debug("Closing least recently used document: %s" % path)
+
+            tab_index = self.document_viewer.find_tab_index_by_path(path)
+            self.close_document(tab_index, False)
+
+    def close_document(self, tab_index, remove_breakpoints=True):
         """Close a document
 
         Get the document from the tab.
@@ -322,7 +463,8 @@ class Pugdebug(QObject):
         document_widget.deleteLater()
         self.document_viewer.close_tab(tab_index)
 
-        self.remove_stale_breakpoints(path)
+        if remove_breakpoints:
+            self.remove_stale_breakpoints(path)
 
     def focus_current_line(self):
         """Focus the current line
@@ -339,12 +481,16 @@ class Pugdebug(QObject):
 
         self.jump_to_line_in_file(current_file, current_line, True)
 
-    def jump_to_line_in_file(self, file, line, is_current=False):
+    def jump_to_line_in_local_file(self, file, line):
+        self.jump_to_line_in_file(file, line, map_paths=False)
+
+    def jump_to_line_in_file(self, file, line, is_current=False,
+                             map_paths=True):
         """Jump to a line in a file.
 
         Show the document, and scroll to the given line.
         """
-        self.open_document(file)
+        self.open_document(file, map_paths)
 
         current = 'current ' if is_current else ''
         logging.debug("Jumping to %sline in file: %s:%s" % (
@@ -527,8 +673,9 @@ class Pugdebug(QObject):
 
             self.focus_current_line()
 
+            expressions = self.expression_viewer.get_expressions_to_evaluate()
             post_step_data = {
-                'expressions': self.expression_viewer.get_expressions()
+                'expressions': expressions
             }
             self.debugger.post_step_command(post_step_data)
         elif self.debugger.is_stopped():
@@ -581,24 +728,79 @@ class Pugdebug(QObject):
 
         self.debugger.step_out()
 
-    def handle_got_all_variables(self, variables):
+    def cancel_command(self):
+        """Cancel waiting for the reply to the current command
+
+        This gets called when the "Cancel" action button is pressed.
+        """
+        logging.debug("Cancel command")
+
+        self.debugger.cancel_command()
+
+    def handle_got_all_variables(self, variables, depth):
         """Handle when all variables are retrieved from xdebug
 
         Set the variables on the variable viewer.
         """
-        logging.debug("Setting variables received from debugger")
+        logging.debug("Setting variables received from debugger "
+                      "for depth %d" % depth)
+
+        started = time.monotonic()
+
+        self.variable_viewer.set_variables(variables, depth)
+
+        if depth == 0:
+            self.debugger.add_render_time(time.monotonic() - started)
 
-        self.variable_viewer.set_variables(variables)
+    def handle_property_value_requested(self, request):
+        """Handle when the variable viewer requests a chunk of a value
+
+        Large values get inspected chunk by chunk.
+        """
+        if self.debugger.is_connected():
+            self.debugger.get_property_value(request)
+
+    def handle_frame_selected(self, depth):
+        """Handle when a stack frame gets selected
+
+        Get the variables of the selected stack frame. Variables of frames
+        that were already inspected in the current step come from
+        the connection's cache.
+        """
+        logging.debug("Stack frame selected: %d" % depth)
+
+        if self.debugger.is_connected():
+            self.debugger.get_frame_variables(depth)
 
     def handle_got_stacktraces(self, stacktraces):
         """Handle when stacktraces are retrieved from xdebug
 
         Set the stacktraces on the stacktrace viewer.
+
+        Read the files of the stack frames ahead, so they open without
+        delay when a frame gets double clicked.
         """
         logging.debug("Setting stacktraces received from debugger")
 
         self.stacktrace_viewer.set_stacktraces(stacktraces)
 
+        self.prefetch_documents(
+            [stacktrace['filename'] for stacktrace in stacktraces]
+        )
+
+    def prefetch_documents(self, paths):
+        """Read the documents of remote paths ahead of opening them
+        """
+        local_paths = []
+
+        for path in paths:
+            local_path = self.__get_path_mapped_to_local(path)
+
+            if local_path and local_path not in local_paths:
+                local_paths.append(local_path)
+
+        self.documents.prefetch_documents(local_paths)
+
     def set_breakpoint(self, breakpoint):
         """Set a breakpoint
 
@@ -616,9 +818,10 @@ class Pugdebug(QObject):
 
             self.breakpoints.append(breakpoint)
 
-            document_widget = self.document_viewer.get_document_by_path(
-                breakpoint['local_filename'])
-            document_widget.rehighlight_breakpoint_lines()
+            if utils.is_line_breakpoint(breakpoint):
+                document_widget = self.document_viewer.get_document_by_path(
+                    breakpoint['local_filename'])
+                document_widget.rehighlight_breakpoint_lines()
 
             self.breakpoint_viewer.set_breakpoints(self.breakpoints)
 
@@ -643,12 +846,19 @@ class Pugdebug(QObject):
         if not self.debugger.is_connected():
             logging.debug("Debugger is not connected, removing breakpoint")
 
+            if not utils.is_line_breakpoint(breakpoint):
+                self.breakpoints.remove(breakpoint)
+                self.breakpoint_viewer.set_breakpoints(self.breakpoints)
+
+                return
+
             path = breakpoint['filename']
             local_path = breakpoint['local_filename']
             line_number = breakpoint['lineno']
 
             for breakpoint in self.breakpoints:
-                if (breakpoint['filename'] == path and
+                if (utils.is_line_breakpoint(breakpoint) and
+                        breakpoint['filename'] == path and
                         breakpoint['lineno'] == line_number):
                     self.breakpoints.remove(breakpoint)
 
@@ -665,20 +875,74 @@ class Pugdebug(QObject):
             logging.debug("Removing breakpoint: %s" % breakpoint_id)
             self.debugger.remove_breakpoint(breakpoint_id)
 
+    def move_breakpoints(self, path, changes):
+        """Move breakpoints of a file to follow the changes to its lines
+
+        A breakpoint on a changed line moves to the nearest line in the
+        new lines. Breakpoints on unchanged lines stay where they are,
+        a moved breakpoint that ends up on the same line as another one
+        is removed. If there are no lines left, the breakpoints are
+        removed.
+
+        If there is an active debugging session, tell the debugger to
+        move the breakpoints too.
+        """
+        remote_path = self.__get_path_mapped_to_remote(path)
+
+        logging.debug("Moving breakpoints: %s" % remote_path)
+
+        breakpoints = [breakpoint for breakpoint in self.breakpoints
+                       if utils.is_line_breakpoint(breakpoint) and
+                       breakpoint['filename'] == remote_path]
+
+        lines = changes.map_lines([int(breakpoint['lineno']) - 1
+                                   for breakpoint in breakpoints])
+
+        moved = []
+        removed = []
+
+        for breakpoint, line in zip(breakpoints, lines):
+            if line is None:
+                removed.append(breakpoint)
+                continue
+
+            line_number = line + 1
+
+            if line_number != int(breakpoint['lineno']):
+                breakpoint['lineno'] = line_number
+                moved.append(breakpoint)
+
+        if len(moved) == 0 and len(removed) == 0:
+            return
+
+        if self.debugger.is_connected():
+            for breakpoint in removed:
+                self.debugger.remove_breakpoint(int(breakpoint['id']))
+
+            self.debugger.update_breakpoints(moved)
+        else:
+            for breakpoint in removed:
+                self.breakpoints.remove(breakpoint)
+
+        document_widget = self.document_viewer.get_document_by_path(path)
+        document_widget.rehighlight_breakpoint_lines()
+
+        self.breakpoint_viewer.set_breakpoints(self.breakpoints)
+
     def remove_stale_breakpoints(self, path):
         """Remove stale breakpoints for a file
 
         Breakpoints get stale when a file gets closed.
 
-        Breakpoints get stale when a file gets changed
-        outside of the application.
+        Breakpoints get stale when a file gets changed outside of the
+        application, and it is not known which lines changed.
         """
         remote_path = self.__get_path_mapped_to_remote(path)
 
         logging.debug("Removing stale breakpoints: %s" % remote_path)
 
         breakpoints = list(filter(
-            lambda breakpoint: breakpoint['filename'] != remote_path,
+            lambda breakpoint: breakpoint.get('filename') != remote_path,
             self.breakpoints
         ))
         Pugdebug.breakpoints = breakpoints
@@ -702,8 +966,8 @@ class Pugdebug(QObject):
             if int(breakpoint['id']) == breakpoint_id:
                 logging.debug("Found removed breakpoint: %s" % breakpoint_id)
 
-                path = breakpoint['filename']
-                line_number = breakpoint['lineno']
+                path = breakpoint.get('filename')
+                line_number = breakpoint.get('lineno')
 
                 self.debugger.list_breakpoints()
 
@@ -726,21 +990,40 @@ class Pugdebug(QObject):
         Finally return None.
         """
         for breakpoint in self.breakpoints:
-            if (breakpoint['filename'] == path and
+            if (utils.is_line_breakpoint(breakpoint) and
+                    breakpoint['filename'] == path and
                     int(breakpoint['lineno']) == line_number):
                 return breakpoint
 
         return None
 
+    def get_call_breakpoint(self, class_name, function):
+        """Get a breakpoint on calls by the class and the function name
+
+        Functions that are not methods have no class name.
+        """
+        for breakpoint in self.breakpoints:
+            if (breakpoint.get('type') == 'call' and
+                    breakpoint.get('class', '') == class_name and
+                    breakpoint.get('function') == function):
+                return breakpoint
+
+        return None
+
     def handle_breakpoints_listed(self, breakpoints):
         """Handle when debugger lists breakpoints
 
         Show the breakpoints in the breakpoint viewer and rehighlight the
         breakpoint markers.
+
+        Read the files of the breakpoints ahead, as they are likely to be
+        stepped into.
         """
         logging.debug("Breakpoints listed")
 
-        for breakpoint in breakpoints:
+        line_breakpoints = list(filter(utils.is_line_breakpoint, breakpoints))
+
+        for breakpoint in line_breakpoints:
             breakpoint['local_filename'] = self.__get_path_mapped_to_local(
                 breakpoint['filename'])
 
@@ -748,7 +1031,11 @@ class Pugdebug(QObject):
 
         self.breakpoint_viewer.set_breakpoints(breakpoints)
 
-        for breakpoint in breakpoints:
+        self.prefetch_documents(
+            [breakpoint['filename'] for breakpoint in line_breakpoints]
+        )
+
+        for breakpoint in line_breakpoints:
             document_widget = self.document_viewer.get_document_by_path(
                 breakpoint['local_filename'])
             if document_widget is not None:
@@ -769,6 +1056,9 @@ class Pugdebug(QObject):
 
     def handle_expression_added_or_changed(self, index, expression):
         """Handle when an expression is added, or an existing one is changed.
+
+        Also called when a skipped expression gets visible. Expressions
+        already evaluated in the current step come from the cache.
         """
         logging.debug("Expression added or modified")
 
@@ -783,43 +1073,62 @@ class Pugdebug(QObject):
         em = QErrorMessage(self.main_window)
         em.showMessage(error)
 
-    def __get_path_mapped_to_local(self, path, map_paths=True):
-        """Get a path mapped to local
+    def handle_active_project_changed(self):
+        self.path_mapper = None
 
-        Turns a path like /var/www into /home/user/local/path
+    def handle_project_files_updated(self, generation, files, matcher):
+        if self.path_mapper is not None:
+            self.path_mapper.forget_all()
+
+    def get_path_mapper(self):
+        """Get the path mapper of the active project
+
+        The project root is mapped from the path mapping of the project,
+        and the other mappings of the project are added to it. Local
+        paths of the other mappings can be relative to the project root.
         """
+        if self.path_mapper is not None:
+            return self.path_mapper
+
         with settings.open_group('project/' + projects.active()):
             root_path = settings.value('path/project_root')
             path_map = settings.value('path/path_mapping')
+            path_mappings = settings.value('path/path_mappings')
+
+        mappings = []
+
+        if len(path_map) > 0:
+            mappings.append((path_map, root_path))
+
+        try:
+            for remote_path, local_path in parse_mappings(path_mappings):
+                local_path = os.path.join(root_path, local_path)
+                mappings.append((remote_path, local_path))
+        except ValueError as err:
+            logging.debug("Path mappings not used: %s" % err)
 
-        if (len(path_map) > 0 and
-                map_paths is True and
-                path.find(path_map) == 0):
-            path_map = path_map.rstrip('/')
-            path = path[len(path_map):]
-            path = "%s%s" % (root_path, path)
+        self.path_mapper = PugdebugPathMapper(mappings)
 
-            if not os.path.isfile(path):
-                return False
+        return self.path_mapper
 
-        return path
+    def __get_path_mapped_to_local(self, path, map_paths=True):
+        """Get a path mapped to local
+
+        Turns a path like /var/www into /home/user/local/path
+
+        Returns False if the file does not exist after mapping.
+        """
+        if map_paths is not True:
+            return path
+
+        return self.get_path_mapper().to_local(path)
 
     def __get_path_mapped_to_remote(self, path):
         """Get a path mapped to remote
 
         Turns a path like /home/user/local/path to /var/www
         """
-        with settings.open_group('project/' + projects.active()):
-            root_path = settings.value('path/project_root')
-            path_map = settings.value('path/path_mapping')
-
-        if len(path_map) > 0 and path.find(root_path) == 0:
-            path_map = path_map.rstrip('/')
-            root_path = root_path.rstrip('/')
-            path = path[len(root_path):]
-            path = "%s%s" % (path_map, path)
-
-        return path
+        return self.get_path_mapper().to_remote(path)
 
     def run(self):
         """Run the application!
@@ -7,8 +7,11 @@
     license: GNU GPL v3, see LICENSE for more details
 """
 
-from base64 import b64encode
+from base64 import b64encode, b64decode
+import re
+import select
 import socket
+import time
 
 from PyQt5.QtCore import (QObject, QThread, QThreadPool, QRunnable,
                           QMutex, pyqtSignal)
@@ -115,6 +118,14 @@ class PugdebugServer(QThread):
             self.server_stopped_signal.emit()
 
 
+class PugdebugCommandTimeout(Exception):
+    """Raised when xdebug does not reply to a command in time
+
+    Also raised when waiting for the reply gets cancelled.
+    """
+    pass
+
+
 class PugdebugAsyncTask(QRunnable):
     def __init__(self, connection, action, data):
         super(PugdebugAsyncTask, self).__init__()
@@ -132,6 +143,7 @@ class PugdebugServerConnection(QObject):
     socket = None
 
     mutex = None
+    thread_pool = None
 
     parser = None
 
@@ -140,20 +152,42 @@ class PugdebugServerConnection(QObject):
 
     transaction_id = 0
 
+    step_id = 0
+    contexts_cache = None
+    variables_cache = None
+    expressions_cache = None
+
+    debugger_features = None
+    received_bytes = 0
+
+    cancelled = False
+    abandoned_transactions = None
+
+    # Commands that wait for the script to run, these have no deadline
+    continuation_commands = ['run', 'step_into', 'step_over', 'step_out',
+                             'stop', 'detach']
+
     xdebug_encoding = 'iso-8859-1'
 
+    # Maximum number of bytes of a variable's value read in one go
+    value_chunk_size = 64 * 1024
+
     post_start_signal = pyqtSignal()
     stopped_signal = pyqtSignal()
     detached_signal = pyqtSignal()
     stepped_signal = pyqtSignal(dict)
-    got_variables_signal = pyqtSignal(object)
+    got_variables_signal = pyqtSignal(object, int)
     got_stacktraces_signal = pyqtSignal(object)
+    got_property_value_signal = pyqtSignal(object)
     set_breakpoint_signal = pyqtSignal(bool)
+    updated_breakpoints_signal = pyqtSignal(bool)
     removed_breakpoint_signal = pyqtSignal(object)
     listed_breakpoints_signal = pyqtSignal(list)
     expression_evaluated_signal = pyqtSignal(int, dict)
     expressions_evaluated_signal = pyqtSignal(list)
+    post_step_measured_signal = pyqtSignal(float, int)
 
+    command_timeout_signal = pyqtSignal(str, str)
     connection_error_signal = pyqtSignal(str, str)
 
     def __init__(self, socket):
@@ -163,8 +197,21 @@ class PugdebugServerConnection(QObject):
 
         self.mutex = QMutex()
 
+        # Commands run one at a time, in a pool of their own, so they
+        # do not wait behind indexing and other background work
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(1)
+
         self.parser = PugdebugMessageParser()
 
+        self.contexts_cache = {}
+        self.variables_cache = {}
+        self.expressions_cache = {}
+
+        self.debugger_features = {}
+
+        self.abandoned_transactions = set()
+
     def init_connection(self):
         """Init a new connection
 
@@ -192,13 +239,15 @@ class PugdebugServerConnection(QObject):
         return True
 
     def start(self, action, data=None):
-        QThreadPool.globalInstance().start(
+        self.thread_pool.start(
             PugdebugAsyncTask(self, action, data)
         )
 
     def perform(self, action, data):
         self.mutex.lock()
 
+        self.cancelled = False
+
         try:
             if action == 'post_start':
                 response = self.__post_start(data)
@@ -226,16 +275,32 @@ class PugdebugServerConnection(QObject):
                 response = self.__step_out()
                 self.stepped_signal.emit(response)
             elif action == 'post_step':
+                started = time.monotonic()
+                received_bytes = self.received_bytes
+
                 response = self.__post_step(data)
 
-                self.got_variables_signal.emit(response['variables'])
+                self.got_variables_signal.emit(response['variables'], 0)
                 self.got_stacktraces_signal.emit(response['stacktraces'])
                 self.expressions_evaluated_signal.emit(
                     response['expressions']
                 )
+                self.post_step_measured_signal.emit(
+                    time.monotonic() - started,
+                    self.received_bytes - received_bytes
+                )
+            elif action == 'frame_variables':
+                response = self.__get_variables(data)
+                self.got_variables_signal.emit(response, data)
+            elif action == 'property_value':
+                response = self.__get_property_value(data)
+                self.got_property_value_signal.emit(response)
             elif action == 'breakpoint_set':
                 response = self.__set_breakpoint(data)
                 self.set_breakpoint_signal.emit(response)
+            elif action == 'breakpoint_update':
+                response = self.__update_breakpoints(data)
+                self.updated_breakpoints_signal.emit(response)
             elif action == 'breakpoint_remove':
                 response = self.__remove_breakpoint(data)
                 self.removed_breakpoint_signal.emit(response)
@@ -244,16 +309,26 @@ class PugdebugServerConnection(QObject):
                 self.listed_breakpoints_signal.emit(response)
             elif action == 'evaluate_expression':
                 (index, expression) = data
-                response = self.__evaluate_expression(expression)
+                response = self.__evaluate_expressions([expression])[0]
                 self.expression_evaluated_signal.emit(index, response)
             elif action == 'set_debugger_features':
                 self.__set_debugger_features()
+        except PugdebugCommandTimeout as error:
+            self.command_timeout_signal.emit(action, str(error))
         except OSError as error:
             self.disconnect()
             self.connection_error_signal.emit(action, error.strerror)
 
         self.mutex.unlock()
 
+    def cancel(self):
+        """Cancel waiting for the reply to the current command
+
+        Only commands with a deadline can be cancelled, continuation
+        commands wait for the script to run.
+        """
+        self.cancelled = True
+
     def disconnect(self):
         if self.socket is not None:
             self.socket.close()
@@ -282,9 +357,18 @@ class PugdebugServerConnection(QObject):
     def post_step_command(self, post_step_data):
         self.start('post_step', post_step_data)
 
+    def get_frame_variables(self, depth):
+        self.start('frame_variables', depth)
+
+    def get_property_value(self, request):
+        self.start('property_value', request)
+
     def set_breakpoint(self, breakpoint):
         self.start('breakpoint_set', breakpoint)
 
+    def update_breakpoints(self, breakpoints):
+        self.start('breakpoint_update', breakpoints)
+
     def remove_breakpoint(self, breakpoint_id):
         self.start('breakpoint_remove', breakpoint_id)
 
@@ -345,11 +429,22 @@ class PugdebugServerConnection(QObject):
     def __do_step_command(self, command):
         response = self.__send_command(command)
 
+        # Variables of the previous step are stale now
+        self.step_id += 1
+        self.contexts_cache.clear()
+        self.variables_cache.clear()
+        self.expressions_cache.clear()
+
         response = self.parser.parse_continuation_message(response)
 
         return response
 
     def __post_step(self, data):
+        if 'debugger_features' in data:
+            for name, value in data['debugger_features'].items():
+                if self.debugger_features.get(name) != value:
+                    self.__set_debugger_feature(name, value)
+
         post_step_response = {
             'variables': self.__get_variables(),
             'stacktraces': self.__get_stacktraces(),
@@ -358,26 +453,112 @@ class PugdebugServerConnection(QObject):
 
         return post_step_response
 
-    def __get_variables(self):
-        command = 'context_names -i %d' % self.__get_transaction_id()
-        response = self.__send_command(command)
+    def __get_variables(self, depth=0):
+        """Get the variables of all contexts of a stack frame
 
-        contexts = self.parser.parse_variable_contexts_message(response)
+        Variables are cached per step, stack depth and context, so
+        switching between frames of the same step does not cost
+        any extra round trips to xdebug.
+        """
+        contexts = self.__get_variable_contexts(depth)
 
         variables = {}
 
         for context in contexts:
-            context_id = int(context['id'])
-            command = 'context_get -i %d -c %d' % (
+            key = (self.step_id, depth, context['name'])
+
+            if key not in self.variables_cache:
+                command = 'context_get -i %d -d %d -c %d' % (
+                    self.__get_transaction_id(),
+                    depth,
+                    int(context['id'])
+                )
+                response = self.__send_command(command)
+
+                self.variables_cache[key] = \
+                    self.parser.parse_variables_message(response)
+
+            variables[context['name']] = self.variables_cache[key]
+
+        return variables
+
+    def __get_variable_contexts(self, depth):
+        key = (self.step_id, depth)
+
+        if key not in self.contexts_cache:
+            command = 'context_names -i %d -d %d' % (
                 self.__get_transaction_id(),
-                context_id
+                depth
             )
             response = self.__send_command(command)
 
-            var = self.parser.parse_variables_message(response)
-            variables[context['name']] = var
+            self.contexts_cache[key] = \
+                self.parser.parse_variable_contexts_message(response)
 
-        return variables
+        return self.contexts_cache[key]
+
+    def __get_property_value(self, request):
+        """Get a chunk of the value of a variable
+
+        The request holds the fullname of the variable, the depth of the
+        stack frame and the name of the context the variable is in, the
+        offset from which to read the value, and the size of the pages
+        to read it in.
+
+        The value is read with property_value, a page at a time, with
+        max data set to the page size. Nothing gets evaluated in the
+        script, so no magic getters run, and the fullnames of private
+        and protected properties can be read too.
+
+        If xdebug replies with an error, it is returned with no data.
+        """
+        depth = request['depth']
+        offset = request['offset']
+        page_size = request.get('page_size', self.value_chunk_size)
+        page = offset // page_size
+
+        context_id = 0
+        for context in self.__get_variable_contexts(depth):
+            if context['name'] == request['context']:
+                context_id = int(context['id'])
+
+        command = 'property_value -i %d -d %d -c %d -m %d -p %d -n %s' % (
+            self.__get_transaction_id(),
+            depth,
+            context_id,
+            page_size,
+            page,
+            self.__quote_argument(request['fullname'])
+        )
+        response = self.__send_command(command)
+        response = self.parser.parse_property_value_message(response)
+
+        property_value = {
+            'fullname': request['fullname'],
+            'offset': offset,
+            'size': int(response.get('size', request['size'])),
+            'data': self.__decode_value(response)[offset - page * page_size:]
+        }
+
+        if 'error' in response:
+            property_value['error'] = response['error']
+
+        return property_value
+
+    def __decode_value(self, response):
+        value = response.get('value')
+
+        if value is None:
+            return b''
+
+        if response.get('encoding') == 'base64':
+            return b64decode(value)
+
+        return bytes(value, 'UTF-8')
+
+    def __quote_argument(self, argument):
+        argument = argument.replace('\\', '\\\\').replace('"', '\\"')
+        return '"%s"' % argument
 
     def __get_stacktraces(self):
         command = 'stack_get -i %d' % self.__get_transaction_id()
@@ -398,15 +579,46 @@ class PugdebugServerConnection(QObject):
         return all_successful
 
     def __set_breakpoint(self, breakpoint):
-        command = 'breakpoint_set -i %d -t %s -f %s -n %d' % (
+        if breakpoint.get('type') == 'call':
+            command = 'breakpoint_set -i %d -t %s -m %s' % (
+                self.__get_transaction_id(),
+                'call',
+                breakpoint['function']
+            )
+
+            if 'class' in breakpoint:
+                command += ' -a %s' % breakpoint['class']
+        else:
+            command = 'breakpoint_set -i %d -t %s -f %s -n %d' % (
+                self.__get_transaction_id(),
+                'line',
+                breakpoint['filename'],
+                int(breakpoint['lineno'])
+            )
+
+        response = self.__send_command(command)
+
+        return self.parser.parse_breakpoint_set_message(response)
+
+    def __update_breakpoints(self, breakpoints):
+        all_successful = True
+
+        for breakpoint in breakpoints:
+            response = self.__update_breakpoint(breakpoint)
+            if response is False:
+                all_successful = False
+
+        return all_successful
+
+    def __update_breakpoint(self, breakpoint):
+        command = 'breakpoint_update -i %d -d %d -n %d' % (
             self.__get_transaction_id(),
-            'line',
-            breakpoint['filename'],
+            int(breakpoint['id']),
             int(breakpoint['lineno'])
         )
         response = self.__send_command(command)
 
-        return self.parser.parse_breakpoint_set_message(response)
+        return self.parser.parse_breakpoint_update_message(response)
 
     def __remove_breakpoint(self, breakpoint_id):
         command = 'breakpoint_remove -i %d -d %d' % (
@@ -426,57 +638,183 @@ class PugdebugServerConnection(QObject):
         return breakpoints
 
     def __evaluate_expressions(self, expressions):
-        results = []
+        """Evaluate a list of watch expressions
+
+        Expressions that are None are skipped, their result is None.
+
+        Results are cached per step, as eval always runs in the current
+        stack frame. The eval commands of the expressions that are not
+        cached are all sent at once and the replies are read after that,
+        so xdebug does not wait on a round trip between them. As xdebug
+        evaluates them one after the other, the time between two replies
+        is the time it took to evaluate an expression.
+        """
+        results = [None] * len(expressions)
+        pending = []
+
         for index, expression in enumerate(expressions):
-            results.append(
-                self.__evaluate_expression(expression)
-            )
+            if expression is None:
+                continue
+
+            key = (self.step_id, expression)
+            if key in self.expressions_cache:
+                results[index] = self.expressions_cache[key]
+            else:
+                command = self.__get_eval_command(expression)
+                self.__send(command)
+                pending.append((index, key, command))
+
+        started = time.monotonic()
+
+        for position, (index, key, command) in enumerate(pending):
+            try:
+                response = self.__receive_message(
+                    self.__get_timeout(command)
+                )
+            except PugdebugCommandTimeout as error:
+                # The expressions after this one are queued behind it
+                # in xdebug, so they time out as well
+                for index, key, command in pending[position:]:
+                    self.__abandon(command)
+
+                    result = {
+                        'type': 'timeout',
+                        'value': str(error)
+                    }
+
+                    self.expressions_cache[key] = result
+                    results[index] = result
+                break
+
+            finished = time.monotonic()
+
+            result = self.parser.parse_eval_message(response)
+            result['elapsed'] = finished - started
+
+            started = finished
+
+            self.expressions_cache[key] = result
+            results[index] = result
 
         return results
 
     def __evaluate_expression(self, expression):
-        tid = self.__get_transaction_id()
-        b64 = b64encode(bytes(expression, 'UTF-8')).decode()
-        command = 'eval -i %d -- %s' % (tid, b64)
+        command = self.__get_eval_command(expression)
         response = self.__send_command(command)
 
         return self.parser.parse_eval_message(response)
 
+    def __get_eval_command(self, expression):
+        tid = self.__get_transaction_id()
+        b64 = b64encode(bytes(expression, 'UTF-8')).decode()
+        return 'eval -i %d -- %s' % (tid, b64)
+
     def __set_debugger_features(self):
         with settings.open_group('project/' + projects.active()):
             max_depth = settings.value('debugger/max_depth')
             max_children = settings.value('debugger/max_children')
             max_data = settings.value('debugger/max_data')
 
-        command = 'feature_set -i %d -n max_depth -v %d' % (
-            self.__get_transaction_id(),
-            max_depth
-        )
-        self.__send_command(command)
+        self.__set_debugger_feature('max_depth', max_depth)
+        self.__set_debugger_feature('max_children', max_children)
+        self.__set_debugger_feature('max_data', max_data)
 
-        command = 'feature_set -i %d -n max_children -v %d' % (
-            self.__get_transaction_id(),
-            max_children
-        )
-        self.__send_command(command)
+        return True
 
-        command = 'feature_set -i %d -n max_data -v %d' % (
+    def __set_debugger_feature(self, name, value):
+        command = 'feature_set -i %d -n %s -v %d' % (
             self.__get_transaction_id(),
-            max_data
+            name,
+            value
         )
         self.__send_command(command)
 
-        return True
+        self.debugger_features[name] = value
 
     def __send_command(self, command):
+        self.__send(command)
+
+        try:
+            return self.__receive_message(self.__get_timeout(command))
+        except PugdebugCommandTimeout:
+            self.__abandon(command)
+            raise
+
+    def __send(self, command):
         self.socket.send(bytes(command + '\0', 'utf-8'))
-        return self.__receive_message()
 
-    def __receive_message(self):
-        length = self.__get_message_length()
-        body = self.__get_message_body(length)
+    def __receive_message(self, timeout=None):
+        """Receive a message from xdebug
 
-        return body
+        Wait at most timeout seconds for the message to start arriving.
+
+        Replies to commands that were abandoned after timing out
+        arrive late, those are skipped.
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        while True:
+            self.__wait_for_message(deadline)
+
+            length = self.__get_message_length()
+            body = self.__get_message_body(length)
+
+            if not self.__is_abandoned(body):
+                return body
+
+    def __wait_for_message(self, deadline):
+        """Wait until the socket is readable or the deadline passes
+
+        Once a message starts arriving it is read completely,
+        so the stream never gets out of sync.
+        """
+        while deadline is not None:
+            if self.cancelled:
+                raise PugdebugCommandTimeout('cancelled')
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise PugdebugCommandTimeout('timed out')
+
+            readable, writable, errored = select.select(
+                [self.socket], [], [], min(remaining, 0.1)
+            )
+            if readable:
+                return
+
+    def __get_timeout(self, command):
+        """Get the deadline of a command, in seconds
+
+        Continuation commands wait for the script to run, so they have no
+        deadline. Evaluating expressions has its own deadline.
+        """
+        name = command.split(' ', 1)[0]
+
+        if name in self.continuation_commands:
+            return None
+
+        with settings.open_group('project/' + projects.active()):
+            if name == 'eval':
+                timeout = settings.value('debugger/eval_timeout')
+            else:
+                timeout = settings.value('debugger/command_timeout')
+
+        return timeout / 1000
+
+    def __abandon(self, command):
+        match = re.search(r'-i (\d+)', command)
+        if match is not None:
+            self.abandoned_transactions.add(match.group(1))
+
+    def __is_abandoned(self, message):
+        match = re.search(r'transaction_id="(\d+)"', message)
+        if match is None or match.group(1) not in self.abandoned_transactions:
+            return False
+
+        self.abandoned_transactions.discard(match.group(1))
+        return True
 
     def __get_message_length(self):
         length = ''
@@ -507,6 +845,7 @@ class PugdebugServerConnection(QObject):
             body = body + data.decode(self.xdebug_encoding)
 
             length = length - len(data)
+            self.received_bytes += len(data)
 
         self.__get_null()
 
@@ -57,6 +57,24 @@ class Settings(QSettings):
                     'type': bool,
                     'default': False,
                 },
+                'large_file_threshold': {
+                    'type': int,
+                    'default': 2048,
+                },
+                'max_open_documents': {
+                    'type': int,
+                    'default': 30,
+                },
+            },
+            'expressions_viewer': {
+                'only_visible': {
+                    'type': bool,
+                    'default': False,
+                },
+                'slow_threshold': {
+                    'type': int,
+                    'default': 100,
+                },
             },
             'project': {
                 '*': {
@@ -69,6 +87,14 @@ class Settings(QSettings):
                             'type': str,
                             'default': '',
                         },
+                        'path_mappings': {
+                            'type': str,
+                            'default': '',
+                        },
+                        'excludes': {
+                            'type': str,
+                            'default': '',
+                        },
                     },
                     'debugger': {
                         'host': {
@@ -99,6 +125,22 @@ class Settings(QSettings):
                             'type': int,
                             'default': 512,
                         },
+                        'adaptive_features': {
+                            'type': bool,
+                            'default': False,
+                        },
+                        'step_latency_budget': {
+                            'type': int,
+                            'default': 300,
+                        },
+                        'eval_timeout': {
+                            'type': int,
+                            'default': 5000,
+                        },
+                        'command_timeout': {
+                            'type': int,
+                            'default': 30000,
+                        },
                     },
                 },
             },
@@ -204,11 +246,29 @@ class SettingsEditDialog(QDialog):
 
         self.enable_text_wrapping_input = QCheckBox('Enable text wrapping')
 
+        self.large_file_threshold_input = QSpinBox()
+        self.large_file_threshold_input.setRange(64, 1024 * 1024)
+        self.large_file_threshold_input.setSuffix(' KB')
+        self.large_file_threshold_input.setToolTip(
+            'Larger files are shown only around the current line'
+        )
+
+        self.max_open_documents_input = QSpinBox()
+        self.max_open_documents_input.setRange(0, 1000)
+        self.max_open_documents_input.setSpecialValueText('Unlimited')
+        self.max_open_documents_input.setToolTip(
+            'Least recently used tabs that are not pinned get closed'
+        )
+
         editor_layout = QFormLayout()
         editor_layout.addRow('Font family:', self.font_family_input)
         editor_layout.addRow('Font size:', self.font_size_input)
         editor_layout.addRow('Tab size:', self.tab_size_input)
         editor_layout.addRow('', self.enable_text_wrapping_input)
+        editor_layout.addRow('Large file threshold:',
+                             self.large_file_threshold_input)
+        editor_layout.addRow('Max open documents:',
+                             self.max_open_documents_input)
 
         editor_group = QGroupBox('Editor')
         editor_group.setLayout(editor_layout)
@@ -252,6 +312,12 @@ class SettingsEditDialog(QDialog):
         self.enable_text_wrapping_input.setChecked(
             value('editor/enable_text_wrapping'))
 
+        self.large_file_threshold_input.setValue(
+            value('editor/large_file_threshold'))
+
+        self.max_open_documents_input.setValue(
+            value('editor/max_open_documents'))
+
         super().show()
 
     def save(self):
@@ -261,6 +327,10 @@ class SettingsEditDialog(QDialog):
         set_value('editor/tab_size', self.tab_size_input.value())
         set_value('editor/enable_text_wrapping',
                   self.enable_text_wrapping_input.isChecked())
+        set_value('editor/large_file_threshold',
+                  self.large_file_threshold_input.value())
+        set_value('editor/max_open_documents',
+                  self.max_open_documents_input.value())
 
         edit_dialog_saved().emit()
 
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+
+from pygments.token import (Keyword, Name, Punctuation, Operator, Comment,
+                            Text)
+
+from pugdebug.tokenizer import PugdebugTokenizer
+
+# Keywords that declare a class like symbol, enum is not a keyword
+# for the lexer, it is a name
+class_keywords = ('class', 'interface', 'trait', 'enum')
+
+
+def find_symbols(text):
+    """Find the classes, interfaces, traits, enums, functions and methods
+
+    Returns the names of the symbols, qualified with their namespaces,
+    the kinds of the symbols and the line numbers they are declared on,
+    starting from 1. Methods are named after their classes, as
+    Class::method. Anonymous classes and closures are left out.
+    """
+    symbols = []
+
+    namespace = ''
+
+    # Depth of the braces, and the names of the classes declared,
+    # with the depths of their bodies
+    depth = 0
+    classes = []
+
+    # The declaration keyword waiting for its name, and the name of
+    # the class waiting for its body, None for an anonymous class,
+    # False if no class is waiting
+    declaring = None
+    class_body = False
+
+    # Whether the last keyword imports, use function is no declaration
+    importing = False
+
+    line_number = 1
+    counted = 0
+
+    for position, token, value in PugdebugTokenizer().tokenize(text):
+        if token in Text or token in Comment:
+            continue
+
+        if declaring == 'function' and token in Operator and value == '&':
+            # A function returning by reference
+            continue
+
+        if declaring is not None:
+            keyword = declaring
+            declaring = None
+
+            if keyword == 'namespace':
+                if token in Name:
+                    namespace = value.strip('\\') + '\\'
+                else:
+                    namespace = ''
+            elif token in Name:
+                line_number += text.count('\n', counted, position)
+                counted = position
+
+                if keyword == 'function':
+                    name = get_function_name(namespace, classes, depth, value)
+                    if name is not None:
+                        symbols.append((name[0], name[1], line_number))
+                    continue
+
+                name = namespace + value
+                symbols.append((name, keyword, line_number))
+                class_body = name
+                continue
+            elif keyword in class_keywords:
+                # An anonymous class
+                class_body = None
+
+        if token in Keyword:
+            if value in class_keywords or value == 'namespace':
+                declaring = value
+                if value in class_keywords:
+                    # Until the name is known, the body is anonymous
+                    class_body = None
+            elif value == 'function' and not importing:
+                declaring = value
+
+            importing = value == 'use'
+            continue
+
+        importing = False
+
+        if token is Name.Other and value == 'enum':
+            declaring = value
+        elif token in Punctuation:
+            for character in value:
+                if character == '{':
+                    depth += 1
+                    if class_body is not False:
+                        classes.append((class_body, depth))
+                        class_body = False
+                elif character == '}':
+                    if len(classes) > 0 and classes[-1][1] == depth:
+                        classes.pop()
+                    depth -= 1
+
+    return symbols
+
+
+def get_function_name(namespace, classes, depth, name):
+    """Get the name and kind of a function declared at a depth
+
+    Functions declared right in the body of a class are its methods.
+    Returns None for the methods of anonymous classes.
+    """
+    if len(classes) > 0 and classes[-1][1] == depth:
+        class_name = classes[-1][0]
+
+        if class_name is None:
+            return None
+
+        return class_name + '::' + name, 'method'
+
+    return namespace + name, 'function'
+
+
+def read_symbols(full_path):
+    """Read the symbols of a file
+
+    Returns the modification time and size of the file, and its
+    symbols, or None if the file can not be read. Runs in the
+    processes of a process pool.
+    """
+    try:
+        with open(full_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            text = f.read().decode('utf-8', 'replace')
+    except OSError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size), find_symbols(text)
+
+
+class PugdebugSymbolIndex():
+    """An index of the symbols declared in the PHP files of a project
+
+    The symbols of a file are read again only when the modification
+    time or the size of the file changed.
+
+    The index is used from more than one thread, a lock is held
+    while it is used.
+    """
+
+    # Bump when the format of the saved index changes
+    version = 1
+
+    def __init__(self, root):
+        self.root = root
+
+        self.lock = threading.Lock()
+
+        # Modification times and sizes, and symbols of the files
+        self.stamps = {}
+        self.symbols = {}
+
+    def update(self, paths, read=map):
+        """Read the symbols of the files that changed since they were read
+
+        The paths are relative to the root. Files are read with the
+        read function, it can be the map of a process pool executor.
+        Files that are not in the paths are removed from the index.
+
+        Returns True if the index changed.
+        """
+        with self.lock:
+            removed = self.stamps.keys() - set(paths)
+            for path in removed:
+                self.remove(path)
+
+        changed = self.update_paths(paths, read)
+
+        return changed or len(removed) > 0
+
+    def update_paths(self, paths, read=map):
+        """Read the symbols of the files of the paths that changed
+
+        Other files of the index are kept as they are. Files that do
+        not exist any more are removed from the index.
+
+        Returns True if the index changed.
+        """
+        changed = []
+        removed = []
+
+        for path in paths:
+            try:
+                stat = os.stat(os.path.join(self.root, path))
+            except OSError:
+                removed.append(path)
+                continue
+
+            if self.stamps.get(path) != (stat.st_mtime_ns, stat.st_size):
+                changed.append(path)
+
+        with self.lock:
+            removed = [path for path in removed if path in self.stamps]
+            for path in removed:
+                self.remove(path)
+
+        full_paths = [os.path.join(self.root, path) for path in changed]
+
+        for path, result in zip(changed, read(read_symbols, full_paths)):
+            with self.lock:
+                if result is None:
+                    self.remove(path)
+                else:
+                    self.stamps[path], self.symbols[path] = result
+
+        return len(changed) > 0 or len(removed) > 0
+
+    def remove(self, path):
+        self.stamps.pop(path, None)
+        self.symbols.pop(path, None)
+
+    def get_locations(self):
+        """Get the files and lines the symbols are declared at, by name
+        """
+        locations = {}
+
+        with self.lock:
+            for path, symbols in sorted(self.symbols.items()):
+                for name, kind, line_number in symbols:
+                    locations.setdefault(name, []).append(
+                        (path, line_number, kind)
+                    )
+
+        return locations
+
+    def save(self, path):
+        with self.lock:
+            data = {
+                'version': self.version,
+                'root': self.root,
+                'stamps': self.stamps,
+                'symbols': self.symbols
+            }
+
+            try:
+                directory = os.path.dirname(path)
+                os.makedirs(directory, exist_ok=True)
+
+                fd, temporary_path = tempfile.mkstemp(dir=directory)
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary_path, path)
+            except OSError:
+                pass
+
+    def load(self, path):
+        """Load a saved index
+
+        Returns False if there is no index saved for this root.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+
+            if data['version'] != self.version or data['root'] != self.root:
+                return False
+
+            stamps = data['stamps']
+            symbols = data['symbols']
+        except (OSError, EOFError, KeyError, TypeError,
+                pickle.UnpicklingError):
+            return False
+
+        with self.lock:
+            self.stamps = stamps
+            self.symbols = symbols
+
+        return True
@@ -1,42 +1,347 @@
 # -*- coding: utf-8 -*-
 
+import bisect
+import os
+
 import pygments
 import pygments.formatter
-import pygments.lexers.php
 
+from PyQt5.QtCore import (Qt, pyqtSignal, QObject, QRunnable, QThreadPool,
+                          QStandardPaths)
 from PyQt5.QtGui import QSyntaxHighlighter, QColor, QFont, QTextCharFormat
 
+from pugdebug.highlight_cache import PugdebugHighlightCache
+from pugdebug.tokenizer import PugdebugTokenizer, token_types
+
+
+class PugdebugHighlightTaskSignals(QObject):
+
+    # Document got tokenized, with the generation of the highlighting,
+    # line formats and checkpoints
+    tokenized_signal = pyqtSignal(int, object, object)
+
+
+class PugdebugHighlightTask(QRunnable):
+    """Tokenize a document in the background
+
+    The task does not hold on to the syntaxer, which can get deleted
+    while the task runs, when its document gets closed. The syntaxer
+    gets the result through the signal of the task, the connection
+    is gone once the syntaxer is deleted.
+    """
+
+    def __init__(self, generation, text, stack, key):
+        super(PugdebugHighlightTask, self).__init__()
+
+        self.signals = PugdebugHighlightTaskSignals()
+
+        self.generation = generation
+        self.text = text
+        self.stack = stack
+        self.key = key
+
+    def run(self):
+        highlighting = Syntaxer.tokenize_text(self.text, self.stack,
+                                              self.key)
+
+        self.signals.tokenized_signal.emit(self.generation, *highlighting)
+
 
 class Syntaxer(QSyntaxHighlighter):
+    """Highlight PHP code
+
+    The whole document is tokenized in a background thread while it is
+    shown plain, or the result is taken from the highlight cache if the
+    same contents were highlighted before.
+
+    Blocks that need to be tokenized again are tokenized lazily, when
+    they get visible. The state of the lexer is checkpointed at the
+    starts of blocks, so tokenizing can resume from the nearest
+    checkpoint before the blocks that need to be highlighted.
+    """
+
+    style = 'default'
 
     formatter = None
+    cache = None
+
+    # Blocks tokenized after the blocks being highlighted, so the
+    # tokens that span the last highlighted blocks are tokenized whole
+    lookahead = 50
+
+    # If there is no checkpoint closer than this to the blocks being
+    # highlighted, tokenize from a bit before them in a guessed state
+    max_resume_distance = 2000
+
+    # Formats are ready to be applied to the visible blocks
+    formats_ready_signal = pyqtSignal()
 
     def __init__(self, document):
         super().__init__(document)
 
         if Syntaxer.formatter is None:
-            Syntaxer.formatter = Formatter(style='default')
+            Syntaxer.formatter = Formatter(style=self.style)
+
+        self.get_cache()
 
-        self.lexer = pygments.lexers.php.PhpLexer()
+        self.tokenizer = PugdebugTokenizer()
+
+        self.generation = 0
+
+        # Lexer state at the start of the document
+        self.start_stack = ('root',)
 
         self.highlight()
 
-    def highlight(self):
+    def highlight(self, stack=('root',)):
+        """Highlight the document anew
+
+        Take the highlighting from the cache, or tokenize the document
+        in the background. Until then the document is shown plain.
+
+        The lexer state to start in can be given, for documents that
+        are a part of a file.
+        """
+        self.start_stack = stack
+
+        self.reset()
+
+        text = self.document().toPlainText() + '\n'
+        key = self.get_key(text, stack)
+
+        highlighting = self.cache.get(key)
+
+        if highlighting is None:
+            self.pending = True
+
+            task = PugdebugHighlightTask(self.generation, text, stack, key)
+            task.signals.tokenized_signal.connect(self.handle_tokenized,
+                                                  Qt.QueuedConnection)
+            QThreadPool.globalInstance().start(task)
+        else:
+            self.pending = False
+            self.set_highlighting(*highlighting)
+            self.formats_ready_signal.emit()
+
+    @classmethod
+    def get_cache(cls):
+        if cls.cache is None:
+            directory = QStandardPaths.writableLocation(
+                QStandardPaths.CacheLocation
+            )
+            Syntaxer.cache = PugdebugHighlightCache(
+                os.path.join(directory, 'highlight') if directory else None
+            )
+
+        return cls.cache
+
+    @classmethod
+    def get_key(cls, text, stack=('root',)):
+        return cls.cache.get_key(text, '%s/%s' % (cls.style, '/'.join(stack)))
+
+    @classmethod
+    def tokenize_text(cls, text, stack, key):
+        """Get the highlighting of a text from the cache, or tokenize it
+
+        Can be called from any thread, once the cache is made.
+        """
+        highlighting = cls.cache.load(key)
+
+        if highlighting is None:
+            checkpoints = {}
+            lines = PugdebugTokenizer().tokenize_lines(text, stack,
+                                                       checkpoints)
+            cls.cache.save(key, lines, checkpoints)
+            highlighting = (lines, checkpoints)
+
+        return highlighting
+
+    @classmethod
+    def prefetch(cls, text):
+        """Tokenize a document into the highlight cache
+        """
+        cls.tokenize_text(text, ('root',), cls.get_key(text))
+
+    def reset(self):
+        """Forget the highlighting of the document
+        """
+        self.generation += 1
+
+        self.formats = {}
+        self.highlighted = set()
+
+        # Block numbers with known lexer state at their start,
+        # and the lexer state stacks for those blocks
+        self.checkpoint_blocks = [0]
+        self.checkpoints = {0: self.start_stack}
+
+    def handle_tokenized(self, generation, lines, checkpoints):
+        # The document changed since, another task is on it
+        if generation != self.generation:
+            return
+
+        self.pending = False
+        self.set_highlighting(lines, checkpoints)
+        self.formats_ready_signal.emit()
+
+    def set_highlighting(self, lines, checkpoints):
+        block_count = self.document().blockCount()
+
+        self.formats = dict(enumerate(lines[:block_count]))
+
+        self.checkpoints = {block_number: stack
+                            for block_number, stack in checkpoints.items()
+                            if block_number < block_count}
+        self.checkpoints[0] = self.start_stack
+        self.checkpoint_blocks = sorted(self.checkpoints)
+
+    def highlight_blocks(self, first, last):
+        """Highlight a range of blocks
+
+        Tokenize the range from the first block in it that has no
+        formats, from the nearest checkpoint before it, and apply the
+        formats to the blocks that are not highlighted yet.
+        """
+        if self.pending:
+            return
+
         document = self.document()
-        self.formatter.document = document
-        pygments.highlight(document.toPlainText(), self.lexer, self.formatter)
+        last = min(last, document.blockCount() - 1)
+
+        for block_number in range(first, last + 1):
+            if block_number not in self.formats:
+                self.tokenize_blocks(block_number, last)
+                break
+
+        block = document.findBlockByNumber(first)
+        for block_number in range(first, last + 1):
+            if block_number not in self.highlighted:
+                self.rehighlightBlock(block)
+            block = block.next()
+
+    def tokenize_blocks(self, first, last):
+        document = self.document()
+        block_count = document.blockCount()
+
+        index = bisect.bisect_right(self.checkpoint_blocks, first) - 1
+        start = self.checkpoint_blocks[index]
+        stack = self.checkpoints[start]
+        exact = True
+
+        if first - start > self.max_resume_distance:
+            # Most of a PHP file is code
+            start = max(0, first - self.lookahead)
+            stack = ('root', 'php')
+            exact = False
+
+        end = min(last + self.lookahead, block_count - 1)
+
+        block = document.findBlockByNumber(start)
+
+        lines = []
+        for block_number in range(start, end + 1):
+            lines.append(block.text())
+            block = block.next()
+        text = '\n'.join(lines) + '\n'
+
+        # Blocks are the lines of the text, so the line numbers
+        # are the block numbers relative to the start block
+        checkpoints = {} if exact else None
+        formats = self.tokenizer.tokenize_lines(text, stack, checkpoints)
+
+        for block_number in range(first, last + 1):
+            if exact or block_number not in self.formats:
+                self.formats[block_number] = formats[block_number - start]
+                self.highlighted.discard(block_number)
+
+        if not exact:
+            return
+
+        # If the lexer state after the range is not the same as it was,
+        # a change in the range affects the blocks after it too
+        following = last + 1
+        if (following in self.formats and
+                checkpoints.get(following - start) !=
+                self.checkpoints.get(following)):
+            self.invalidate_from(following)
+
+        self.add_checkpoints(checkpoints, start, last + 1)
+
+    def add_checkpoints(self, checkpoints, start, last):
+        for line, stack in checkpoints.items():
+            block_number = start + line
+
+            if block_number > last:
+                continue
+
+            if block_number not in self.checkpoints:
+                bisect.insort(self.checkpoint_blocks, block_number)
+            self.checkpoints[block_number] = stack
+
+    def invalidate_from(self, first):
+        """Forget the highlighting of the blocks from the first one on
+        """
+        self.formats = {block_number: block_formats
+                        for block_number, block_formats
+                        in self.formats.items()
+                        if block_number < first}
+        self.highlighted = {block_number
+                            for block_number in self.highlighted
+                            if block_number < first}
+
+        index = bisect.bisect_left(self.checkpoint_blocks, first)
+        for block_number in self.checkpoint_blocks[index:]:
+            del self.checkpoints[block_number]
+        del self.checkpoint_blocks[index:]
+
+    def shift_formats(self, changes):
+        """Move the formats of blocks to where the blocks are after changes
+
+        Called before the changes are applied to the document. Changed
+        blocks, and the first block after every change, get tokenized
+        again when they get visible.
+        """
+        following = {j2 for tag, i1, i2, j1, j2 in changes.opcodes}
+
+        def shift(block_numbers):
+            for block_number in block_numbers:
+                new_block_number = changes.map_line(block_number)
+
+                if (new_block_number is not None and
+                        new_block_number not in following):
+                    yield block_number, new_block_number
+
+        self.formats = {new_block_number: self.formats[block_number]
+                        for block_number, new_block_number
+                        in shift(list(self.formats))}
+        self.highlighted = {new_block_number
+                            for block_number, new_block_number
+                            in shift(list(self.highlighted))}
+
+        checkpoints = {new_block_number: self.checkpoints[block_number]
+                       for block_number, new_block_number
+                       in shift(self.checkpoint_blocks)}
+        checkpoints[0] = self.start_stack
+
+        self.checkpoints = checkpoints
+        self.checkpoint_blocks = sorted(checkpoints)
 
     def highlightBlock(self, text):
         block_number = self.currentBlock().blockNumber()
         start = 0
 
-        if block_number not in self.formatter.formats:
+        if block_number not in self.formats:
             return
 
-        for block_format in self.formatter.formats[block_number]:
-            count = block_format['count']
-            token = block_format['token']
-            self.setFormat(start, count, self.formatter.styles[token])
+        self.highlighted.add(block_number)
+
+        block_formats = self.formats[block_number]
+        styles = self.formatter.styles
+
+        for i in range(0, len(block_formats), 2):
+            count = block_formats[i]
+            token = token_types[block_formats[i + 1]]
+            self.setFormat(start, count, styles[token])
             start += count
 
 
@@ -46,7 +351,6 @@ class Formatter(pygments.formatter.Formatter):
         super().__init__(**options)
 
         self.styles = {}
-        self.formats = {}
 
         for token, style in self.style:
             format = QTextCharFormat()
@@ -61,50 +365,3 @@ class Formatter(pygments.formatter.Formatter):
                 format.setFontWeight(QFont.Bold)
 
             self.styles[token] = format
-
-    def format(self, tokensource, outfile):
-        """Format source file
-
-        Formats are separated block by block.
-        """
-        # Formats for every block, block by block
-        self.formats = {}
-
-        # Current position in the source
-        current_position = 0
-
-        for token, value in tokensource:
-            next_position = current_position + len(value)
-
-            start_block = self.document.findBlock(current_position)
-            start_block_number = start_block.blockNumber()
-
-            end_block = self.document.findBlock(next_position - 1)
-            end_block_number = end_block.blockNumber()
-
-            if end_block_number > start_block_number:
-                prev_position = current_position
-
-                for block_number in range(start_block_number + 1,
-                                          end_block_number + 1):
-                    block = self.document.findBlockByNumber(block_number)
-                    count = block.position() - prev_position
-                    self.__add_block_format(block_number - 1, count, token)
-                    prev_position = block.position()
-
-                count = next_position - block.position()
-                self.__add_block_format(block_number, count, token)
-
-            else:
-                self.__add_block_format(start_block_number, len(value), token)
-
-            current_position = next_position
-
-    def __add_block_format(self, block_number, count, token):
-        if block_number not in self.formats:
-            self.formats[block_number] = []
-
-        self.formats[block_number].append({
-            'count': count,
-            'token': token
-        })
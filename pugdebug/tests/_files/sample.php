@@ -0,0 +1,26 @@
+<html>
+<body>
+<?php
+namespace App\Http;
+
+/**
+ * A doc comment
+ * spanning lines
+ */
+class Foo extends Bar
+{
+    const LIMIT = 10;
+
+    public function handle($request)
+    {
+        $name = "Hello {$request->name}";
+        $text = <<<EOT
+heredoc text
+EOT;
+        // comment
+        return strlen($name) + self::LIMIT;
+    }
+}
+?>
+</body>
+</html>
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import tempfile
+import unittest
+
+from pugdebug.file_index import PugdebugFileIndex
+
+
+class CountingFileIndex(PugdebugFileIndex):
+
+    def __init__(self, root):
+        super(CountingFileIndex, self).__init__(root)
+        self.listed = []
+
+    def list_directory(self, full_path, modified):
+        self.listed.append(full_path)
+        return super(CountingFileIndex, self).list_directory(full_path,
+                                                             modified)
+
+
+class PugdebugFileIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, 'project')
+        os.mkdir(self.root)
+
+        self.path = os.path.join(self.directory.name, 'cache', 'index')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_file(self, path, contents=''):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(contents)
+
+    def touch_directory(self, path, modified):
+        full_path = os.path.join(self.root, path)
+        os.utime(full_path, ns=(modified, modified))
+
+    def test_indexes_files(self):
+        self.write_file('index.php')
+        self.write_file('src/App.php')
+        self.write_file('src/Model/User.php')
+        self.write_file('.hidden/secret.php')
+
+        index = PugdebugFileIndex(self.root)
+
+        self.assertTrue(index.scan())
+        self.assertEqual(['index.php', 'src/App.php', 'src/Model/User.php'],
+                         index.get_files())
+
+    def test_skips_ignored_directories(self):
+        self.write_file('.gitignore', '# dependencies\n/vendor/\ncache.txt\n')
+        self.write_file('index.php')
+        self.write_file('vendor/lib/Lib.php')
+
+        index = PugdebugFileIndex(self.root)
+        index.scan()
+
+        self.assertEqual(['index.php'], index.get_files())
+
+    def test_lists_only_changed_directories(self):
+        self.write_file('index.php')
+        self.write_file('src/App.php')
+        self.write_file('lib/Lib.php')
+
+        index = CountingFileIndex(self.root)
+        index.scan()
+        self.assertEqual(3, len(index.listed))
+
+        index.listed = []
+        self.assertFalse(index.scan())
+        self.assertEqual([], index.listed)
+
+        self.write_file('src/Other.php')
+        self.touch_directory('src', 1)
+
+        index.listed = []
+        self.assertTrue(index.scan())
+        self.assertEqual([os.path.join(self.root, 'src')], index.listed)
+        self.assertIn('src/Other.php', index.get_files())
+
+    def test_forgets_removed_directories(self):
+        self.write_file('src/App.php')
+
+        index = PugdebugFileIndex(self.root)
+        index.scan()
+
+        os.remove(os.path.join(self.root, 'src/App.php'))
+        os.rmdir(os.path.join(self.root, 'src'))
+        self.touch_directory('', 1)
+
+        self.assertTrue(index.scan())
+        self.assertEqual([], index.get_files())
+        self.assertNotIn('src', index.directories)
+
+    def test_saves_and_loads(self):
+        self.write_file('src/App.php')
+
+        index = PugdebugFileIndex(self.root)
+        index.scan()
+
+        index.save(self.path)
+
+        loaded = CountingFileIndex(self.root)
+        self.assertTrue(loaded.load(self.path))
+        self.assertEqual(['src/App.php'], loaded.get_files())
+
+        self.assertFalse(loaded.scan())
+        self.assertEqual([], loaded.listed)
+
+    def test_does_not_load_index_of_other_root(self):
+        index = PugdebugFileIndex(self.root)
+        index.scan()
+
+        index.save(self.path)
+
+        other = PugdebugFileIndex(os.path.join(self.root, 'other'))
+        self.assertFalse(other.load(self.path))
+        self.assertFalse(other.load(self.path + '.missing'))
+
+    def test_applies_nested_ignore_files_and_excludes(self):
+        self.write_file('.gitignore', '*.log\n')
+        self.write_file('app/.gitignore', '!keep.log\ntmp/\n')
+        self.write_file('error.log')
+        self.write_file('app/keep.log')
+        self.write_file('app/error.log')
+        self.write_file('app/tmp/cache.php')
+        self.write_file('app/index.php')
+        self.write_file('build/out.php')
+
+        index = PugdebugFileIndex(self.root, ['/build/'])
+        index.scan()
+
+        self.assertEqual(['app/index.php', 'app/keep.log'], index.get_files())
+        self.assertNotIn('app/tmp', index.directories)
+        self.assertNotIn('build', index.directories)
+
+    def test_rereads_changed_ignore_files(self):
+        self.write_file('.gitignore', '')
+        self.write_file('index.log')
+        self.write_file('index.php')
+
+        index = PugdebugFileIndex(self.root)
+        index.scan()
+        self.assertEqual(['index.log', 'index.php'], index.get_files())
+
+        # Editing a file does not change the directory
+        modified = os.stat(self.root).st_mtime_ns
+        self.write_file('.gitignore', '*.log\n')
+        os.utime(os.path.join(self.root, '.gitignore'), ns=(1, 1))
+        self.touch_directory('', modified)
+
+        self.assertTrue(index.scan())
+        self.assertEqual(['index.php'], index.get_files())
+
+    def test_gets_entries_of_scanned_directories(self):
+        self.write_file('.gitignore', '/vendor/\n*.log\n')
+        self.write_file('index.php')
+        self.write_file('error.log')
+        self.write_file('src/App.php')
+        self.write_file('vendor/lib/Lib.php')
+
+        index = PugdebugFileIndex(self.root)
+        self.assertIsNone(index.get_entries(''))
+
+        index.scan()
+
+        dirs, ignored_dirs, files = index.get_entries('')
+        self.assertEqual(['src'], dirs)
+        self.assertEqual(['vendor'], ignored_dirs)
+        self.assertEqual(['.gitignore', 'index.php'], sorted(files))
+
+        self.assertEqual(([], [], ['App.php']), index.get_entries('src'))
+        self.assertIsNone(index.get_entries('vendor'))
+
+    def test_gets_hidden_entries_without_indexing_them(self):
+        self.write_file('.gitignore', '.env\n')
+        self.write_file('.htaccess')
+        self.write_file('.env')
+        self.write_file('.git/HEAD')
+        self.write_file('.github/workflows/ci.yml')
+        self.write_file('index.php')
+
+        index = PugdebugFileIndex(self.root)
+        index.scan()
+
+        self.assertEqual(['index.php'], index.get_files())
+
+        dirs, ignored_dirs, files = index.get_entries('')
+        self.assertEqual([], dirs)
+        self.assertEqual(['.github'], ignored_dirs)
+        self.assertEqual(['.gitignore', '.htaccess', 'index.php'],
+                         sorted(files))
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import pickle
+import tempfile
+import unittest
+
+from array import array
+
+from pygments.token import Name, Keyword
+
+from pugdebug.highlight_cache import PugdebugHighlightCache
+from pugdebug.tokenizer import PugdebugTokenizer, get_token_id, token_types
+
+
+class PugdebugHighlightCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = PugdebugHighlightCache(self.directory.name,
+                                            memory_size=2, max_files=2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_depends_on_text_and_style(self):
+        key = self.cache.get_key('<?php echo 1;\n', 'DefaultStyle')
+
+        self.assertEqual(key,
+                         self.cache.get_key('<?php echo 1;\n', 'DefaultStyle'))
+        self.assertNotEqual(key,
+                            self.cache.get_key('<?php echo 2;\n',
+                                               'DefaultStyle'))
+        self.assertNotEqual(key,
+                            self.cache.get_key('<?php echo 1;\n',
+                                               'MonokaiStyle'))
+
+    def test_loads_saved_highlighting_from_disk(self):
+        text = '<?php\n/* a\nb */\n$c = 1;\n'
+        checkpoints = {}
+        lines = PugdebugTokenizer().tokenize_lines(text,
+                                                   checkpoints=checkpoints)
+
+        self.cache.save('key', lines, checkpoints)
+
+        cache = PugdebugHighlightCache(self.directory.name)
+        self.assertIsNone(cache.get('key'))
+
+        loaded_lines, loaded_checkpoints = cache.load('key')
+
+        self.assertEqual(lines, loaded_lines)
+        self.assertEqual(checkpoints, loaded_checkpoints)
+        self.assertIsNotNone(cache.get('key'))
+
+    def test_maps_token_ids_of_other_processes(self):
+        name_id = get_token_id(Name)
+        keyword_id = get_token_id(Keyword)
+
+        self.cache.save('key', [array('I', [3, name_id, 4, keyword_id])], {})
+
+        # Saved by a process that had the token types the other way round
+        path = self.cache.get_path('key')
+        tokens = [str(token) for token in token_types]
+        tokens[name_id], tokens[keyword_id] = (tokens[keyword_id],
+                                               tokens[name_id])
+
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        data['tokens'] = tokens
+        with open(path, 'wb') as f:
+            pickle.dump(data, f)
+
+        lines, checkpoints = PugdebugHighlightCache(
+            self.directory.name
+        ).load('key')
+
+        self.assertEqual(array('I', [3, keyword_id, 4, name_id]), lines[0])
+
+    def test_keeps_limited_number_of_highlightings(self):
+        for key in ['a', 'b', 'c']:
+            self.cache.save(key, [], {})
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('c'))
+        self.assertEqual(2, len(os.listdir(self.directory.name)))
+
+    def test_counts_files_without_scanning_each_save(self):
+        cache = PugdebugHighlightCache(self.directory.name, max_files=10)
+
+        for key in ['a', 'b', 'a']:
+            cache.save(key, [], {})
+
+        self.assertEqual(2, cache.file_count)
+
+        # Only scanned again when over the limit
+        for key in range(20):
+            cache.save(str(key), [], {})
+
+        self.assertLessEqual(cache.file_count, 10)
+        self.assertEqual(cache.file_count,
+                         len(os.listdir(self.directory.name)))
+
+    def test_ignores_broken_files(self):
+        with open(self.cache.get_path('key'), 'wb') as f:
+            f.write(b'broken')
+
+        self.assertIsNone(self.cache.load('key'))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import unittest
+
+from pugdebug.ignore import PugdebugIgnoreRules, is_ignored, parse_line
+
+
+class PugdebugIgnoreTest(unittest.TestCase):
+
+    def assertIgnored(self, rules, path, is_directory=False):
+        self.assertTrue(rules.match(path, is_directory), path)
+
+    def assertNotIgnored(self, rules, path, is_directory=False):
+        self.assertFalse(rules.match(path, is_directory), path)
+
+    def test_skips_blank_lines_and_comments(self):
+        self.assertIsNone(parse_line(''))
+        self.assertIsNone(parse_line('   '))
+        self.assertIsNone(parse_line('# comment'))
+        self.assertIsNotNone(parse_line('\\#file'))
+
+        self.assertIsNone(PugdebugIgnoreRules(['# comment']).match('a', True))
+
+    def test_matches_names_at_any_depth(self):
+        rules = PugdebugIgnoreRules(['*.log', 'cache'])
+
+        self.assertIgnored(rules, 'error.log')
+        self.assertIgnored(rules, 'var/logs/error.log')
+        self.assertIgnored(rules, 'app/cache', True)
+        self.assertNotIgnored(rules, 'error.log.php')
+        self.assertNotIgnored(rules, 'app/caches', True)
+
+    def test_anchors_patterns_with_slashes(self):
+        rules = PugdebugIgnoreRules(['/build', 'docs/api'])
+
+        self.assertIgnored(rules, 'build', True)
+        self.assertNotIgnored(rules, 'src/build', True)
+        self.assertIgnored(rules, 'docs/api', True)
+        self.assertNotIgnored(rules, 'src/docs/api', True)
+
+    def test_matches_only_directories_with_trailing_slash(self):
+        rules = PugdebugIgnoreRules(['vendor/'])
+
+        self.assertIgnored(rules, 'vendor', True)
+        self.assertIgnored(rules, 'lib/vendor', True)
+        self.assertNotIgnored(rules, 'vendor')
+
+    def test_matches_globs(self):
+        rules = PugdebugIgnoreRules(['[ab]?.php', 'src/*/tmp', '\\!x'])
+
+        self.assertIgnored(rules, 'ax.php')
+        self.assertIgnored(rules, 'lib/b1.php')
+        self.assertNotIgnored(rules, 'cx.php')
+        self.assertNotIgnored(rules, 'abx.php')
+        self.assertIgnored(rules, 'src/app/tmp', True)
+        self.assertNotIgnored(rules, 'src/app/lib/tmp', True)
+        self.assertIgnored(rules, '!x')
+
+    def test_matches_any_directories_with_two_asterisks(self):
+        rules = PugdebugIgnoreRules(['**/fixtures', 'docs/**/*.txt',
+                                     'generated/**'])
+
+        self.assertIgnored(rules, 'fixtures', True)
+        self.assertIgnored(rules, 'tests/unit/fixtures', True)
+        self.assertIgnored(rules, 'docs/readme.txt')
+        self.assertIgnored(rules, 'docs/a/b/readme.txt')
+        self.assertIgnored(rules, 'generated/a/b.php')
+        self.assertNotIgnored(rules, 'generated', True)
+
+    def test_last_matching_pattern_decides(self):
+        rules = PugdebugIgnoreRules(['*.log', '!important.log'])
+
+        self.assertIgnored(rules, 'error.log')
+        self.assertIs(False, rules.match('logs/important.log', False))
+
+        rules = PugdebugIgnoreRules(['!important.log', '*.log'])
+
+        self.assertIgnored(rules, 'important.log')
+
+    def test_deeper_ignore_files_decide_first(self):
+        root_rules = (('', PugdebugIgnoreRules(['*.log'])),)
+        app_rules = root_rules + (
+            ('app/', PugdebugIgnoreRules(['!*.log', '/cache/'])),
+        )
+
+        self.assertTrue(is_ignored(root_rules, 'error.log', False))
+        self.assertFalse(is_ignored(root_rules, 'cache', True))
+        self.assertFalse(is_ignored(app_rules, 'app/error.log', False))
+        self.assertTrue(is_ignored(app_rules, 'app/cache', True))
+        self.assertFalse(is_ignored(app_rules, 'app/index.php', False))
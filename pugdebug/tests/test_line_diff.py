@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import unittest
+
+from pugdebug.line_diff import PugdebugLineDiff, get_lines
+
+
+class PugdebugLineDiffTest(unittest.TestCase):
+
+    def apply(self, diff, old_lines, new_lines):
+        lines = list(old_lines)
+
+        for tag, i1, i2, j1, j2 in reversed(diff.opcodes):
+            lines[i1:i2] = new_lines[j1:j2]
+
+        return lines
+
+    def test_splits_lines_like_text_blocks(self):
+        self.assertEqual(['a', 'b', 'c', 'd', ''],
+                         get_lines('a\r\nb\rc\u2029d\n'))
+        self.assertEqual([''], get_lines(''))
+
+    def test_no_changes(self):
+        lines = ['a', 'b', 'c']
+        diff = PugdebugLineDiff(lines, list(lines))
+
+        self.assertFalse(diff.has_changes())
+        self.assertEqual(2, diff.map_line(2))
+
+    def test_changed_line(self):
+        old_lines = ['a', 'b', 'c', 'd']
+        new_lines = ['a', 'x', 'c', 'd']
+        diff = PugdebugLineDiff(old_lines, new_lines)
+
+        self.assertEqual([('replace', 1, 2, 1, 2)], diff.opcodes)
+        self.assertEqual(new_lines, self.apply(diff, old_lines, new_lines))
+
+        self.assertEqual(0, diff.map_line(0))
+        self.assertIsNone(diff.map_line(1))
+        self.assertEqual(3, diff.map_line(3))
+
+    def test_inserted_and_removed_lines(self):
+        old_lines = ['a', 'b', 'c', 'd', 'e', 'f']
+        new_lines = ['a', 'x', 'y', 'b', 'c', 'e', 'f', 'g']
+        diff = PugdebugLineDiff(old_lines, new_lines)
+
+        self.assertEqual(new_lines, self.apply(diff, old_lines, new_lines))
+
+        self.assertEqual(0, diff.map_line(0))
+        self.assertEqual(3, diff.map_line(1))
+        self.assertEqual(4, diff.map_line(2))
+        self.assertIsNone(diff.map_line(3))
+        self.assertEqual(5, diff.map_line(4))
+        self.assertEqual(6, diff.map_line(5))
+
+    def test_maps_changed_lines_to_nearest(self):
+        old_lines = ['a', 'b', 'c', 'd', 'e']
+        new_lines = ['a', 'x', 'e']
+        diff = PugdebugLineDiff(old_lines, new_lines)
+
+        self.assertIsNone(diff.map_line(2))
+        self.assertEqual(1, diff.map_line(1, nearest=True))
+        self.assertEqual(1, diff.map_line(3, nearest=True))
+        self.assertEqual(2, diff.map_line(4, nearest=True))
+
+    def test_removed_lines_at_end(self):
+        old_lines = ['a', 'b', 'c']
+        new_lines = ['a']
+        diff = PugdebugLineDiff(old_lines, new_lines)
+
+        self.assertEqual([('delete', 1, 3, 1, 1)], diff.opcodes)
+        self.assertEqual(new_lines, self.apply(diff, old_lines, new_lines))
+        self.assertIsNone(diff.map_line(2))
+        self.assertEqual(0, diff.map_line(2, nearest=True))
+
+    def test_all_lines_removed(self):
+        old_lines = ['a', 'b', 'c']
+        new_lines = []
+        diff = PugdebugLineDiff(old_lines, new_lines)
+
+        self.assertEqual([('delete', 0, 3, 0, 0)], diff.opcodes)
+        self.assertEqual(new_lines, self.apply(diff, old_lines, new_lines))
+        self.assertIsNone(diff.map_line(0, nearest=True))
+        self.assertIsNone(diff.map_line(2, nearest=True))
+
+    def test_repeated_lines(self):
+        old_lines = ['}', '}', '}']
+        new_lines = ['}', '}', '}', '}']
+        diff = PugdebugLineDiff(old_lines, new_lines)
+
+        self.assertEqual([('insert', 3, 3, 3, 4)], diff.opcodes)
+        self.assertEqual(2, diff.map_line(2))
+
+    def test_maps_unchanged_lines_first(self):
+        old_lines = ['a', 'b', 'c', 'd', 'e']
+        new_lines = ['a', 'c', 'x', 'e']
+        diff = PugdebugLineDiff(old_lines, new_lines)
+
+        self.assertEqual(1, diff.map_line(1, nearest=True))
+        self.assertEqual([None, 1, 2, 0], diff.map_lines([1, 2, 3, 0]))
+        self.assertEqual([1, None], diff.map_lines([2, 1]))
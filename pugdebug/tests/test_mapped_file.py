@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import re
+import tempfile
+import unittest
+
+from pugdebug.mapped_file import PugdebugMappedFile
+
+
+class PugdebugMappedFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def map_file(self, data):
+        path = os.path.join(self.directory.name, 'file.php')
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        mapped_file = PugdebugMappedFile(path)
+        self.addCleanup(mapped_file.close)
+
+        return mapped_file
+
+    def test_gets_text_of_lines(self):
+        mapped_file = self.map_file(b'a\nb\r\nc\nd')
+
+        self.assertEqual('a', mapped_file.get_text(0, 1))
+        self.assertEqual('b\r\nc', mapped_file.get_text(1, 3))
+        self.assertEqual('c\nd', mapped_file.get_text(2, 10))
+        self.assertEqual('', mapped_file.get_text(10, 20))
+        self.assertEqual(4, mapped_file.get_line_count())
+
+    def test_indexes_lines_lazily(self):
+        mapped_file = self.map_file(b'line\n' * 1000)
+        mapped_file.index_chunk_size = 50
+
+        self.assertEqual('line\nline', mapped_file.get_text(3, 5))
+        self.assertTrue(mapped_file.indexed < mapped_file.size)
+
+        self.assertEqual(1001, mapped_file.get_line_count())
+        self.assertEqual(mapped_file.size, mapped_file.indexed)
+
+    def test_decodes_utf8(self):
+        mapped_file = self.map_file('čćž\n€'.encode('utf-8'))
+
+        self.assertEqual('čćž\n€', mapped_file.get_text(0, 2))
+
+    def test_empty_file(self):
+        mapped_file = self.map_file(b'')
+
+        self.assertEqual('', mapped_file.get_text(0, 10))
+        self.assertEqual(1, mapped_file.get_line_count())
+
+    def test_splits_lines_like_text_blocks(self):
+        mapped_file = self.map_file('a\rb\r\nc\u2029d\ne'.encode('utf-8'))
+
+        self.assertEqual(5, mapped_file.get_line_count())
+        self.assertEqual(['a', 'b', 'c', 'd', 'e'],
+                         [mapped_file.get_text(line, line + 1)
+                          for line in range(5)])
+
+    def test_finds_separators_split_between_chunks(self):
+        data = 'ab\r\n\u2029cd\r'.encode('utf-8') * 20
+        mapped_file = self.map_file(data)
+        mapped_file.index_chunk_size = 5
+
+        self.assertEqual(61, mapped_file.get_line_count())
+        self.assertEqual('ab', mapped_file.get_text(0, 1))
+        self.assertEqual('', mapped_file.get_text(1, 2))
+        self.assertEqual('cd', mapped_file.get_text(2, 3))
+
+    def test_reads_files_that_got_shorter(self):
+        mapped_file = self.map_file(b'line\n' * 100)
+
+        with open(mapped_file.path, 'wb') as f:
+            f.write(b'short\nfile')
+
+        self.assertEqual('short\nfile', mapped_file.get_text(0, 100))
+        self.assertEqual('', mapped_file.get_text(50, 51))
+
+    def test_finds_matches_between_chunks(self):
+        mapped_file = self.map_file(b'xxabc\nabcabc\n' * 10)
+        mapped_file.index_chunk_size = 4
+
+        matches = list(mapped_file.find_all(re.compile(b'abc'), 3))
+
+        self.assertEqual(30, len(matches))
+        self.assertEqual([(0, 2), (1, 0), (1, 3), (2, 2)], matches[:4])
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import unittest
+
+from pugdebug.matcher import PugdebugMatcher
+
+
+class PugdebugMatcherTest(unittest.TestCase):
+
+    paths = [
+        'src/Controller/UserController.php',
+        'src/Model/User.php',
+        'src/Model/UserGroup.php',
+        'tests/Model/UserTest.php',
+        'vendor/lib/src/users/list.php',
+        'index.php'
+    ]
+
+    def setUp(self):
+        self.matcher = PugdebugMatcher(self.paths)
+
+    def test_matches_subsequences_ignoring_case(self):
+        self.assertEqual(['src/Controller/UserController.php'],
+                         self.matcher.search('UsrCtrl'))
+        self.assertEqual(['src/Controller/UserController.php'],
+                         self.matcher.search('usr ctrl'))
+        self.assertEqual([], self.matcher.search('phpsrc'))
+        self.assertEqual([], self.matcher.search(' '))
+
+    def test_prefers_file_names(self):
+        self.assertEqual([
+            'src/Model/User.php',
+            'src/Model/UserGroup.php',
+            'tests/Model/UserTest.php',
+            'src/Controller/UserController.php',
+            'vendor/lib/src/users/list.php'
+        ], self.matcher.search('user'))
+
+    def test_prefers_starts_of_words(self):
+        self.assertEqual('src/Model/UserGroup.php',
+                         self.matcher.search('ug')[0])
+
+    def test_limits_results(self):
+        results = self.matcher.search('php', limit=3)
+
+        self.assertEqual(['index.php', 'src/Model/User.php',
+                          'src/Model/UserGroup.php'], results)
+
+    def test_finds_best_of_many_paths(self):
+        paths = ['lib/module%d/file%d.php' % (i, i) for i in range(5000)]
+        paths.append('lib/module1234/Controller.php')
+        matcher = PugdebugMatcher(paths)
+
+        self.assertEqual(['lib/module1234/Controller.php'],
+                         matcher.search('control'))
+        self.assertEqual('lib/module1234/file1234.php',
+                         matcher.search('file1234', limit=1)[0])
+        self.assertEqual(['lib/module1234/Controller.php'],
+                         matcher.search('m1234ctr'))
+
+    def test_narrows_growing_queries(self):
+        paths = ['lib/module%d/file%d.php' % (i, i) for i in range(1000)]
+        matcher = PugdebugMatcher(paths)
+
+        for query in ['m', 'mo', 'mod9', 'mod99', 'mod9', 'f', 'fi1', 'f12']:
+            expected = PugdebugMatcher(paths).search(query, limit=20)
+            self.assertEqual(expected, matcher.search(query, limit=20))
+
+    def test_keeps_paths_matching_last_query(self):
+        self.matcher.search('zz')
+        self.assertEqual(('zz', [], len(self.paths)), self.matcher.narrowing)
+
+        self.matcher.search('zzz')
+        self.assertEqual('zzz', self.matcher.narrowing[0])
+
+        self.matcher.reset()
+        self.assertEqual(('', [], 0), self.matcher.narrowing)
+
+    def test_reports_files_found_while_searching(self):
+        paths = ['lib/module%d/file%d.php' % (i, i) for i in range(5000)]
+        matcher = PugdebugMatcher(paths)
+        matcher.report_interval = 10
+
+        reported = []
+        results = matcher.search('m1f', found=reported.append)
+
+        self.assertTrue(len(reported) > 0)
+        self.assertEqual(results, PugdebugMatcher(paths).search('m1f'))
+
+    def test_cancels_search(self):
+        paths = ['lib/module%d/file%d.php' % (i, i) for i in range(5000)]
+        matcher = PugdebugMatcher(paths)
+        matcher.report_interval = 10
+
+        self.assertIsNone(matcher.search('m1f', cancelled=lambda: True))
+        self.assertEqual(PugdebugMatcher(paths).search('m1f'),
+                         matcher.search('m1f'))
@@ -95,6 +95,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
         expected = [
             {
                 'name': '$i',
+                'fullname': '$i',
                 'type': 'int',
                 'value': '1'
             }
@@ -112,28 +113,33 @@ class PugdebugMessageParserTest(unittest.TestCase):
         expected = [
             {
                 'name': '$_COOKIE',
+                'fullname': '$_COOKIE',
                 'type': 'array',
                 'variables': [],
                 'numchildren': '0'
             },
             {
                 'name': '$_ENV',
+                'fullname': '$_ENV',
                 'type': 'array',
                 'variables': [],
                 'numchildren': '0'
             },
             {
                 'name': '$_FILES',
+                'fullname': '$_FILES',
                 'type': 'array',
                 'variables': [],
                 'numchildren': '0'
             },
             {
                 'name': '$_GET',
+                'fullname': '$_GET',
                 'type': 'array',
                 'variables': [
                     {
                         'name': 'XDEBUG_SESSION_START',
+                        'fullname': "$_GET['XDEBUG_SESSION_START']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'MQ==',
@@ -144,16 +150,19 @@ class PugdebugMessageParserTest(unittest.TestCase):
             },
             {
                 'name': '$_POST',
+                'fullname': '$_POST',
                 'type': 'array',
                 'variables': [],
                 'numchildren': '0'
             },
             {
                 'name': '$_REQUEST',
+                'fullname': '$_REQUEST',
                 'type': 'array',
                 'variables': [
                     {
                         'name': 'XDEBUG_SESSION_START',
+                        'fullname': "$_REQUEST['XDEBUG_SESSION_START']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'MQ==',
@@ -164,10 +173,12 @@ class PugdebugMessageParserTest(unittest.TestCase):
             },
             {
                 'name': '$_SERVER',
+                'fullname': '$_SERVER',
                 'type': 'array',
                 'variables': [
                     {
                         'name': 'UNIQUE_ID',
+                        'fullname': "$_SERVER['UNIQUE_ID']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'VlBBajZpYWgxVGtGQGlDVzFuNzhCZ0FBQUFB',
@@ -175,6 +186,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'HTTP_HOST',
+                        'fullname': "$_SERVER['HTTP_HOST']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'bG9jYWxob3N0',
@@ -182,6 +194,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'HTTP_USER_AGENT',
+                        'fullname': "$_SERVER['HTTP_USER_AGENT']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'TW96aWxsYS81LjAgKFgxMTsgRmVkb3JhOyBMaW51eCB4ODZfNjQ7IHJ2OjM2LjApIEdlY2tvLzIwMTAwMTAxIEZpcmVmb3gvMzYuMA==',
@@ -189,6 +202,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'HTTP_ACCEPT',
+                        'fullname': "$_SERVER['HTTP_ACCEPT']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'dGV4dC9odG1sLGFwcGxpY2F0aW9uL3hodG1sK3htbCxhcHBsaWNhdGlvbi94bWw7cT0wLjksKi8qO3E9MC44',
@@ -196,6 +210,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'HTTP_ACCEPT_LANGUAGE',
+                        'fullname': "$_SERVER['HTTP_ACCEPT_LANGUAGE']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'ZW4tVVMsZW47cT0wLjU=',
@@ -203,6 +218,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'HTTP_ACCEPT_ENCODING',
+                        'fullname': "$_SERVER['HTTP_ACCEPT_ENCODING']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'Z3ppcCwgZGVmbGF0ZQ==',
@@ -210,6 +226,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'HTTP_CONNECTION',
+                        'fullname': "$_SERVER['HTTP_CONNECTION']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'a2VlcC1hbGl2ZQ==',
@@ -217,6 +234,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'PATH',
+                        'fullname': "$_SERVER['PATH']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'L3Vzci9sb2NhbC9zYmluOi91c3IvbG9jYWwvYmluOi91c3Ivc2JpbjovdXNyL2Jpbg==',
@@ -224,6 +242,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'SERVER_SIGNATURE',
+                        'fullname': "$_SERVER['SERVER_SIGNATURE']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': None,
@@ -231,6 +250,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'SERVER_SOFTWARE',
+                        'fullname': "$_SERVER['SERVER_SOFTWARE']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'QXBhY2hlLzIuNC4xMCAoRmVkb3JhKSBPcGVuU1NMLzEuMC4xay1maXBzIFBIUC81LjYuNg==',
@@ -238,6 +258,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'SERVER_NAME',
+                        'fullname': "$_SERVER['SERVER_NAME']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'bG9jYWxob3N0',
@@ -245,6 +266,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'SERVER_ADDR',
+                        'fullname': "$_SERVER['SERVER_ADDR']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'MTI3LjAuMC4x',
@@ -252,6 +274,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'SERVER_PORT',
+                        'fullname': "$_SERVER['SERVER_PORT']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'ODA=',
@@ -259,6 +282,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'REMOTE_ADDR',
+                        'fullname': "$_SERVER['REMOTE_ADDR']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'MTI3LjAuMC4x',
@@ -266,6 +290,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'DOCUMENT_ROOT',
+                        'fullname': "$_SERVER['DOCUMENT_ROOT']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'L2hvbWUvcm9iZXJ0L3d3dy9weGRlYnVn',
@@ -273,6 +298,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'REQUEST_SCHEME',
+                        'fullname': "$_SERVER['REQUEST_SCHEME']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'aHR0cA==',
@@ -280,6 +306,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'CONTEXT_PREFIX',
+                        'fullname': "$_SERVER['CONTEXT_PREFIX']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': None,
@@ -287,6 +314,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'CONTEXT_DOCUMENT_ROOT',
+                        'fullname': "$_SERVER['CONTEXT_DOCUMENT_ROOT']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'L2hvbWUvcm9iZXJ0L3d3dy9weGRlYnVn',
@@ -294,6 +322,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'SERVER_ADMIN',
+                        'fullname': "$_SERVER['SERVER_ADMIN']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'd2VibWFzdGVyQGxvY2FsaG9zdA==',
@@ -301,6 +330,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'SCRIPT_FILENAME',
+                        'fullname': "$_SERVER['SCRIPT_FILENAME']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'L2hvbWUvcm9iZXJ0L3d3dy9weGRlYnVnL2luZGV4LnBocA==',
@@ -308,6 +338,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'REMOTE_PORT',
+                        'fullname': "$_SERVER['REMOTE_PORT']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'NTg3MDI=',
@@ -315,6 +346,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'GATEWAY_INTERFACE',
+                        'fullname': "$_SERVER['GATEWAY_INTERFACE']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'Q0dJLzEuMQ==',
@@ -322,6 +354,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'SERVER_PROTOCOL',
+                        'fullname': "$_SERVER['SERVER_PROTOCOL']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'SFRUUC8xLjE=',
@@ -329,6 +362,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'REQUEST_METHOD',
+                        'fullname': "$_SERVER['REQUEST_METHOD']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'R0VU',
@@ -336,6 +370,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'QUERY_STRING',
+                        'fullname': "$_SERVER['QUERY_STRING']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'WERFQlVHX1NFU1NJT05fU1RBUlQ9MQ==',
@@ -343,6 +378,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'REQUEST_URI',
+                        'fullname': "$_SERVER['REQUEST_URI']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'Lz9YREVCVUdfU0VTU0lPTl9TVEFSVD0x',
@@ -350,6 +386,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'SCRIPT_NAME',
+                        'fullname': "$_SERVER['SCRIPT_NAME']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'L2luZGV4LnBocA==',
@@ -357,6 +394,7 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'PHP_SELF',
+                        'fullname': "$_SERVER['PHP_SELF']",
                         'type': 'string',
                         'encoding': 'base64',
                         'value': 'L2luZGV4LnBocA==',
@@ -364,11 +402,13 @@ class PugdebugMessageParserTest(unittest.TestCase):
                     },
                     {
                         'name': 'REQUEST_TIME_FLOAT',
+                        'fullname': "$_SERVER['REQUEST_TIME_FLOAT']",
                         'type': 'float',
                         'value': '1425023978.289'
                     },
                     {
                         'name': 'REQUEST_TIME',
+                        'fullname': "$_SERVER['REQUEST_TIME']",
                         'type': 'int',
                         'value': '1425023978'
                     }
@@ -387,6 +427,32 @@ class PugdebugMessageParserTest(unittest.TestCase):
         self.assertEqual(expected[6], result[6])
         self.assertEqual(expected[6]['variables'][28], result[6]['variables'][28])
 
+    def test_parse_property_value_message(self):
+        message = '<?xml version="1.0" encoding="iso-8859-1"?>\
+<response xmlns="urn:debugger_protocol_v1" xmlns:xdebug="http://xdebug.org/dbgp/xdebug" command="property_value" transaction_id="14" size="11" encoding="base64"><![CDATA[aGVsbG8gd29y]]></response>'
+
+        result = self.parser.parse_property_value_message(message)
+
+        expected = {
+            'size': '11',
+            'encoding': 'base64',
+            'value': 'aGVsbG8gd29y'
+        }
+
+        self.assertEqual(expected, result)
+
+    def test_parse_property_value_error_message(self):
+        message = '<?xml version="1.0" encoding="iso-8859-1"?>\
+<response xmlns="urn:debugger_protocol_v1" xmlns:xdebug="http://xdebug.org/dbgp/xdebug" command="property_value" transaction_id="14"><error code="300"><message><![CDATA[can not get property]]></message></error></response>'
+
+        result = self.parser.parse_property_value_message(message)
+
+        expected = {
+            'error': 'can not get property'
+        }
+
+        self.assertEqual(expected, result)
+
     def test_parse_successful_breakpoint_set_message(self):
         message = '<?xml version="1.0" encoding="iso-8859-1"?>\
 <response xmlns="urn:debugger_protocol_v1" xmlns:xdebug="http://xdebug.org/dbgp/xdebug" command="breakpoint_set" transaction_id="9" id="32310001"></response>'
@@ -403,6 +469,22 @@ class PugdebugMessageParserTest(unittest.TestCase):
 
         self.assertFalse(result)
 
+    def test_parse_successful_breakpoint_update_message(self):
+        message = '<?xml version="1.0" encoding="iso-8859-1"?>\
+<response xmlns="urn:debugger_protocol_v1" xmlns:xdebug="http://xdebug.org/dbgp/xdebug" command="breakpoint_update" transaction_id="10"></response>'
+
+        result = self.parser.parse_breakpoint_update_message(message)
+
+        self.assertTrue(result)
+
+    def test_parse_unsuccessful_breakpoint_update_message(self):
+        message = '<?xml version="1.0" encoding="iso-8859-1"?>\
+<response xmlns="urn:debugger_protocol_v1" xmlns:xdebug="http://xdebug.org/dbgp/xdebug" command="breakpoint_update" transaction_id="10" status="break" reason="ok"><error code="205"><message><![CDATA[no such breakpoint]]></message></error></response>'
+
+        result = self.parser.parse_breakpoint_update_message(message)
+
+        self.assertFalse(result)
+
     def test_parse_successful_breakpoint_remove_message(self):
         message = '<?xml version="1.0" encoding="iso-8859-1"?>\
 <response xmlns="urn:debugger_protocol_v1" xmlns:xdebug="http://xdebug.org/dbgp/xdebug" command="breakpoint_remove" transaction_id="11"><breakpoint type="line" filename="file:///home/robert/www/pugdebug/index.php" lineno="10" state="enabled" hit_count="0" hit_value="0" id="41240003"></breakpoint></response>'
@@ -446,6 +528,24 @@ class PugdebugMessageParserTest(unittest.TestCase):
 
         self.assertEqual(expected, result)
 
+    def test_parse_call_breakpoint_list_message(self):
+        message = '<?xml version="1.0" encoding="iso-8859-1"?>\
+<response xmlns="urn:debugger_protocol_v1" xmlns:xdebug="http://xdebug.org/dbgp/xdebug" command="breakpoint_list" transaction_id="12"><breakpoint type="call" function="save" class="App\\Model\\User" state="enabled" hit_count="0" hit_value="0" id="32350003"></breakpoint></response>'
+
+        result = self.parser.parse_breakpoint_list_message(message)
+
+        expected = [
+            {
+                'class': 'App\\Model\\User',
+                'function': 'save',
+                'id': '32350003',
+                'state': 'enabled',
+                'type': 'call'
+            }
+        ]
+
+        self.assertEqual(expected, result)
+
     def test_parse_stacktraces_message(self):
         message = '<?xml version="1.0" encoding="iso-8859-1"?>\
 <response xmlns="urn:debugger_protocol_v1" xmlns:xdebug="http://xdebug.org/dbgp/xdebug" command="stack_get" transaction_id="118"><stack where="{main}" level="0" type="file" filename="file:///home/robert/www/pugdebug/index.php" lineno="30"></stack></response>'
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pugdebug.path_mapper import (PugdebugPathMapper, PugdebugPathTrie,
+                                  parse_mappings)
+
+
+class PugdebugPathTrieTest(unittest.TestCase):
+
+    def test_maps_by_the_longest_prefix(self):
+        trie = PugdebugPathTrie()
+        trie.add('/var/www/', '/home/user/app')
+        trie.add('/var/www/vendor', '/home/user/vendor/')
+
+        self.assertEqual('/home/user/app/index.php',
+                         trie.map('/var/www/index.php'))
+        self.assertEqual('/home/user/vendor/lib/a.php',
+                         trie.map('/var/www/vendor/lib/a.php'))
+        self.assertEqual('/home/user/app', trie.map('/var/www'))
+
+    def test_maps_whole_directories_only(self):
+        trie = PugdebugPathTrie()
+        trie.add('/var/www', '/home/user/app')
+
+        self.assertIsNone(trie.map('/var/www2/index.php'))
+        self.assertIsNone(trie.map('/var/index.php'))
+
+    def test_maps_the_root(self):
+        trie = PugdebugPathTrie()
+        trie.add('/', '/home/user/app')
+        trie.add('/srv', '/')
+
+        self.assertEqual('/home/user/app/var/a.php', trie.map('/var/a.php'))
+        self.assertEqual('/a.php', trie.map('/srv/a.php'))
+        self.assertEqual('/', trie.map('/srv'))
+
+    def test_keeps_the_first_target_of_a_prefix(self):
+        trie = PugdebugPathTrie()
+        trie.add('/var/www', '/home/user/app')
+        trie.add('/var/www/', '/home/user/other')
+
+        self.assertEqual('/home/user/app/a.php', trie.map('/var/www/a.php'))
+
+    def test_maps_windows_paths(self):
+        trie = PugdebugPathTrie()
+        trie.add('C:\\Users\\user\\app\\', '/var/www')
+        trie.add('/srv', 'C:\\Users\\user\\lib')
+
+        self.assertEqual('/var/www/lib/a.php',
+                         trie.map('C:\\Users\\user\\app\\lib\\a.php'))
+        self.assertEqual('/var/www/b.php',
+                         trie.map('C:/Users/user/app/b.php'))
+        self.assertEqual('C:/Users/user/lib/a.php', trie.map('/srv/a.php'))
+
+
+class PugdebugPathMapperTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, 'app'))
+        os.makedirs(os.path.join(self.root, 'lib'))
+
+        self.index_file = self.create_file('app/index.php')
+        self.lib_file = self.create_file('lib/a.php')
+
+        self.mapper = PugdebugPathMapper([
+            ('/var/www', os.path.join(self.root, 'app')),
+            ('/usr/share/lib', os.path.join(self.root, 'lib')),
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def create_file(self, path):
+        full_path = os.path.join(self.root, path)
+        open(full_path, 'w').close()
+        return full_path
+
+    def test_maps_remote_paths_to_local_files(self):
+        self.assertEqual(self.index_file,
+                         self.mapper.to_local('/var/www/index.php'))
+        self.assertEqual(self.lib_file,
+                         self.mapper.to_local('/usr/share/lib/a.php'))
+        self.assertEqual('/tmp/a.php', self.mapper.to_local('/tmp/a.php'))
+        self.assertFalse(self.mapper.to_local('/var/www/none.php'))
+
+    def test_maps_local_paths_to_remote_paths(self):
+        self.assertEqual('/var/www/index.php',
+                         self.mapper.to_remote(self.index_file))
+        self.assertEqual('/usr/share/lib/a.php',
+                         self.mapper.to_remote(self.lib_file))
+        self.assertEqual('/tmp/a.php', self.mapper.to_remote('/tmp/a.php'))
+
+    def test_maps_local_paths_with_backslashes(self):
+        mapper = PugdebugPathMapper([('/var/www', 'C:\\Users\\user\\app')])
+
+        self.assertEqual('/var/www/lib/a.php',
+                         mapper.to_remote('C:\\Users\\user\\app\\lib\\a.php'))
+
+    def test_remembers_local_files_until_forgotten(self):
+        self.assertEqual(self.index_file,
+                         self.mapper.to_local('/var/www/index.php'))
+
+        os.remove(self.index_file)
+        self.assertEqual(self.index_file,
+                         self.mapper.to_local('/var/www/index.php'))
+
+        self.mapper.forget(self.index_file)
+        self.assertFalse(self.mapper.to_local('/var/www/index.php'))
+
+    def test_checks_missing_files_again(self):
+        self.assertFalse(self.mapper.to_local('/var/www/new.php'))
+
+        new_file = self.create_file('app/new.php')
+        self.assertEqual(new_file, self.mapper.to_local('/var/www/new.php'))
+
+
+class ParseMappingsTest(unittest.TestCase):
+
+    def test_parses_one_mapping_per_line(self):
+        text = ('/var/www => /home/user/app\n'
+                '\n'
+                '# Libraries\n'
+                '  /usr/share/lib=>lib  \n')
+
+        self.assertEqual([('/var/www', '/home/user/app'),
+                          ('/usr/share/lib', 'lib')],
+                         parse_mappings(text))
+
+    def test_fails_on_lines_that_are_not_mappings(self):
+        self.assertRaises(ValueError, parse_mappings, '/var/www')
+        self.assertRaises(ValueError, parse_mappings, '/var/www =>')
+        self.assertRaises(ValueError, parse_mappings, '=> /home/user/app')
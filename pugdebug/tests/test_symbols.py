@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import tempfile
+import unittest
+
+from pugdebug.symbols import PugdebugSymbolIndex, find_symbols
+
+
+class PugdebugSymbolsTest(unittest.TestCase):
+
+    def test_finds_symbols(self):
+        text = ('<?php\n'
+                'namespace App\\Model;\n'
+                'use function Other\\helper;\n'
+                '/* class Commented {} */\n'
+                'abstract class User extends Base implements Saveable {\n'
+                '    public static function find($id) {\n'
+                '        $f = function () { return "}"; };\n'
+                '    }\n'
+                '    private function &save() {}\n'
+                '}\n'
+                'interface Saveable { function save(); }\n'
+                'trait Logs { public function log() {} }\n'
+                'enum Suit: string { public function color() {} }\n'
+                'function helper() {\n'
+                '    return new class { function anonymous() {} };\n'
+                '}\n')
+
+        self.assertEqual([
+            ('App\\Model\\User', 'class', 5),
+            ('App\\Model\\User::find', 'method', 6),
+            ('App\\Model\\User::save', 'method', 9),
+            ('App\\Model\\Saveable', 'interface', 11),
+            ('App\\Model\\Saveable::save', 'method', 11),
+            ('App\\Model\\Logs', 'trait', 12),
+            ('App\\Model\\Logs::log', 'method', 12),
+            ('App\\Model\\Suit', 'enum', 13),
+            ('App\\Model\\Suit::color', 'method', 13),
+            ('App\\Model\\helper', 'function', 14)
+        ], find_symbols(text))
+
+    def test_skips_code_outside_of_php_tags(self):
+        text = '<p>function html() {}</p>\n<?php function php() {} ?>\n'
+
+        self.assertEqual([('php', 'function', 2)], find_symbols(text))
+
+
+class PugdebugSymbolIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, 'project')
+        os.mkdir(self.root)
+
+        self.path = os.path.join(self.directory.name, 'cache', 'index')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_file(self, path, contents, modified=None):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(contents)
+
+        if modified is not None:
+            os.utime(full_path, ns=(modified, modified))
+
+    def test_updates_changed_and_removed_files(self):
+        self.write_file('a.php', '<?php\nfunction first() {}\n', 1)
+        self.write_file('b.php', '<?php\nclass Second {}\n', 1)
+
+        index = PugdebugSymbolIndex(self.root)
+        self.assertTrue(index.update(['a.php', 'b.php']))
+        self.assertFalse(index.update(['a.php', 'b.php']))
+
+        self.assertEqual({'first': [('a.php', 2, 'function')],
+                          'Second': [('b.php', 2, 'class')]},
+                         index.get_locations())
+
+        self.write_file('a.php', '<?php\n\nfunction third() {}\n', 2)
+        self.assertTrue(index.update(['a.php']))
+
+        self.assertEqual({'third': [('a.php', 3, 'function')]},
+                         index.get_locations())
+
+    def test_updates_only_the_paths(self):
+        self.write_file('a.php', '<?php\nfunction first() {}\n', 1)
+        self.write_file('b.php', '<?php\nclass Second {}\n', 1)
+
+        index = PugdebugSymbolIndex(self.root)
+        index.update(['a.php', 'b.php'])
+
+        self.write_file('a.php', '<?php\nfunction third() {}\n', 2)
+        self.write_file('b.php', '<?php\nclass Fourth {}\n', 2)
+        self.assertTrue(index.update_paths(['a.php']))
+
+        self.assertEqual({'third': [('a.php', 2, 'function')],
+                          'Second': [('b.php', 2, 'class')]},
+                         index.get_locations())
+
+        os.remove(os.path.join(self.root, 'a.php'))
+        self.assertTrue(index.update_paths(['a.php']))
+        self.assertEqual({'Second': [('b.php', 2, 'class')]},
+                         index.get_locations())
+
+    def test_lists_every_location_of_a_name(self):
+        self.write_file('a.php', '<?php\nfunction main() {}\n')
+        self.write_file('b.php', '<?php\n\nfunction main() {}\n')
+
+        index = PugdebugSymbolIndex(self.root)
+        index.update(['b.php', 'a.php'])
+
+        self.assertEqual({'main': [('a.php', 2, 'function'),
+                                   ('b.php', 3, 'function')]},
+                         index.get_locations())
+
+    def test_saves_and_loads(self):
+        self.write_file('a.php', '<?php\nclass User {}\n')
+
+        index = PugdebugSymbolIndex(self.root)
+        index.update(['a.php'])
+        index.save(self.path)
+
+        loaded = PugdebugSymbolIndex(self.root)
+        self.assertTrue(loaded.load(self.path))
+        self.assertEqual({'User': [('a.php', 2, 'class')]},
+                         loaded.get_locations())
+        self.assertFalse(loaded.update(['a.php']))
+
+        other = PugdebugSymbolIndex(os.path.join(self.root, 'other'))
+        self.assertFalse(other.load(self.path))
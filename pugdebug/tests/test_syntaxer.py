@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import unittest
+
+try:
+    from PyQt5 import sip
+    from PyQt5.QtCore import QThreadPool
+    from PyQt5.QtGui import QGuiApplication, QTextDocument
+except ImportError:
+    sip = None
+
+if sip is not None:
+    from pugdebug.highlight_cache import PugdebugHighlightCache
+    from pugdebug.syntaxer import Syntaxer
+
+
+@unittest.skipIf(sip is None, 'PyQt5 is not installed')
+class SyntaxerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        cls.app = QGuiApplication.instance() or QGuiApplication([])
+
+        # Highlighting is kept only in memory
+        Syntaxer.cache = PugdebugHighlightCache(None)
+
+    def test_closing_document_while_tokenizing(self):
+        document = QTextDocument('<?php\n' + '$closed = 1;\n' * 20000)
+        syntaxer = Syntaxer(document)
+
+        self.assertTrue(syntaxer.pending)
+
+        # Deletes the syntaxer with its document
+        sip.delete(document)
+        self.assertTrue(sip.isdeleted(syntaxer))
+
+        self.assertTrue(QThreadPool.globalInstance().waitForDone(30000))
+        self.app.processEvents()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import tempfile
+import unittest
+
+from pugdebug.mapped_file import PugdebugMappedFile
+from pugdebug.text_search import PugdebugMatchIndex
+
+
+class PugdebugMatchIndexTest(unittest.TestCase):
+
+    text = ('<?php\n'
+            '$user = new User();\n'
+            '\n'
+            'echo $user->name, $USER;\n'
+            'user')
+
+    def test_finds_matches_ignoring_case(self):
+        index = PugdebugMatchIndex(self.text, 'user')
+
+        self.assertEqual(5, len(index))
+        self.assertEqual([(1, 1), (1, 12), (3, 6), (3, 19), (4, 0)],
+                         [index.get_match(i) for i in range(len(index))])
+
+    def test_escapes_the_query(self):
+        index = PugdebugMatchIndex(self.text, '->name')
+
+        self.assertEqual([(3, 10)], [index.get_match(0)])
+        self.assertEqual(0, len(PugdebugMatchIndex(self.text, '.*')))
+        self.assertEqual(0, len(PugdebugMatchIndex(self.text, '')))
+
+    def test_finds_next_match_from_a_position(self):
+        index = PugdebugMatchIndex(self.text, 'user')
+
+        self.assertEqual(1, index.find(1, 2))
+        self.assertEqual(2, index.find(2))
+        self.assertEqual(0, index.find(5))
+
+        self.assertIsNone(PugdebugMatchIndex(self.text, 'none').find(0))
+
+    def test_moves_to_next_and_previous_match(self):
+        index = PugdebugMatchIndex(self.text, 'user')
+
+        self.assertEqual(0, index.next())
+        self.assertEqual(1, index.next())
+        self.assertEqual(0, index.previous())
+        self.assertEqual(4, index.previous())
+        self.assertEqual(0, index.next())
+
+        empty = PugdebugMatchIndex(self.text, 'none')
+        self.assertIsNone(empty.next())
+        self.assertIsNone(empty.previous())
+
+    def test_gets_matches_on_lines(self):
+        index = PugdebugMatchIndex(self.text, 'user')
+
+        self.assertEqual(range(2, 4), index.get_range(2, 3))
+        self.assertEqual(range(0, 5), index.get_range(0, 10))
+        self.assertEqual(0, len(index.get_range(2, 2)))
+
+    def test_finds_matches_in_mapped_files(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        path = os.path.join(directory.name, 'file.php')
+        with open(path, 'wb') as f:
+            f.write(self.text.replace('\n', '\r\n').encode('utf-8') +
+                    '\n// čuser user'.encode('utf-8'))
+
+        mapped_file = PugdebugMappedFile(path)
+        self.addCleanup(mapped_file.close)
+
+        index = PugdebugMatchIndex(mapped_file, 'user')
+
+        self.assertEqual([(1, 1), (1, 12), (3, 6), (3, 19), (4, 0),
+                          (5, 4), (5, 9)],
+                         [index.get_match(i) for i in range(len(index))])
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import unittest
+
+import pygments.lexers.php
+
+from pugdebug.tokenizer import (PugdebugTokenizer, token_types,
+                                get_line_starts, split_lines)
+
+
+class PugdebugTokenizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tokenizer = PugdebugTokenizer()
+
+        path = os.path.join(os.path.dirname(__file__), '_files', 'sample.php')
+        with open(path) as f:
+            self.text = f.read()
+
+    def token_types(self, tokens, length):
+        """Get the token type of every character of the text
+        """
+        types = [None] * length
+        for position, token, value in tokens:
+            for i in range(position, min(position + len(value), length)):
+                types[i] = token
+        return types
+
+    def test_tokenizes_same_as_php_lexer(self):
+        lexer = pygments.lexers.php.PhpLexer()
+
+        expected = list(lexer.get_tokens_unprocessed(self.text))
+        result = list(self.tokenizer.tokenize(self.text))
+
+        self.assertEqual(expected, result)
+
+    def test_records_checkpoints_at_line_starts(self):
+        checkpoints = {}
+        list(self.tokenizer.tokenize(self.text, checkpoints=checkpoints))
+
+        self.assertTrue(len(checkpoints) > 0)
+
+        for position in checkpoints:
+            self.assertEqual('\n', self.text[position - 1])
+
+        # The doc comment lines have no known state
+        comment = self.text.index(' * spanning lines')
+        self.assertNotIn(comment, checkpoints)
+
+        php = self.text.index('namespace')
+        self.assertEqual(('root', 'php'), checkpoints[php])
+
+    def test_resumes_from_checkpoints(self):
+        checkpoints = {}
+        tokens = self.tokenizer.tokenize(self.text, checkpoints=checkpoints)
+        expected = self.token_types(tokens, len(self.text))
+
+        for position, stack in checkpoints.items():
+            tokens = self.tokenizer.tokenize(self.text[position:], stack)
+            result = self.token_types(tokens, len(self.text) - position)
+
+            self.assertEqual(expected[position:], result)
+
+    def test_splits_tokens_by_line(self):
+        text = "<?php\n/* a\nb */ $c;\n"
+        expected = self.token_types(self.tokenizer.tokenize(text), len(text))
+
+        line_starts = get_line_starts(text)
+        lines = split_lines(self.tokenizer.tokenize(text), line_starts)
+
+        self.assertEqual([0, 6, 11, 20], line_starts)
+        self.assertEqual(4, len(lines))
+        self.assertEqual(0, len(lines[3]))
+
+        for line, line_start in zip(lines[:3], line_starts):
+            position = line_start
+
+            for count, token_id in zip(line[0::2], line[1::2]):
+                self.assertEqual(expected[position], token_types[token_id])
+                position += count
+
+            # Every line ends with its newline
+            self.assertEqual('\n', text[position - 1])
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import tempfile
+import unittest
+
+from pugdebug.trigrams import (PugdebugTrigramIndex, get_trigrams,
+                               find_lines, encode_ids, decode_ids)
+
+
+class PugdebugTrigramIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, 'project')
+        os.mkdir(self.root)
+
+        self.path = os.path.join(self.directory.name, 'cache', 'index')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_file(self, path, contents, modified=None):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(contents)
+
+        if modified is not None:
+            os.utime(full_path, ns=(modified, modified))
+
+    def test_gets_trigrams(self):
+        self.assertEqual({b'abc', b'bcd'}, get_trigrams(b'abcd'))
+        self.assertEqual(set(), get_trigrams(b'ab'))
+
+    def test_finds_candidates(self):
+        self.write_file('a.php', '<?php\nclass UserController {}\n')
+        self.write_file('b.php', '<?php\nfunction user_name() {}\n')
+        self.write_file('c.php', '<?php\necho 1;\n')
+
+        index = PugdebugTrigramIndex(self.root)
+        self.assertTrue(index.update(['a.php', 'b.php', 'c.php']))
+
+        self.assertEqual(['a.php', 'b.php'], index.get_candidates('USER'))
+        self.assertEqual(['a.php'], index.get_candidates('controller'))
+        self.assertEqual([], index.get_candidates('missing'))
+        self.assertEqual(['a.php', 'b.php', 'c.php'],
+                         index.get_candidates('ec'))
+
+    def test_updates_changed_and_removed_files(self):
+        self.write_file('a.php', 'first', 1)
+        self.write_file('b.php', 'second', 1)
+
+        index = PugdebugTrigramIndex(self.root)
+        index.update(['a.php', 'b.php'])
+
+        self.assertFalse(index.update(['a.php', 'b.php']))
+
+        self.write_file('a.php', 'third', 2)
+        self.assertTrue(index.update(['a.php']))
+
+        self.assertEqual(['a.php'], index.get_candidates('third'))
+        self.assertEqual([], index.get_candidates('first'))
+        self.assertEqual([], index.get_candidates('second'))
+
+        # Removed files got dropped from the trigram lists
+        self.assertEqual(0, index.removed)
+        self.assertEqual([], [data for data in index.postings.values()
+                              if 1 in decode_ids(data)])
+
+    def test_updates_only_the_paths(self):
+        self.write_file('a.php', 'first', 1)
+        self.write_file('b.php', 'second', 1)
+
+        index = PugdebugTrigramIndex(self.root)
+        index.update(['a.php', 'b.php'])
+
+        self.write_file('a.php', 'third', 2)
+        self.write_file('b.php', 'fourth', 2)
+        self.assertTrue(index.update_paths(['a.php']))
+
+        self.assertEqual(['a.php'], index.get_candidates('third'))
+        self.assertEqual(['b.php'], index.get_candidates('second'))
+        self.assertFalse(index.update_paths(['a.php']))
+
+        os.remove(os.path.join(self.root, 'a.php'))
+        self.assertTrue(index.update_paths(['a.php']))
+        self.assertEqual([], index.get_candidates('third'))
+        self.assertFalse(index.update_paths(['a.php']))
+
+    def test_saves_and_loads(self):
+        self.write_file('a.php', 'contents')
+
+        index = PugdebugTrigramIndex(self.root)
+        index.update(['a.php'])
+        index.save(self.path)
+
+        loaded = PugdebugTrigramIndex(self.root)
+        self.assertTrue(loaded.load(self.path))
+        self.assertEqual(['a.php'], loaded.get_candidates('tent'))
+        self.assertFalse(loaded.update(['a.php']))
+
+        other = PugdebugTrigramIndex(os.path.join(self.root, 'other'))
+        self.assertFalse(other.load(self.path))
+
+    def test_encodes_ids(self):
+        ids = [0, 1, 2, 130, 20000, 20001, 3000000]
+
+        self.assertEqual(ids, decode_ids(encode_ids(ids)))
+        self.assertEqual(b'\x00\x01\x01\x80\x01', encode_ids([0, 1, 2, 130]))
+        self.assertEqual([], decode_ids(b''))
+
+    def test_saves_only_appended_ids(self):
+        self.write_file('a.php', 'first', 1)
+        self.write_file('b.php', 'second', 1)
+
+        index = PugdebugTrigramIndex(self.root)
+        index.update(['a.php', 'b.php'])
+        index.save(self.path)
+        self.assertEqual(1, len(index.segments))
+
+        self.write_file('c.php', 'third', 1)
+        index.update(['a.php', 'b.php', 'c.php'])
+        index.save(self.path)
+        self.assertEqual(2, len(index.segments))
+
+        # Nothing appended, no segment
+        index.save(self.path)
+        self.assertEqual(2, len(index.segments))
+
+        loaded = PugdebugTrigramIndex(self.root)
+        self.assertTrue(loaded.load(self.path))
+        self.assertEqual(index.postings, loaded.postings)
+        self.assertEqual(['c.php'], loaded.get_candidates('third'))
+
+        self.write_file('d.php', 'third', 1)
+        loaded.update(['a.php', 'b.php', 'c.php', 'd.php'])
+        loaded.save(self.path)
+        self.assertEqual(3, len(loaded.segments))
+
+        reloaded = PugdebugTrigramIndex(self.root)
+        self.assertTrue(reloaded.load(self.path))
+        self.assertEqual(['c.php', 'd.php'], reloaded.get_candidates('third'))
+
+    def test_writes_segments_as_one_when_compacted(self):
+        self.write_file('a.php', 'first', 1)
+        self.write_file('b.php', 'second', 1)
+
+        index = PugdebugTrigramIndex(self.root)
+        index.update(['a.php', 'b.php'])
+        index.save(self.path)
+
+        self.write_file('c.php', 'third', 1)
+        index.update(['a.php', 'b.php', 'c.php'])
+        index.save(self.path)
+
+        # More files removed than left compacts the lists
+        index.update(['c.php'])
+        index.save(self.path)
+
+        self.assertEqual(1, len(index.segments))
+        self.assertEqual(['index'] + index.segments,
+                         sorted(os.listdir(self.path)))
+
+        loaded = PugdebugTrigramIndex(self.root)
+        self.assertTrue(loaded.load(self.path))
+        self.assertEqual(['c.php'], loaded.get_candidates('third'))
+        self.assertEqual([], loaded.get_candidates('first'))
+
+    def test_does_not_load_missing_segments(self):
+        self.write_file('a.php', 'contents')
+
+        index = PugdebugTrigramIndex(self.root)
+        index.update(['a.php'])
+        index.save(self.path)
+
+        os.remove(os.path.join(self.path, index.segments[0]))
+
+        self.assertFalse(PugdebugTrigramIndex(self.root).load(self.path))
+
+    def test_finds_lines(self):
+        self.write_file('a.php', '<?php\n\n  $user = new User();\n'
+                                 'echo $user;\nUSER')
+
+        full_path = os.path.join(self.root, 'a.php')
+
+        self.assertEqual([(3, '$user = new User();'), (4, 'echo $user;'),
+                          (5, 'USER')], find_lines(full_path, 'user'))
+        self.assertEqual([(3, '$user = new User();')],
+                         find_lines(full_path, 'user', max_lines=1))
+        self.assertEqual([], find_lines(full_path + '.missing', 'user'))
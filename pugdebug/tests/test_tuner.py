@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import unittest
+
+from pugdebug.tuner import PugdebugFeatureTuner
+
+
+class PugdebugFeatureTunerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tuner = PugdebugFeatureTuner(3, 128, 512, 0.3)
+
+    def test_starts_with_configured_features(self):
+        expected = {
+            'max_depth': 3,
+            'max_children': 128,
+            'max_data': 512
+        }
+
+        self.assertEqual(expected, self.tuner.features())
+
+    def test_lowers_children_over_budget(self):
+        changed = self.tuner.measure(0.6, 100000)
+
+        self.assertTrue(changed)
+        self.assertEqual(64, self.tuner.children)
+        self.assertEqual(512, self.tuner.data)
+        self.assertEqual(3, self.tuner.depth)
+
+    def test_lowers_data_of_large_replies_over_budget(self):
+        changed = self.tuner.measure(0.6, 1024 * 1024)
+
+        self.assertTrue(changed)
+        self.assertEqual(128, self.tuner.children)
+        self.assertEqual(256, self.tuner.data)
+
+    def test_lowers_data_when_children_are_at_minimum(self):
+        tuner = PugdebugFeatureTuner(3, 8, 512, 0.3)
+
+        self.assertTrue(tuner.measure(0.6, 100000))
+        self.assertEqual(8, tuner.children)
+        self.assertEqual(256, tuner.data)
+
+    def test_lowers_depth_far_over_budget(self):
+        self.tuner.measure(1.2, 100000)
+
+        self.assertEqual(2, self.tuner.depth)
+
+    def test_render_time_counts_against_budget(self):
+        self.tuner.add_render_time(0.5)
+
+        self.assertTrue(self.tuner.measure(0.1, 1000))
+        self.assertEqual(0, self.tuner.render_time)
+
+    def test_does_not_go_under_minimums(self):
+        for i in range(20):
+            self.tuner.measure(10, 100000)
+
+        expected = {
+            'max_depth': 1,
+            'max_children': 8,
+            'max_data': 64
+        }
+
+        self.assertEqual(expected, self.tuner.features())
+
+    def test_does_not_go_over_maximums_under_minimums(self):
+        tuner = PugdebugFeatureTuner(1, 4, 32, 0.3)
+
+        tuner.measure(0.6, 1)
+        tuner.measure(0.6, 1024 * 1024)
+        tuner.measure(0.01, 1)
+
+        expected = {
+            'max_depth': 1,
+            'max_children': 4,
+            'max_data': 32
+        }
+
+        self.assertEqual(expected, tuner.features())
+
+    def test_raises_features_back_to_configured(self):
+        self.tuner.measure(1.2, 100000)
+
+        for i in range(20):
+            self.tuner.measure(0.01, 1000)
+
+        expected = {
+            'max_depth': 3,
+            'max_children': 128,
+            'max_data': 512
+        }
+
+        self.assertEqual(expected, self.tuner.features())
+
+    def test_keeps_features_within_budget(self):
+        self.assertFalse(self.tuner.measure(0.2, 1000))
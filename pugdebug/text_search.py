@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import bisect
+import re
+
+from array import array
+
+from pugdebug.mapped_file import PugdebugMappedFile
+
+
+class PugdebugMatchIndex():
+    """The matches of a query in a text, ignoring case
+
+    The text is searched once, the line numbers and the columns of
+    the matches, zero based, are kept in arrays in the order of the
+    matches. Moving to the next or the previous match only moves the
+    index of the current match, and the matches on a range of lines
+    are found by bisecting the line numbers.
+
+    The text can be a mapped file. Its bytes are searched without
+    decoding them, ignoring the case of ASCII letters only.
+    """
+
+    def __init__(self, text, query):
+        self.query = query
+
+        # Matching ignoring case does not change the length of a match
+        self.length = len(query)
+
+        self.lines = array('I')
+        self.columns = array('I')
+
+        # Index of the current match, None until a match is selected
+        self.current = None
+
+        if query == '':
+            return
+
+        if isinstance(text, PugdebugMappedFile):
+            query_bytes = query.encode(text.encoding)
+            pattern = re.compile(re.escape(query_bytes), re.IGNORECASE)
+
+            for line, column in text.find_all(pattern, len(query_bytes)):
+                self.lines.append(line)
+                self.columns.append(column)
+            return
+
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+
+        line = 0
+        line_start = 0
+        counted = 0
+
+        for match in pattern.finditer(text):
+            position = match.start()
+
+            newlines = text.count('\n', counted, position)
+            if newlines > 0:
+                line += newlines
+                line_start = text.rfind('\n', counted, position) + 1
+            counted = position
+
+            self.lines.append(line)
+            self.columns.append(position - line_start)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def get_match(self, index):
+        """Get the line number and the column of a match
+        """
+        return self.lines[index], self.columns[index]
+
+    def find(self, line, column=0):
+        """Select the first match at or after a position
+
+        Wraps around to the first match. Returns the index of the
+        selected match, or None if there are no matches.
+        """
+        if len(self.lines) == 0:
+            return None
+
+        index = bisect.bisect_left(self.lines, line)
+        while (index < len(self.lines) and self.lines[index] == line and
+                self.columns[index] < column):
+            index += 1
+
+        self.current = index % len(self.lines)
+
+        return self.current
+
+    def next(self):
+        """Select the match after the current one, wrapping around
+        """
+        if len(self.lines) == 0:
+            return None
+
+        if self.current is None:
+            self.current = 0
+        else:
+            self.current = (self.current + 1) % len(self.lines)
+
+        return self.current
+
+    def previous(self):
+        """Select the match before the current one, wrapping around
+        """
+        if len(self.lines) == 0:
+            return None
+
+        if self.current is None:
+            self.current = len(self.lines) - 1
+        else:
+            self.current = (self.current - 1) % len(self.lines)
+
+        return self.current
+
+    def get_range(self, first, last):
+        """Get the indexes of the matches on the lines from first to last
+        """
+        return range(bisect.bisect_left(self.lines, first),
+                     bisect.bisect_right(self.lines, last))
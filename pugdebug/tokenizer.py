@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import bisect
+import threading
+
+from array import array
+
+import pygments.lexers.php
+
+from pygments.token import _TokenType, Name, Other, Whitespace, Error
+
+
+# Token types seen so far, line formats refer to them by their index
+token_types = []
+token_ids = {}
+token_ids_lock = threading.Lock()
+
+
+def get_token_id(token):
+    with token_ids_lock:
+        token_id = token_ids.get(token)
+
+        if token_id is None:
+            token_id = len(token_types)
+            token_types.append(token)
+            token_ids[token] = token_id
+
+    return token_id
+
+
+def get_line_starts(text):
+    """Get the positions of the starts of all lines in the text
+    """
+    line_starts = [0]
+
+    line_end = text.find('\n')
+    while line_end != -1:
+        line_starts.append(line_end + 1)
+        line_end = text.find('\n', line_end + 1)
+
+    return line_starts
+
+
+def split_lines(tokens, line_starts):
+    """Split tokens of a text line by line
+
+    Tokens have to be in the order of their positions. Returns an array
+    for every line, with the length and the token id of every piece of
+    the line, one after another. The newline at the end of a line is
+    counted to the last piece of the line.
+    """
+    lines = [array('I') for line_start in line_starts]
+    line_count = len(line_starts)
+
+    line = 0
+    next_line_start = line_starts[1] if line_count > 1 else None
+
+    for position, token, value in tokens:
+        if not value:
+            continue
+
+        end = position + len(value)
+        token_id = token_ids.get(token)
+        if token_id is None:
+            token_id = get_token_id(token)
+
+        while next_line_start is not None and next_line_start <= position:
+            line += 1
+            next_line_start = (line_starts[line + 1]
+                               if line + 1 < line_count else None)
+
+        while next_line_start is not None and next_line_start < end:
+            lines[line].extend((next_line_start - position, token_id))
+            position = next_line_start
+            line += 1
+            next_line_start = (line_starts[line + 1]
+                               if line + 1 < line_count else None)
+
+        lines[line].extend((end - position, token_id))
+
+    return lines
+
+
+class PugdebugTokenizer():
+    """Tokenize PHP code starting from any lexer state
+
+    This is the tokenizing loop of pygments' RegexLexer, running the rules
+    of the PhpLexer. Unlike the RegexLexer, it can start in any state and
+    notes the state of the lexer at the start of lines, so tokenizing can
+    later resume from the middle of a file.
+    """
+
+    def __init__(self):
+        self.lexer = pygments.lexers.php.PhpLexer()
+
+    def tokenize(self, text, stack=('root',), checkpoints=None):
+        """Tokenize text starting in the given state stack
+
+        Yields (position, token, value) tuples, like the
+        get_tokens_unprocessed method of the pygments lexers.
+
+        If a checkpoints dict is given, for every line the lexer state
+        is known for, the line's start position in the text is mapped
+        to the state stack at that position.
+        """
+        lexer = self.lexer
+        functions = lexer._functions
+        tokendefs = lexer._tokens
+
+        pos = 0
+        statestack = list(stack)
+        statetokens = tokendefs[statestack[-1]]
+
+        while True:
+            for rexmatch, action, new_state in statetokens:
+                m = rexmatch(text, pos)
+                if m:
+                    end = m.end()
+
+                    if action is not None:
+                        if type(action) is _TokenType:
+                            value = m.group()
+                            if action is Name.Other and value in functions:
+                                yield pos, Name.Builtin, value
+                            else:
+                                yield pos, action, value
+                        else:
+                            yield from action(lexer, m)
+
+                    if new_state is not None:
+                        self.__transition(statestack, new_state)
+                        statetokens = tokendefs[statestack[-1]]
+
+                    if (checkpoints is not None and
+                            text.find('\n', pos, end) != -1):
+                        self.__checkpoint(text, pos, end, action, new_state,
+                                          statestack, checkpoints)
+
+                    pos = end
+                    break
+            else:
+                # No rule matched, same as the RegexLexer does
+                if pos >= len(text):
+                    break
+
+                if text[pos] == '\n':
+                    # at EOL, reset state to "root"
+                    statestack[:] = ['root']
+                    statetokens = tokendefs['root']
+                    yield pos, Whitespace, '\n'
+                    pos += 1
+
+                    if checkpoints is not None:
+                        checkpoints[pos] = ('root',)
+                    continue
+
+                yield pos, Error, text[pos]
+                pos += 1
+
+    def tokenize_lines(self, text, stack=('root',), checkpoints=None):
+        """Tokenize text and split the tokens line by line
+
+        Returns the formats of every line, as split_lines does. If a
+        checkpoints dict is given, line numbers are mapped in it to the
+        state stacks the lines start in.
+        """
+        positions = {} if checkpoints is not None else None
+
+        line_starts = get_line_starts(text)
+        lines = split_lines(self.tokenize(text, stack, positions),
+                            line_starts)
+
+        if checkpoints is not None:
+            for position, state in positions.items():
+                line = bisect.bisect_left(line_starts, position)
+                checkpoints[line] = state
+
+        return lines
+
+    def __transition(self, statestack, new_state):
+        if isinstance(new_state, tuple):
+            for state in new_state:
+                if state == '#pop':
+                    if len(statestack) > 1:
+                        statestack.pop()
+                elif state == '#push':
+                    statestack.append(statestack[-1])
+                else:
+                    statestack.append(state)
+        elif isinstance(new_state, int):
+            # pop, but keep at least one state on the stack
+            if abs(new_state) >= len(statestack):
+                del statestack[1:]
+            else:
+                del statestack[new_state:]
+        elif new_state == '#push':
+            statestack.append(statestack[-1])
+
+    def __checkpoint(self, text, start, end, action, new_state, statestack,
+                     checkpoints):
+        """Note the lexer state at the starts of lines in a match
+
+        If the match ends a line, the state after it is the state
+        the next line starts in.
+
+        Whitespace and plain text in the middle of a match do not change
+        the state, so the lines they span start in the same state too.
+        Other multiline matches, like comments, can not be split, the
+        lines in them have no known state.
+        """
+        if text[end - 1] == '\n':
+            checkpoints[end] = tuple(statestack)
+
+        if (type(action) is _TokenType and new_state is None and
+                (action is Other or text[start:end].isspace())):
+            line_end = text.find('\n', start, end - 1)
+            while line_end != -1:
+                checkpoints[line_end + 1] = tuple(statestack)
+                line_end = text.find('\n', line_end + 1, end - 1)
@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+
+
+def get_trigrams(data):
+    """Get the set of three byte sequences of lowercased bytes
+    """
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+def read_trigrams(full_path):
+    """Read the trigrams of a file
+
+    Returns the modification time and size of the file, and its
+    trigrams joined together, or None if the file can not be read.
+    Runs in the processes of a process pool.
+    """
+    try:
+        with open(full_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            data = f.read().lower()
+    except OSError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size), b''.join(get_trigrams(data))
+
+
+def find_lines(full_path, query, max_lines=None):
+    """Find the lines of a file that contain the query, ignoring case
+
+    Returns the line numbers, starting from 1, and the texts of lines.
+    """
+    try:
+        with open(full_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+
+    lower_data = data.lower()
+    query = query.encode('utf-8').lower()
+
+    lines = []
+
+    line_number = 1
+    counted = 0
+
+    position = lower_data.find(query)
+    while position != -1:
+        line_start = lower_data.rfind(b'\n', 0, position) + 1
+        line_end = lower_data.find(b'\n', position)
+        if line_end == -1:
+            line_end = len(data)
+
+        line_number += lower_data.count(b'\n', counted, line_start)
+        counted = line_start
+
+        text = data[line_start:line_end].decode('utf-8', 'replace')
+        lines.append((line_number, text.strip()))
+
+        if max_lines is not None and len(lines) >= max_lines:
+            break
+
+        position = lower_data.find(query, line_end)
+
+    return lines
+
+
+def append_varint(data, value):
+    """Append a non-negative number to a bytearray, seven bits a byte
+
+    The high bit of a byte is set if more bytes of the number follow.
+    """
+    while value >= 0x80:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+
+    data.append(value)
+
+
+def encode_ids(ids):
+    """Encode ascending file ids as varints of the differences between them
+    """
+    data = bytearray()
+    last_id = 0
+
+    for file_id in ids:
+        append_varint(data, file_id - last_id)
+        last_id = file_id
+
+    return data
+
+
+def decode_ids(data):
+    """Decode file ids encoded by encode_ids
+    """
+    ids = []
+    file_id = 0
+    value = 0
+    shift = 0
+
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+
+        if byte & 0x80:
+            shift += 7
+        else:
+            file_id += value
+            ids.append(file_id)
+            value = 0
+            shift = 0
+
+    return ids
+
+
+class PugdebugTrigramIndex():
+    """An index of the trigrams in the contents of files
+
+    For every trigram, the ids of the files that contain it are kept.
+    The files that contain all the trigrams of a query are the ones
+    that can contain the query, only they need to be searched.
+
+    The ids are kept in ascending order, as varints of the differences
+    between them, most of them take a byte. New files get the next id,
+    so their ids are appended to the lists.
+
+    Contents are lowercased, to search ignoring case. Removed files
+    keep their ids in the lists until there are too many of them.
+
+    The index is saved in a directory, as the paths of the files and
+    segments of the lists. A save writes only the ids appended to the
+    lists since the last save as a new segment, once there are too many
+    segments, or the lists got compacted, they are written as one.
+
+    The index is used from more than one thread, a lock is held
+    while it is used.
+    """
+
+    # Bump when the format of the saved index changes
+    version = 2
+
+    # Segments saved before they are all written as one
+    max_segments = 16
+
+    def __init__(self, root):
+        self.root = root
+
+        self.lock = threading.Lock()
+
+        # Paths of the files by their ids, None for removed files
+        self.paths = []
+
+        # Ids of the files, and their modification times and sizes
+        self.ids = {}
+        self.stamps = {}
+
+        # Encoded ids of the files by the trigrams in them,
+        # and the last id of each list
+        self.postings = {}
+        self.last_ids = {}
+
+        # Encoded ids appended to the lists since the last save
+        self.pending = {}
+
+        # Names of the saved segments, and whether all the lists
+        # are to be written as one segment on the next save
+        self.segments = []
+        self.rewrite = True
+
+        self.removed = 0
+
+    def update(self, paths, read=map):
+        """Index the files that changed since they were indexed
+
+        The paths are relative to the root. Files are read with the
+        read function, it can be the map of a process pool executor.
+        Files that are not in the paths are removed from the index.
+
+        Returns True if the index changed.
+        """
+        with self.lock:
+            removed = self.ids.keys() - set(paths)
+            for path in removed:
+                self.remove(path)
+
+        changed = self.update_paths(paths, read)
+
+        return changed or len(removed) > 0
+
+    def update_paths(self, paths, read=map):
+        """Index the files of the paths that changed since they were indexed
+
+        Other files of the index are kept as they are. Files that do
+        not exist any more are removed from the index.
+
+        Returns True if the index changed.
+        """
+        changed = []
+        removed = []
+
+        for path in paths:
+            try:
+                stat = os.stat(os.path.join(self.root, path))
+            except OSError:
+                removed.append(path)
+                continue
+
+            if self.stamps.get(path) != (stat.st_mtime_ns, stat.st_size):
+                changed.append(path)
+
+        with self.lock:
+            removed = [path for path in removed if path in self.ids]
+            for path in removed:
+                self.remove(path)
+
+        full_paths = [os.path.join(self.root, path) for path in changed]
+
+        for path, result in zip(changed, read(read_trigrams, full_paths)):
+            with self.lock:
+                if result is None:
+                    self.remove(path)
+                else:
+                    self.add(path, *result)
+
+        with self.lock:
+            if self.removed > len(self.ids):
+                self.compact()
+
+        return len(changed) > 0 or len(removed) > 0
+
+    def add(self, path, stamp, trigrams):
+        self.remove(path)
+
+        file_id = len(self.paths)
+        self.paths.append(path)
+        self.ids[path] = file_id
+        self.stamps[path] = stamp
+
+        postings = self.postings
+        last_ids = self.last_ids
+        pending = self.pending
+
+        for i in range(0, len(trigrams), 3):
+            trigram = trigrams[i:i + 3]
+
+            ids = postings.get(trigram)
+            if ids is None:
+                ids = postings[trigram] = bytearray()
+
+            start = len(ids)
+            append_varint(ids, file_id - last_ids.get(trigram, 0))
+            last_ids[trigram] = file_id
+
+            if not self.rewrite:
+                pending.setdefault(trigram, bytearray()).extend(ids[start:])
+
+    def remove(self, path):
+        file_id = self.ids.pop(path, None)
+
+        if file_id is not None:
+            self.paths[file_id] = None
+            del self.stamps[path]
+            self.removed += 1
+
+    def compact(self):
+        """Drop the removed files from the trigram lists
+        """
+        paths = self.paths
+
+        for trigram, data in list(self.postings.items()):
+            ids = [file_id for file_id in decode_ids(data)
+                   if paths[file_id] is not None]
+
+            if len(ids) > 0:
+                self.postings[trigram] = encode_ids(ids)
+                self.last_ids[trigram] = ids[-1]
+            else:
+                del self.postings[trigram]
+                del self.last_ids[trigram]
+
+        self.removed = 0
+
+        self.pending = {}
+        self.rewrite = True
+
+    def get_candidates(self, query):
+        """Get the paths of the files that can contain the query
+        """
+        trigrams = get_trigrams(query.encode('utf-8').lower())
+
+        with self.lock:
+            if len(trigrams) == 0:
+                return sorted(self.ids)
+
+            postings = []
+            for trigram in trigrams:
+                data = self.postings.get(trigram)
+                if data is None:
+                    return []
+                postings.append(data)
+
+            # Intersect the shortest lists first
+            postings.sort(key=len)
+
+            candidates = set(decode_ids(postings[0]))
+            for data in postings[1:]:
+                candidates.intersection_update(decode_ids(data))
+                if len(candidates) == 0:
+                    return []
+
+            paths = self.paths
+            return sorted(paths[file_id] for file_id in candidates
+                          if paths[file_id] is not None)
+
+    def save(self, path):
+        """Save the index in a directory
+
+        The paths are saved every time, the lists only as a segment
+        of the ids appended since the last save, or all of them.
+        """
+        with self.lock:
+            rewrite = self.rewrite or len(self.segments) >= self.max_segments
+
+            if rewrite:
+                lists = self.postings
+            else:
+                lists = self.pending
+
+            try:
+                # Indexes of version 1 were saved in one file
+                if os.path.isfile(path):
+                    os.remove(path)
+
+                os.makedirs(path, exist_ok=True)
+
+                segments = [] if rewrite else list(self.segments)
+
+                if rewrite or len(lists) > 0:
+                    segment = {trigram: (bytes(data), self.last_ids[trigram])
+                               for trigram, data in lists.items()}
+
+                    fd, segment_path = tempfile.mkstemp(prefix='segment-',
+                                                        dir=path)
+                    with os.fdopen(fd, 'wb') as f:
+                        pickle.dump(segment, f, pickle.HIGHEST_PROTOCOL)
+
+                    segments.append(os.path.basename(segment_path))
+
+                data = {
+                    'version': self.version,
+                    'root': self.root,
+                    'paths': self.paths,
+                    'stamps': self.stamps,
+                    'segments': segments
+                }
+
+                fd, temporary_path = tempfile.mkstemp(dir=path)
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary_path, os.path.join(path, 'index'))
+            except OSError:
+                # Write all the lists on the next save
+                self.rewrite = True
+                return
+
+            self.segments = segments
+            self.pending = {}
+            self.rewrite = False
+
+            if rewrite:
+                self.remove_segments(path)
+
+    def remove_segments(self, path):
+        """Remove the segments that are not saved in the index any more
+        """
+        for entry in os.scandir(path):
+            if (entry.name.startswith('segment-') and
+                    entry.name not in self.segments):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def load(self, path):
+        """Load a saved index
+
+        Returns False if there is no index saved for this root.
+        """
+        try:
+            with open(os.path.join(path, 'index'), 'rb') as f:
+                data = pickle.load(f)
+
+            if data['version'] != self.version or data['root'] != self.root:
+                return False
+
+            paths = data['paths']
+            stamps = data['stamps']
+            segments = data['segments']
+
+            postings = {}
+            last_ids = {}
+
+            # The ids of a segment follow the ids of the ones before it
+            for segment in segments:
+                with open(os.path.join(path, segment), 'rb') as f:
+                    lists = pickle.load(f)
+
+                for trigram, (ids, last_id) in lists.items():
+                    postings.setdefault(trigram, bytearray()).extend(ids)
+                    last_ids[trigram] = last_id
+        except (OSError, EOFError, KeyError, TypeError, ValueError,
+                pickle.UnpicklingError):
+            return False
+
+        with self.lock:
+            self.paths = paths
+            self.stamps = stamps
+            self.postings = postings
+            self.last_ids = last_ids
+
+            self.pending = {}
+            self.segments = segments
+            self.rewrite = False
+
+            self.ids = {path: file_id for file_id, path in enumerate(paths)
+                        if path is not None}
+            self.removed = len(paths) - len(self.ids)
+
+        return True
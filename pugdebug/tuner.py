@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pugdebug - a standalone PHP debugger
+    =========================
+    copyright: (c) 2015 Robert Basic and fork's contributors
+    license: GNU GPL v3, see LICENSE for more details
+"""
+
+
+class PugdebugFeatureTuner():
+    """Tune the max_depth, max_children and max_data debugger features
+
+    The features configured for the project are the upper limits. After
+    every step the time it took to read, parse and render the variables
+    is measured. When the smoothed latency goes over the budget, the
+    limits are lowered proportionally, when it is well under the budget,
+    they are raised again towards the configured values.
+
+    Large replies spend the time reading and parsing long values, so
+    max_data gets lowered first. Smaller replies spend it on the number
+    of variables, so max_children gets lowered first. The other one is
+    lowered only when the first one can not go any lower. The limits
+    never go under the minimums, or over the configured values when
+    those are under the minimums.
+    """
+
+    min_depth = 1
+    min_children = 8
+    min_data = 64
+
+    # Weight of the latest measurement in the smoothed latency
+    smoothing = 0.5
+
+    # Raise the limits only when the latency is under this part of budget
+    headroom = 0.5
+
+    growth = 1.5
+
+    # Replies of this many bytes, or more, are large
+    large_reply_size = 256 * 1024
+
+    def __init__(self, max_depth, max_children, max_data, budget):
+        self.max_depth = max_depth
+        self.max_children = max_children
+        self.max_data = max_data
+
+        # Latency budget of a step, in seconds
+        self.budget = budget
+
+        self.depth = max_depth
+        self.children = max_children
+        self.data = max_data
+
+        self.latency = None
+        self.render_time = 0
+        self.reply_size = 0
+
+    def features(self):
+        return {
+            'max_depth': self.depth,
+            'max_children': self.children,
+            'max_data': self.data
+        }
+
+    def add_render_time(self, elapsed):
+        """Add the time spent rendering the results of a step
+        """
+        self.render_time += elapsed
+
+    def measure(self, elapsed, reply_size):
+        """Measure a step and tune the features
+
+        The elapsed time is the time it took to read and parse the
+        replies, the render time added since the last measurement
+        is added to it.
+
+        Returns True if the features changed.
+        """
+        latency = elapsed + self.render_time
+        self.render_time = 0
+        self.reply_size = reply_size
+
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = (self.smoothing * latency +
+                            (1 - self.smoothing) * self.latency)
+
+        features = self.features()
+
+        if self.latency > self.budget:
+            self.lower(self.budget / self.latency)
+        elif self.latency < self.budget * self.headroom:
+            self.raise_limits()
+
+        return features != self.features()
+
+    def lower(self, ratio):
+        children = self.clamp(int(self.children * ratio),
+                              self.min_children, self.max_children)
+        data = self.clamp(int(self.data * ratio),
+                          self.min_data, self.max_data)
+
+        if self.reply_size >= self.large_reply_size:
+            if data != self.data:
+                self.data = data
+            else:
+                self.children = children
+        elif children != self.children:
+            self.children = children
+        else:
+            self.data = data
+
+        # Every level of depth multiplies the number of children,
+        # so give it up only when far over the budget
+        if ratio < self.headroom:
+            self.depth = self.clamp(self.depth - 1,
+                                    self.min_depth, self.max_depth)
+
+    def raise_limits(self):
+        self.children = self.clamp(int(self.children * self.growth) + 1,
+                                   self.min_children, self.max_children)
+        self.data = self.clamp(int(self.data * self.growth) + 1,
+                               self.min_data, self.max_data)
+        self.depth = self.clamp(self.depth + 1,
+                                self.min_depth, self.max_depth)
+
+    def clamp(self, value, minimum, maximum):
+        """Clamp a limit, the configured maximum wins over the minimum
+        """
+        return max(min(minimum, maximum), min(maximum, value))
@@ -13,3 +13,20 @@ def is_readable_dir(path, *, isabs=None):
             pass
 
     return False
+
+
+def is_line_breakpoint(breakpoint):
+    """Check if a breakpoint is on a line of a file
+
+    Breakpoints on calls of functions have no file and no line.
+    """
+    return 'filename' in breakpoint and 'lineno' in breakpoint
+
+
+def get_breakpoint_function(breakpoint):
+    """Get the name of the function a call breakpoint breaks on
+    """
+    if 'class' in breakpoint:
+        return '%s::%s' % (breakpoint['class'], breakpoint['function'])
+
+    return breakpoint.get('function', '')